@@ -1,5 +1,12 @@
 from django.contrib import admin
+from django.contrib.admin.widgets import ForeignKeyRawIdWidget
+from django.core.paginator import Paginator
+from django.forms.models import BaseInlineFormSet
+from django.urls import NoReverseMatch, reverse
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
 
+from .booking import cancel_tickets
 from .models import (
     AirplaneType,
     Airport,
@@ -11,23 +18,176 @@ from .models import (
     City,
     Crew
 )
+from .pagination import estimate_count
+
+# Changelists with fewer rows than this, by estimate, are counted
+# exactly.
+EXACT_COUNT_BELOW = 10_000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the count of large changelists from Postgres
+    statistics instead of running COUNT(*) over millions of rows.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < EXACT_COUNT_BELOW:
+            return super().count
+        return estimate
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # The "N total" next to the search box is a second COUNT(*).
+    show_full_result_count = False
+    # The date hierarchy lists its periods with the datetimes() of
+    # airport.models.IndexedDatesMixin.
+
+
+class LabelRawIdWidget(ForeignKeyRawIdWidget):
+    """
+    Raw id widget that takes the labels of known objects from `labels`
+    instead of loading each object it shows.
+    """
+    labels = {}
+
+    def label_and_url_for_value(self, value):
+        try:
+            label = self.labels[int(value)]
+        except (KeyError, TypeError, ValueError):
+            return super().label_and_url_for_value(value)
+        opts = self.rel.model._meta
+        try:
+            url = reverse(
+                f"{self.admin_site.name}:"
+                f"{opts.app_label}_{opts.model_name}_change",
+                args=(value,)
+            )
+        except NoReverseMatch:
+            url = ""
+        return Truncator(label).words(14), url
+
+
+class TicketInlineFormSet(BaseInlineFormSet):
+    @cached_property
+    def flight_labels(self) -> dict:
+        return {
+            ticket.flight_id: str(ticket.flight)
+            for ticket in self.get_queryset()
+        }
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        form.fields["flight"].widget.labels = self.flight_labels
+        return form
 
 
 class TicketInline(admin.TabularInline):
     model = Ticket
+    formset = TicketInlineFormSet
     extra = 1
+    raw_id_fields = ("flight",)
+
+    def get_queryset(self, request):
+        # The airplane is for Ticket.clean(), the flight for the labels.
+        return super().get_queryset(request).select_related(
+            "flight__airplane"
+        )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "flight":
+            kwargs["widget"] = LabelRawIdWidget(
+                db_field.remote_field, self.admin_site
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     inlines = (TicketInline,)
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    search_fields = ("user__email__exact",)
+    date_hierarchy = "created_at"
+
+    def delete_queryset(self, request, queryset):
+        cancel_tickets(Ticket.objects.filter(order__in=queryset))
+        super().delete_queryset(request, queryset)
+
+
+@admin.register(Ticket)
+class TicketAdmin(LargeTableAdmin):
+    list_display = ("id", "passenger", "flight", "row", "seat", "order")
+    list_select_related = ("flight", "order")
+    raw_id_fields = ("flight", "order")
+    search_fields = ("order__user__email__exact",)
+    date_hierarchy = "created_at"
+    ordering = ("-created_at", "-id")
+
+    def delete_queryset(self, request, queryset):
+        cancel_tickets(queryset)
+
+
+@admin.register(Flight)
+class FlightAdmin(LargeTableAdmin):
+    list_display = (
+        "id", "label", "departure_time", "arrival_time", "tickets_available"
+    )
+    autocomplete_fields = ("route", "airplane", "crew")
+    exclude = ("seat_map",)
+    readonly_fields = ("tickets_available",)
+    # Prefixes only: of the route label, which starts with the source
+    # airport (route_label_upper_idx), or of the destination airport or
+    # its city. All match routes, whose flights come from the route
+    # index.
+    search_fields = (
+        "route__label__istartswith",
+        "route__destination__name__istartswith",
+        "route__destination__closest_big_city__name__istartswith",
+    )
+    date_hierarchy = "departure_time"
+    ordering = ("-departure_time", "-id")
+    actions = ("refresh_labels",)
+
+    @admin.action(description="Recompute the labels of selected flights")
+    def refresh_labels(self, request, queryset):
+        self.message_user(
+            request, f"Updated {queryset.refresh_labels()} flights."
+        )
+
+
+@admin.register(Route)
+class RouteAdmin(admin.ModelAdmin):
+    list_display = ("label", "distance")
+    autocomplete_fields = ("source", "destination")
+    search_fields = ("label",)
+
+
+@admin.register(Airport)
+class AirportAdmin(admin.ModelAdmin):
+    list_display = ("name", "closest_big_city")
+    search_fields = ("name",)
+
+    def get_queryset(self, request):
+        # Airport.__str__ names the city, also in autocomplete results.
+        return super().get_queryset(request).select_related(
+            "closest_big_city"
+        )
+
+
+@admin.register(Airplane)
+class AirplaneAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(Crew)
+class CrewAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
 
 
 admin.site.register(AirplaneType)
-admin.site.register(Airport)
-admin.site.register(Airplane)
-admin.site.register(Route)
-admin.site.register(Ticket)
-admin.site.register(Flight)
 admin.site.register(City)
-admin.site.register(Crew)
@@ -0,0 +1,128 @@
+import asyncio
+import weakref
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.http import Http404
+from rest_framework.response import Response
+
+_request_slots = weakref.WeakKeyDictionary()
+
+
+def request_slots() -> asyncio.Semaphore:
+    """The running event loop's ASYNC_VIEW_CONCURRENCY semaphore."""
+    loop = asyncio.get_running_loop()
+    if loop not in _request_slots:
+        _request_slots[loop] = asyncio.Semaphore(
+            settings.ASYNC_VIEW_CONCURRENCY
+        )
+    return _request_slots[loop]
+
+
+def release_connections():
+    """
+    What request_finished does, done while the request still holds its
+    slot. Connections inside an atomic block (tests) are left alone.
+    """
+    for conn in connections.all(initialized_only=True):
+        if not conn.in_atomic_block:
+            conn.close_if_unusable_or_obsolete()
+
+
+class AsyncReadMixin:
+    """
+    Serves `async_actions` of a viewset (by default list and retrieve)
+    from an async view, so a slow request does not hold a worker thread
+    under an ASGI server. Other actions keep the regular sync view.
+
+    Authentication and permissions still run through DRF, in a thread.
+    Django gives every async request its own thread, and so its own
+    database connection: at most ASYNC_VIEW_CONCURRENCY requests per
+    process run at once, the others wait on the event loop.
+    The queryset comes from get_queryset() as for the sync view, is
+    evaluated with the async ORM and must select/prefetch everything
+    the serializer reads: serializers run on the event loop, where a
+    lazy query raises SynchronousOnlyOperation.
+    """
+
+    async_actions = {"list", "retrieve"}
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not cls.async_actions & set(actions.values()):
+            return sync_view
+
+        async def view(request, *args, **kwargs):
+            action = sync_view.actions.get(request.method.lower())
+            if action not in cls.async_actions:
+                return await sync_to_async(sync_view)(
+                    request, *args, **kwargs
+                )
+            self = cls(**initkwargs)
+            self.action_map = sync_view.actions
+            self.action = action
+            return await self.adispatch(request, *args, **kwargs)
+
+        update_wrapper(view, sync_view)
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = sync_view.actions
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        async with request_slots():
+            try:
+                return await self.ahandle(request, *args, **kwargs)
+            finally:
+                await sync_to_async(release_connections)()
+
+    async def ahandle(self, request, *args, **kwargs):
+        """APIView.dispatch() for the async actions."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(
+            queryset, request, view=self
+        )
+        if page is None:
+            page = [obj async for obj in queryset]
+            return Response(self.get_serializer(page, many=True).data)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (
+            queryset.model.DoesNotExist, TypeError, ValueError,
+            ValidationError
+        ):
+            raise Http404
+        self.check_object_permissions(request, instance)
+        return Response(self.get_serializer(instance).data)
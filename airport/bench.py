@@ -0,0 +1,302 @@
+"""
+Request benchmarks for `manage.py bench`.
+
+Each scenario sends the same kind of request through the Django test
+client against the configured database, which seed_airport should have
+filled: the whole view, serializer, middleware and authentication stack
+runs, only the network is left out. Every scenario reports latency
+percentiles, queries per request and sequential throughput.
+
+The run happens in one transaction that is rolled back, so the orders
+it creates and the user it logs in with leave no trace.
+"""
+import json
+import statistics
+import time
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order
+from user.serializers import ClaimsTokenObtainPairSerializer
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+SCENARIOS = (
+    "flight-list-filtered", "flight-detail", "ticket-list",
+    "order-create-1", "order-create-10", "token-obtain",
+)
+# Compared with the baseline within --tolerance.
+TIMINGS = ("p50_ms", "p95_ms", "p99_ms")
+# Queries are means over all requests: up to half a query more than the
+# baseline is noise, such as a cache refill; one more per request is not.
+QUERY_TOLERANCE = 0.5
+
+
+class BenchError(Exception):
+    pass
+
+
+class Scenario(NamedTuple):
+    name: str
+    # Called before every request, returns (method, path, data).
+    request: Callable[[], tuple]
+    status: int = 200
+
+
+def percentiles(latencies) -> dict:
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+    }
+
+
+class Benchmark:
+    def __init__(self, requests: int = 200, warmup: int = 20):
+        self.requests = requests
+        self.warmup = warmup
+        self.client = APIClient()
+
+    def scenarios(self) -> list:
+        """The scenarios, built from what the database holds."""
+        busiest = (
+            Flight.objects
+            .values("route__source__closest_big_city")
+            .annotate(flights=Count("id"))
+            .order_by("-flights", "route__source__closest_big_city")
+            .first()
+        )
+        frequent_flyer = (
+            Order.objects
+            .values("user")
+            .annotate(tickets=Count("tickets"))
+            .order_by("-tickets", "user")
+            .first()
+        )
+        if busiest is None or frequent_flyer is None:
+            raise BenchError(
+                "No flights or orders to benchmark, "
+                "fill the database with seed_airport first"
+            )
+        first_departure = (
+            Flight.objects
+            .filter(
+                route__source__closest_big_city=busiest[
+                    "route__source__closest_big_city"
+                ]
+            )
+            .order_by("departure_time")
+            .values_list("departure_time", flat=True)
+            .first()
+        )
+        fullest = Flight.objects.order_by("tickets_available", "id").first()
+        self.frequent_flyer = get_user_model().objects.get(
+            pk=frequent_flyer["user"]
+        )
+        self.bench_user = get_user_model().objects.create_user(
+            BENCH_EMAIL, BENCH_PASSWORD
+        )
+        free_seats = self.free_seats((self.warmup + self.requests) * 11)
+
+        flight_list = reverse("airport:flight-list")
+        return [
+            Scenario("flight-list-filtered", lambda: ("get", flight_list, {
+                "source_city": busiest["route__source__closest_big_city"],
+                "departure_after": timezone.localdate(
+                    first_departure
+                ).isoformat(),
+                "min_available": 1,
+                "limit": 20,
+            })),
+            Scenario("flight-detail", lambda: (
+                "get", reverse("airport:flight-detail", args=[fullest.id]),
+                None
+            )),
+            Scenario("ticket-list", lambda: (
+                "get", reverse("airport:ticket-list"), {"limit": 20}
+            )),
+            Scenario(
+                "order-create-1",
+                lambda: self.order_request(free_seats, 1),
+                201
+            ),
+            Scenario(
+                "order-create-10",
+                lambda: self.order_request(free_seats, 10),
+                201
+            ),
+            Scenario("token-obtain", lambda: (
+                "post", reverse("user:token_obtain_pair"),
+                {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}
+            )),
+        ]
+
+    @staticmethod
+    def free_seats(count: int) -> list:
+        """
+        `count` free (flight id, row, seat), from the flights with the
+        most free seats, grouped by flight.
+        """
+        seats = []
+        for flight in (
+            Flight.objects
+            .select_related("airplane")
+            .order_by("-tickets_available", "id")
+            .iterator()
+        ):
+            taken = set(flight.taken_seats)
+            seats.extend(
+                (flight.id, row, seat)
+                for row in range(1, flight.airplane.rows + 1)
+                for seat in range(1, flight.airplane.seats_in_row + 1)
+                if (row, seat) not in taken
+            )
+            if len(seats) >= count:
+                return seats[::-1]
+        raise BenchError(f"Fewer than {count} free seats to book")
+
+    @staticmethod
+    def order_request(free_seats: list, tickets: int) -> tuple:
+        return "post", reverse("airport:order-list"), {
+            "tickets": [
+                {
+                    "passenger": f"Bench Passenger {number}",
+                    "flight": flight_id,
+                    "row": row,
+                    "seat": seat,
+                }
+                for number, (flight_id, row, seat) in enumerate(
+                    free_seats.pop() for _ in range(tickets)
+                )
+            ]
+        }
+
+    def authenticate(self, scenario: Scenario) -> None:
+        if scenario.name == "token-obtain":
+            self.client.credentials()
+            return
+        user = (
+            self.frequent_flyer if scenario.name == "ticket-list"
+            else self.bench_user
+        )
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def measure(self, scenario: Scenario) -> dict:
+        self.authenticate(scenario)
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries[-1] += 1
+            return execute(sql, params, many, context)
+
+        latencies = []
+        with connection.execute_wrapper(count_query):
+            for _ in range(self.warmup + self.requests):
+                method, path, data = scenario.request()
+                queries.append(0)
+                start = time.perf_counter()
+                response = getattr(self.client, method)(
+                    path, data, format="json"
+                )
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != scenario.status:
+                    raise BenchError(
+                        f"{scenario.name}: {method.upper()} {path} returned "
+                        f"{response.status_code}: {response.content[:500]}"
+                    )
+        latencies = latencies[self.warmup:]
+        queries = queries[self.warmup:]
+
+        return {
+            **percentiles(latencies),
+            "queries": round(statistics.fmean(queries), 2),
+            "throughput_rps": round(len(latencies) / sum(latencies), 1),
+        }
+
+    def run(self, names=None) -> dict:
+        """Results of the scenarios called `names`, all by default."""
+        results = {}
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+        ), transaction.atomic():
+            for scenario in self.scenarios():
+                if names is None or scenario.name in names:
+                    results[scenario.name] = self.measure(scenario)
+            transaction.set_rollback(True)
+        return {
+            "requests": self.requests,
+            "warmup": self.warmup,
+            "scenarios": results,
+        }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Regressions of `results` against `baseline`: a latency percentile
+    more than `tolerance` (0.25 is 25%) above the baseline, throughput
+    more than `tolerance` below it, or a mean query count more than
+    QUERY_TOLERANCE above it.
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for key in TIMINGS:
+            if result[key] > before[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {result[key]} > {before[key]}"
+                )
+        if result["throughput_rps"] < before["throughput_rps"] / (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{name}: throughput_rps {result['throughput_rps']} "
+                f"< {before['throughput_rps']}"
+            )
+        if result["queries"] > before["queries"] + QUERY_TOLERANCE:
+            regressions.append(
+                f"{name}: queries {result['queries']} > {before['queries']}"
+            )
+    return regressions
+
+
+def load_results(path) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_results(path, results: dict) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def format_table(results: dict, baseline=None) -> str:
+    columns = (*TIMINGS, "queries", "throughput_rps")
+    width = max(map(len, SCENARIOS))
+    lines = [
+        f"{'scenario':<{width}}  "
+        + "  ".join(f"{column:>18}" for column in columns)
+    ]
+    before_scenarios = (baseline or {}).get("scenarios", {})
+    for name, result in results["scenarios"].items():
+        before = before_scenarios.get(name, {})
+        cells = []
+        for column in columns:
+            cell = f"{result[column]:g}"
+            if before.get(column):
+                cell += f" ({result[column] / before[column] - 1:+.0%})"
+            cells.append(f"{cell:>18}")
+        lines.append(f"{name:<{width}}  " + "  ".join(cells))
+    return "\n".join(lines)
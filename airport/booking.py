@@ -0,0 +1,289 @@
+import contextvars
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from airport.cache import bump_version
+from airport.models import (
+    Flight,
+    HeldSeat,
+    Order,
+    SeatHold,
+    Ticket,
+    iter_seat_map
+)
+
+
+class SeatsTaken(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Selected seats are already taken."
+    default_code = "seats_taken"
+
+    def __init__(self, seats):
+        self.seats = [
+            {"flight": flight_id, "row": row, "seat": seat}
+            for flight_id, row, seat in sorted(seats)
+        ]
+        super().__init__()
+        self.detail = {"detail": self.detail, "seats": self.seats}
+
+
+class HoldExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "The seat hold has expired."
+    default_code = "hold_expired"
+
+
+def find_taken_seats(seats) -> list:
+    """Return the (flight_id, row, seat) triples that already have a ticket."""
+    seats = list(seats)
+    if not seats:
+        return []
+    return list(
+        Ticket.objects.filter(
+            reduce(
+                or_,
+                (
+                    Q(flight_id=flight_id, row=row, seat=seat)
+                    for flight_id, row, seat in seats
+                )
+            )
+        ).values_list("flight_id", "row", "seat")
+    )
+
+
+def find_occupied_seats(flight, seats) -> list:
+    """
+    Return the (flight_id, row, seat) triples among seats that are
+    marked as taken or held in the flight's current seat_map.
+    """
+    seat_map = Flight.objects.values_list(
+        "seat_map", flat=True
+    ).get(pk=flight.pk)
+    occupied = set(
+        iter_seat_map(
+            bytes(seat_map),
+            flight.airplane.rows,
+            flight.airplane.seats_in_row
+        )
+    )
+    return [
+        (flight.pk, row, seat) for row, seat in seats
+        if (row, seat) in occupied
+    ]
+
+
+def occupy_seats(flights, seats) -> None:
+    """
+    Mark the seats of every flight as occupied, one UPDATE per flight in
+    id order, or raise SeatsTaken if any of them is already taken or held.
+    """
+    for flight_id in sorted(seats):
+        flight = flights[flight_id]
+        if not Flight.objects.occupy_seats(flight, seats[flight_id]):
+            raise SeatsTaken(
+                find_occupied_seats(flight, seats[flight_id])
+                or [(flight_id, row, seat) for row, seat in seats[flight_id]]
+            )
+
+
+def book_tickets(order, tickets_data) -> list:
+    """
+    Create the tickets of an order with a single INSERT and one
+    seat_map/tickets_available UPDATE per flight.
+
+    Seats are not checked beforehand: the (flight, row, seat) unique
+    constraint rejects taken seats and the IntegrityError is turned into
+    SeatsTaken listing the conflicting seats; seats held by someone else
+    are rejected by the seat_map UPDATE. Must run inside a transaction.
+    Tickets are inserted, and flights updated, in a fixed order so
+    concurrent orders cannot deadlock on each other.
+    """
+    tickets = sorted(
+        (Ticket(order=order, **ticket_data) for ticket_data in tickets_data),
+        key=lambda ticket: (ticket.flight_id, ticket.row, ticket.seat)
+    )
+    try:
+        with transaction.atomic():
+            Ticket.objects.bulk_create(tickets)
+    except IntegrityError:
+        taken_seats = find_taken_seats(
+            (ticket.flight_id, ticket.row, ticket.seat) for ticket in tickets
+        )
+        if not taken_seats:
+            raise
+        raise SeatsTaken(taken_seats)
+    bump_version(Ticket)
+
+    flights = {}
+    seats = defaultdict(list)
+    for ticket in tickets:
+        flights[ticket.flight_id] = ticket.flight
+        seats[ticket.flight_id].append((ticket.row, ticket.seat))
+    occupy_seats(flights, seats)
+
+    return tickets
+
+
+# Set while cancel_tickets deletes tickets whose seats it has already
+# released, see airport.signals.release_ticket_seat.
+cancelling_tickets = contextvars.ContextVar(
+    "cancelling_tickets", default=False
+)
+
+
+def cancel_tickets(tickets) -> int:
+    """
+    Delete the tickets of a queryset and give their seats back with one
+    UPDATE per flight, in id order, instead of one per ticket.
+    """
+    with transaction.atomic():
+        ticket_ids = []
+        seats = defaultdict(list)
+        for ticket_id, flight_id, row, seat in tickets.order_by().values_list(
+                "id", "flight_id", "row", "seat"
+        ):
+            ticket_ids.append(ticket_id)
+            seats[flight_id].append((row, seat))
+        if not ticket_ids:
+            return 0
+
+        flights = Flight.objects.select_related("airplane").in_bulk(seats)
+        for flight_id in sorted(seats):
+            Flight.objects.release_seats(flights[flight_id], seats[flight_id])
+        token = cancelling_tickets.set(True)
+        try:
+            Ticket.objects.filter(id__in=ticket_ids).delete()
+        finally:
+            cancelling_tickets.reset(token)
+    return len(ticket_ids)
+
+
+def hold_seats(user, flight, seats, minutes: int) -> SeatHold:
+    """
+    Reserve seats on a flight for the given number of minutes. Held seats
+    are marked in the seat_map and counted out of tickets_available
+    until the hold is confirmed, released or expires.
+    """
+    seats = sorted(seats)
+    with transaction.atomic():
+        occupy_seats({flight.pk: flight}, {flight.pk: seats})
+        hold = SeatHold.objects.create(
+            flight=flight,
+            user=user,
+            expires_at=timezone.now() + timedelta(minutes=minutes)
+        )
+        HeldSeat.objects.bulk_create(
+            HeldSeat(hold=hold, flight=flight, row=row, seat=seat)
+            for row, seat in seats
+        )
+    return hold
+
+
+def _delete_holds(hold_ids) -> None:
+    HeldSeat.objects.filter(hold_id__in=hold_ids).delete()
+    SeatHold.objects.filter(id__in=hold_ids).delete()
+
+
+def release_hold(hold) -> None:
+    """
+    Give the held seats back to the flight and delete the hold. A hold
+    the expired-hold sweeper deleted meanwhile is already released.
+    """
+    with transaction.atomic():
+        try:
+            hold = (
+                SeatHold.objects
+                .select_for_update(of=("self",))
+                .select_related("flight__airplane")
+                .get(pk=hold.pk)
+            )
+        except SeatHold.DoesNotExist:
+            return
+        Flight.objects.release_seats(
+            hold.flight, list(hold.seats.values_list("row", "seat"))
+        )
+        _delete_holds([hold.pk])
+
+
+def confirm_hold(hold, tickets_data) -> Order:
+    """
+    Turn a hold into an order in one transaction. tickets_data must list
+    exactly the held seats; their seat_map bits and tickets_available are
+    already accounted for by the hold, so the flight is not updated.
+    """
+    with transaction.atomic():
+        try:
+            hold = (
+                SeatHold.objects
+                .select_for_update(of=("self",))
+                .select_related("flight__airplane")
+                .get(pk=hold.pk, expires_at__gt=timezone.now())
+            )
+        except SeatHold.DoesNotExist:
+            raise HoldExpired()
+
+        held_seats = set(hold.seats.values_list("row", "seat"))
+        requested_seats = [
+            (ticket_data["row"], ticket_data["seat"])
+            for ticket_data in tickets_data
+        ]
+        if (
+            len(requested_seats) != len(held_seats)
+            or set(requested_seats) != held_seats
+        ):
+            raise ValidationError(
+                {"tickets": "Tickets must cover exactly the held seats."}
+            )
+
+        order = Order.objects.create(user=hold.user)
+        Ticket.objects.bulk_create(
+            Ticket(order=order, flight=hold.flight, **ticket_data)
+            for ticket_data in sorted(
+                tickets_data,
+                key=lambda ticket_data: (
+                    ticket_data["row"], ticket_data["seat"]
+                )
+            )
+        )
+        bump_version(Ticket)
+        _delete_holds([hold.pk])
+    return order
+
+
+def release_expired_holds(batch_size: int = 500) -> int:
+    """
+    Release one batch of expired holds and return how many were released.
+
+    Holds are locked with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    sweepers can run at once and holds being confirmed are left alone.
+    """
+    with transaction.atomic():
+        hold_ids = list(
+            SeatHold.objects
+            .select_for_update(skip_locked=True)
+            .filter(expires_at__lte=timezone.now())
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not hold_ids:
+            return 0
+
+        seats = defaultdict(list)
+        for flight_id, row, seat in HeldSeat.objects.filter(
+                hold_id__in=hold_ids
+        ).values_list("flight_id", "row", "seat"):
+            seats[flight_id].append((row, seat))
+        flights = Flight.objects.select_related("airplane").in_bulk(seats)
+        for flight_id in sorted(seats):
+            Flight.objects.release_seats(flights[flight_id], seats[flight_id])
+
+        _delete_holds(hold_ids)
+    return len(hold_ids)
@@ -0,0 +1,319 @@
+import hashlib
+import time
+import weakref
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from airport.db_router import replica_may_lag
+
+# In-process hit/miss counters, keyed (model name, "hit" or "miss").
+stats = Counter()
+
+
+def get_cache():
+    return caches[settings.REFERENCE_CACHE_ALIAS]
+
+
+# Versions bumped inside a transaction that has not committed yet, per
+# connection: {connection: {label: version}}. Only that transaction
+# sees them, the other processes read the table once it commits.
+_pending_versions = weakref.WeakKeyDictionary()
+
+
+def _pending(connection) -> dict:
+    pending = _pending_versions.setdefault(connection, {})
+    if not connection.in_atomic_block:
+        # Committed, and then in the table, or rolled back.
+        pending.clear()
+    return pending
+
+
+def get_versions(*models) -> list[int]:
+    """
+    Current version of each model: the time of its last change in
+    nanoseconds, 0 if it never changed. Versions live in the
+    airport_modelversion table of the primary, so a change made by any
+    process (another worker, the hold sweeper, import_schedule...)
+    changes them for all.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    labels = [model._meta.label_lower for model in models]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT label, version FROM airport_modelversion"
+            " WHERE label = ANY(%s)",
+            [list(set(labels))]
+        )
+        versions = dict(cursor.fetchall())
+    pending = _pending(connection)
+    return [
+        max(versions.get(label, 0), pending.get(label, 0))
+        for label in labels
+    ]
+
+
+async def aget_versions(*models) -> list[int]:
+    return await sync_to_async(get_versions)(*models)
+
+
+def _store_version(label: str, version: int) -> None:
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO airport_modelversion (label, version)"
+            " VALUES (%s, %s) ON CONFLICT (label) DO UPDATE"
+            " SET version = GREATEST("
+            "airport_modelversion.version + 1, EXCLUDED.version)",
+            [label, version]
+        )
+
+
+def bump_version(model) -> None:
+    """
+    Bump now for the current transaction, so it stops reading old
+    entries, and in the table on commit. Writing the table only after
+    commit keeps concurrent writers from queueing on its row, and
+    nothing cached from the old rows meanwhile survives the bump.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    label = model._meta.label_lower
+    pending = _pending(connection)
+    version = max(time.time_ns(), pending.get(label, 0) + 1)
+    if connection.in_atomic_block:
+        pending[label] = version
+    transaction.on_commit(lambda: _store_version(label, version))
+
+
+class ModelVersionsMixin:
+    """Versions of the viewset model and `cache_models`, read once."""
+
+    cache_models = ()
+
+    def model_versions(self) -> list[int]:
+        if not hasattr(self, "_model_versions"):
+            self._model_versions = get_versions(
+                self.queryset.model, *self.cache_models
+            )
+        return self._model_versions
+
+    async def amodel_versions(self) -> list[int]:
+        if not hasattr(self, "_model_versions"):
+            self._model_versions = await aget_versions(
+                self.queryset.model, *self.cache_models
+            )
+        return self._model_versions
+
+
+class CachedResponseMixin(ModelVersionsMixin):
+    """
+    Read-through cache of the serialized list and detail responses
+    of a viewset. Entries are keyed by the version of every model in
+    `cache_models`, so bumping a version (see airport.signals) makes
+    the old entries unreachable instead of deleting them.
+    """
+
+    def cache_key(self, request, versions) -> str:
+        uri = hashlib.sha1(
+            request.build_absolute_uri().encode()
+        ).hexdigest()
+        return (
+            f"airport:{self.basename}:{self.action}:"
+            f"{'.'.join(map(str, versions))}:{uri}"
+        )
+
+    def count(self, outcome: str) -> None:
+        stats[self.queryset.model._meta.model_name, outcome] += 1
+
+    def cache_hit(self, data) -> Response:
+        self.count("hit")
+        return Response(data, headers={"X-Cache": "HIT"})
+
+    @staticmethod
+    def should_store(response, in_atomic_block: bool, versions) -> bool:
+        response["X-Cache"] = "MISS"
+        # Rows read inside a transaction may still be rolled back, rows
+        # read from a replica may be older than the versions.
+        return (
+            response.status_code == 200
+            and not in_atomic_block
+            and not replica_may_lag(versions)
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        versions = self.model_versions()
+        key = self.cache_key(request, versions)
+        data = cache.get(key)
+        if data is not None:
+            return self.cache_hit(data)
+
+        self.count("miss")
+        response = handler(request, *args, **kwargs)
+        if self.should_store(
+            response, transaction.get_connection().in_atomic_block, versions
+        ):
+            cache.set(key, response.data, settings.REFERENCE_CACHE_TIMEOUT)
+        return response
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        versions = await self.amodel_versions()
+        key = self.cache_key(request, versions)
+        data = await cache.aget(key)
+        if data is not None:
+            return self.cache_hit(data)
+
+        self.count("miss")
+        response = await handler(request, *args, **kwargs)
+        in_atomic_block = await sync_to_async(
+            lambda: transaction.get_connection().in_atomic_block
+        )()
+        if self.should_store(response, in_atomic_block, versions):
+            await cache.aset(
+                key, response.data, settings.REFERENCE_CACHE_TIMEOUT
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(
+            super().alist, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(
+            super().aretrieve, request, *args, **kwargs
+        )
+
+
+def timestamp_ns(value) -> int:
+    return int(value.timestamp() * 10 ** 6) * 1000
+
+
+class ConditionalGetMixin(ModelVersionsMixin):
+    """
+    Strong ETag and Last-Modified on list and detail responses, built
+    from the versions of the viewset model and its `cache_models` (a
+    detail response uses the object's own updated_at instead of its
+    model version). A matching If-None-Match / If-Modified-Since gets
+    a 304 before the queryset is serialized.
+    """
+
+    def updated_at_queryset(self, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .select_related(None)
+            .prefetch_related(None)
+            .values_list("updated_at", flat=True)
+        )
+        try:
+            return queryset.filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup: no stamps, the handler answers 404.
+            return queryset.none()
+
+    def get_version_stamps(self, **kwargs) -> list[int] | None:
+        if self.action != "retrieve":
+            return self.model_versions()
+        updated_at = self.updated_at_queryset(**kwargs).first()
+        if updated_at is None:
+            return None
+        return [timestamp_ns(updated_at), *self.model_versions()[1:]]
+
+    async def aget_version_stamps(self, **kwargs) -> list[int] | None:
+        if self.action != "retrieve":
+            return await self.amodel_versions()
+        updated_at = await self.updated_at_queryset(**kwargs).afirst()
+        if updated_at is None:
+            return None
+        return [
+            timestamp_ns(updated_at), *(await self.amodel_versions())[1:]
+        ]
+
+    def get_validators(self, request, stamps) -> tuple[str, int]:
+        etag = '"%s"' % hashlib.sha1(
+            "|".join([
+                request.build_absolute_uri(),
+                str(request.user.pk),
+                request.accepted_media_type,
+                *map(str, stamps)
+            ]).encode()
+        ).hexdigest()
+        return etag, max(stamps) // 10 ** 9
+
+    @staticmethod
+    def set_validators(response, etag: str, last_modified: int, stamps):
+        if response.status_code == 304 or (
+            # A lagging replica's rows may be older than the stamps.
+            response.status_code == 200 and not replica_may_lag(stamps)
+        ):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        stamps = self.get_version_stamps(**kwargs)
+        if stamps is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request, stamps)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.set_validators(
+            response, etag, last_modified, stamps
+        )
+
+    async def aconditional_response(self, handler, request, *args, **kwargs):
+        stamps = await self.aget_version_stamps(**kwargs)
+        if stamps is None:
+            return await handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request, stamps)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self.set_validators(
+            response, etag, last_modified, stamps
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional_response(
+            super().alist, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(
+            super().aretrieve, request, *args, **kwargs
+        )
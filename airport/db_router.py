@@ -0,0 +1,167 @@
+"""
+Read replica routing.
+
+DATABASE_REPLICAS lists the aliases of read replicas of `default`.
+Viewsets with ReplicaReadMixin (the airport API) read from one of them,
+picked per request, when the request method is safe; writes and
+everything else (admin, authentication, management commands) use the
+primary.
+
+Replicas lag behind the primary. A user whose unsafe request succeeded
+is pinned to the primary for REPLICA_STICKY_SECONDS, so they read what
+they just wrote, e.g. the order they created. Pins are kept in the
+REPLICA_PIN_CACHE_ALIAS cache, a database cache on the primary, so the
+next request of the user finds them whichever process serves it.
+For other users a change shows up once the replica has replayed it;
+responses read from a replica while a model they show changed less
+than REPLICA_MAX_LAG_SECONDS ago, by the model versions of the
+primary, are not cached and get no ETag (see airport.cache), so an
+old body is never stored under a new version.
+"""
+import contextvars
+import random
+import time
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async
+)
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+
+class RequestRouting:
+    __slots__ = ("replica",)
+
+    def __init__(self):
+        # The alias reads of this request go to, None for the primary.
+        self.replica = None
+
+
+_request_routing = contextvars.ContextVar("request_routing", default=None)
+
+
+def _pin_key(user_id) -> str:
+    return f"airport:primary-pin:{user_id}"
+
+
+def pin_to_primary(user_id) -> None:
+    caches[settings.REPLICA_PIN_CACHE_ALIAS].set(
+        _pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS
+    )
+
+
+def is_pinned(user_id) -> bool:
+    return bool(
+        caches[settings.REPLICA_PIN_CACHE_ALIAS].get(_pin_key(user_id))
+    )
+
+
+def read_replica() -> str | None:
+    """The replica the current request reads from, if any."""
+    routing = _request_routing.get()
+    return routing.replica if routing is not None else None
+
+
+def replica_may_lag(versions) -> bool:
+    """
+    Whether the current request reads from a replica that may not have
+    the latest change yet, given the versions (nanosecond change times,
+    see airport.cache.get_versions, read from the primary) of the models
+    it shows.
+    """
+    return read_replica() is not None and bool(versions) and (
+        time.time_ns() - max(versions)
+        < settings.REPLICA_MAX_LAG_SECONDS * 10 ** 9
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "django_cache":
+            # The pins of DatabaseCache: a replica may not have them yet.
+            return None
+        return read_replica()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Gives every request its RequestRouting and pins users to the
+    primary after their successful writes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request_routing.set(RequestRouting())
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_routing.reset(token)
+        self.pin_writer(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _request_routing.set(RequestRouting())
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_routing.reset(token)
+        # The pin is written to a database cache, and request.user may
+        # still have to be loaded.
+        await sync_to_async(self.pin_writer)(request, response)
+        return response
+
+    @staticmethod
+    def pin_writer(request, response) -> None:
+        if (
+            not settings.DATABASE_REPLICAS
+            or request.method in SAFE_METHODS
+            or response.status_code >= 400
+        ):
+            return
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
+
+
+class ReplicaReadMixin:
+    """
+    Reads of safe requests go to a replica once the request is
+    authenticated, unless the user is pinned to the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        routing = _request_routing.get()
+        if (
+            routing is None
+            or not settings.DATABASE_REPLICAS
+            or request.method not in SAFE_METHODS
+            or request.user.is_authenticated and is_pinned(request.user.pk)
+        ):
+            return
+        routing.replica = random.choice(settings.DATABASE_REPLICAS)
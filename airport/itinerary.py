@@ -0,0 +1,323 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from airport.models import Airport, Flight
+
+
+class Leg(NamedTuple):
+    id: int
+    route_id: int
+    source: int
+    destination: int
+    departure_time: datetime
+    arrival_time: datetime
+    distance: int
+    tickets_available: int
+
+
+class Itinerary(NamedTuple):
+    legs: tuple
+
+    @property
+    def departure_time(self) -> datetime:
+        return self.legs[0].departure_time
+
+    @property
+    def arrival_time(self) -> datetime:
+        return self.legs[-1].arrival_time
+
+    @property
+    def duration(self) -> timedelta:
+        return self.arrival_time - self.departure_time
+
+    @property
+    def distance(self) -> int:
+        return sum(leg.distance for leg in self.legs)
+
+
+ITINERARY_ORDERING = {
+    "duration": lambda itinerary: (
+        itinerary.duration, itinerary.distance, itinerary.arrival_time
+    ),
+    "distance": lambda itinerary: (
+        itinerary.distance, itinerary.duration, itinerary.arrival_time
+    ),
+    "arrival": lambda itinerary: (
+        itinerary.arrival_time, itinerary.duration, itinerary.distance
+    ),
+}
+
+
+class Graph(NamedTuple):
+    """
+    One state of a FlightGraph. Flight changes make a changed copy
+    rather than edit it, so a search can walk it without a lock; only
+    the tickets_available of its legs are refreshed in place.
+    """
+    legs: dict
+    departures: dict
+    airports_by_city: dict
+    max_flight_id: int
+
+
+def load_legs(queryset) -> list:
+    rows = queryset.filter(
+        departure_time__gte=timezone.now() - timedelta(days=1)
+    ).values_list(
+        "id", "route_id", "route__source_id", "route__destination_id",
+        "departure_time", "arrival_time", "route__distance",
+        "tickets_available"
+    )
+    return [Leg(*row) for row in rows.iterator(chunk_size=5000)]
+
+
+def max_flight_id(queryset) -> int:
+    return queryset.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+class FlightGraph:
+    """
+    In-memory graph of upcoming flights: airports are nodes and every
+    flight is an edge, indexed by departure airport and departure time.
+
+    Built on first use and kept per process. Flights saved or deleted in
+    this process are applied immediately (see airport.signals); flights
+    created by other processes are picked up every
+    ITINERARY_GRAPH_REFRESH_SECONDS by loading ids above the highest one
+    seen, and the whole graph is rebuilt every
+    ITINERARY_GRAPH_REBUILD_SECONDS (or after a Route/Airport change) to
+    catch edits and deletions made elsewhere.
+
+    Graphs are loaded outside the lock and swapped in under it, by one
+    thread at a time; other searches keep walking the current graph
+    meanwhile; only the very first build is waited for.
+    """
+
+    def __init__(self):
+        # Guards swapping `graph`; searches read it without.
+        self.lock = threading.Lock()
+        # Held by the thread loading flights from the database.
+        self.load_lock = threading.Lock()
+        self.graph = None
+        self.built_at = self.refreshed_at = None
+        # Bumped by invalidate(), so a build that started before it
+        # does not count as fresh.
+        self.generation = 0
+
+    def build(self) -> None:
+        """Load a new graph of all upcoming flights and swap it in."""
+        started_at = time.monotonic()
+        generation = self.generation
+        airports_by_city = defaultdict(set)
+        for airport_id, city_id in Airport.objects.values_list(
+                "id", "closest_big_city_id"
+        ):
+            airports_by_city[city_id].add(airport_id)
+        # Flights created while loading are left to refresh().
+        last_id = max_flight_id(Flight.objects.all())
+        legs = {}
+        departures = defaultdict(list)
+        for leg in load_legs(Flight.objects.filter(id__lte=last_id)):
+            legs[leg.id] = leg
+            departures[leg.source].append((leg.departure_time, leg.id))
+        for flights in departures.values():
+            flights.sort()
+        with self.lock:
+            self.graph = Graph(
+                legs, dict(departures), dict(airports_by_city), last_id
+            )
+            self.refreshed_at = started_at
+            if generation == self.generation:
+                self.built_at = started_at
+
+    def refresh(self) -> None:
+        """Add the flights created since the graph was loaded."""
+        started_at = time.monotonic()
+        flights = Flight.objects.filter(id__gt=self.graph.max_flight_id)
+        last_id = max_flight_id(flights)
+        if last_id:
+            self.apply(
+                added=load_legs(flights.filter(id__lte=last_id)),
+                last_id=last_id
+            )
+        self.refreshed_at = started_at
+
+    def apply(self, removed=(), added=(), last_id: int = 0) -> None:
+        """
+        Swap in a copy of the graph without the `removed` flight ids and
+        with the `added` legs, which replace those with their ids. Only
+        the departure lists of the airports concerned are copied.
+        """
+        with self.lock:
+            graph = self.graph
+            if graph is None:
+                return
+            legs = dict(graph.legs)
+            departures = dict(graph.departures)
+            copied = set()
+
+            def flights_from(source) -> list:
+                if source not in copied:
+                    departures[source] = list(departures.get(source, ()))
+                    copied.add(source)
+                return departures[source]
+
+            for flight_id in (*removed, *(leg.id for leg in added)):
+                leg = legs.pop(flight_id, None)
+                if leg is None:
+                    continue
+                flights = flights_from(leg.source)
+                index = bisect_left(flights, (leg.departure_time, leg.id))
+                if index < len(flights) and flights[index][1] == leg.id:
+                    del flights[index]
+            for leg in added:
+                legs[leg.id] = leg
+                insort(flights_from(leg.source), (leg.departure_time, leg.id))
+            self.graph = graph._replace(
+                legs=legs,
+                departures=departures,
+                max_flight_id=max(graph.max_flight_id, last_id)
+            )
+
+    def due(self) -> str | None:
+        now = time.monotonic()
+        if (
+            self.built_at is None
+            or now - self.built_at > settings.ITINERARY_GRAPH_REBUILD_SECONDS
+        ):
+            return "build"
+        if now - self.refreshed_at > settings.ITINERARY_GRAPH_REFRESH_SECONDS:
+            return "refresh"
+        return None
+
+    def ensure_fresh(self) -> Graph:
+        """
+        The current graph, rebuilt or refreshed first when that is due
+        and no other thread is already at it.
+        """
+        if self.due() and self.load_lock.acquire(
+            blocking=self.graph is None
+        ):
+            try:
+                due = self.due()
+                if due == "build":
+                    self.build()
+                elif due == "refresh":
+                    self.refresh()
+            finally:
+                self.load_lock.release()
+        return self.graph
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.built_at = None
+
+    def update_flight(self, flight_id: int) -> None:
+        if self.graph is not None:
+            self.apply(
+                removed=[flight_id],
+                added=load_legs(Flight.objects.filter(id=flight_id))
+            )
+
+    def remove_flight(self, flight_id: int) -> None:
+        self.apply(removed=[flight_id])
+
+    def search(
+            self,
+            origins,
+            destinations,
+            earliest: datetime,
+            latest: datetime,
+            min_connection: timedelta,
+            max_connection: timedelta,
+            max_legs: int = 3,
+            passengers: int = 1,
+            limit: int = 10,
+            ordering: str = "duration",
+            origin_cities=(),
+            destination_cities=()
+    ) -> list:
+        """
+        Itineraries of 1 to max_legs flights from any of the origin
+        airports (or airports of the origin cities) to any of the
+        destination ones, leaving between earliest and latest, with
+        connections between min_connection and max_connection and never
+        visiting an airport twice.
+        """
+        graph = self.ensure_fresh()
+        origins, destinations = set(origins), set(destinations)
+        for city_id in origin_cities:
+            origins |= graph.airports_by_city.get(city_id, set())
+        for city_id in destination_cities:
+            destinations |= graph.airports_by_city.get(city_id, set())
+        found = []
+
+        def extend(path, visited, window_start, window_end):
+            airport = path[-1].destination if path else None
+            for source in [airport] if path else origins:
+                departures = graph.departures.get(source, ())
+                index = bisect_left(departures, (window_start, 0))
+                for departure_time, flight_id in departures[index:]:
+                    if departure_time > window_end:
+                        break
+                    leg = graph.legs[flight_id]
+                    if (
+                        leg.tickets_available < passengers
+                        or leg.destination in visited
+                    ):
+                        continue
+                    if leg.destination in destinations:
+                        found.append(Itinerary((*path, leg)))
+                    elif len(path) + 1 < max_legs:
+                        extend(
+                            (*path, leg),
+                            visited | {leg.destination},
+                            leg.arrival_time + min_connection,
+                            leg.arrival_time + max_connection
+                        )
+
+        extend((), frozenset(origins), earliest, latest)
+
+        found.sort(key=ITINERARY_ORDERING[ordering])
+        return self.with_seats(found, passengers, limit)
+
+    def with_seats(self, itineraries, passengers: int, limit: int) -> list:
+        """
+        Re-check tickets_available in the database for the best
+        candidates, as sales do not go through the graph.
+        """
+        result = []
+        while itineraries and len(result) < limit:
+            candidates = itineraries[:limit * 2]
+            itineraries = itineraries[limit * 2:]
+            available = dict(
+                Flight.objects.filter(
+                    id__in={leg.id for it in candidates for leg in it.legs}
+                ).values_list("id", "tickets_available")
+            )
+            with self.lock:
+                legs = self.graph.legs
+                for flight_id, tickets_available in available.items():
+                    if flight_id in legs:
+                        legs[flight_id] = legs[flight_id]._replace(
+                            tickets_available=tickets_available
+                        )
+            result += [
+                itinerary for itinerary in candidates
+                if all(
+                    available.get(leg.id, 0) >= passengers
+                    for leg in itinerary.legs
+                )
+            ]
+        return result[:limit]
+
+
+flight_graph = FlightGraph()
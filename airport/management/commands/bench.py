@@ -0,0 +1,120 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.bench import (
+    SCENARIOS,
+    BenchError,
+    Benchmark,
+    compare,
+    format_table,
+    load_results,
+    save_results
+)
+
+DEFAULT_BASELINE = os.path.join(
+    settings.BASE_DIR, "airport", "bench_baseline.json"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the flight list, flight detail, ticket list, order "
+        "create and token endpoints against the seeded database and "
+        "compare the results with a baseline; fails on a regression"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Measured requests per scenario (default 200)"
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=20,
+            help="Unmeasured requests before each scenario (default 20)"
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=SCENARIOS,
+            help="Run only this scenario, can be repeated"
+        )
+        parser.add_argument(
+            "--output",
+            default="bench-results.json",
+            help="Where to write the results (default bench-results.json)"
+        )
+        parser.add_argument(
+            "--baseline",
+            default=DEFAULT_BASELINE,
+            help="Baseline results to compare with"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown against the baseline, 0.25 is 25%% "
+                 "(default 0.25)"
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Write the results to the baseline instead of comparing"
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2 or options["warmup"] < 0:
+            raise CommandError("--requests must be >= 2, --warmup >= 0")
+        if options["tolerance"] < 0:
+            raise CommandError("--tolerance can not be negative")
+        if settings.DEBUG:
+            self.stderr.write(
+                "DEBUG is on: query logging and the debug toolbar slow "
+                "requests down, run with DEBUG=False to compare timings"
+            )
+
+        try:
+            results = Benchmark(
+                options["requests"], options["warmup"]
+            ).run(options["scenario"])
+        except BenchError as error:
+            raise CommandError(error)
+        save_results(options["output"], results)
+
+        if options["update_baseline"]:
+            save_results(options["baseline"], results)
+            self.stdout.write(format_table(results))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Baseline written to {options['baseline']}"
+                )
+            )
+            return
+
+        baseline = None
+        if os.path.exists(options["baseline"]):
+            baseline = load_results(options["baseline"])
+        self.stdout.write(format_table(results, baseline))
+        if baseline is None:
+            self.stdout.write(
+                f"No baseline at {options['baseline']}, "
+                "record one with --update-baseline"
+            )
+            return
+
+        regressions = compare(results, baseline, options["tolerance"])
+        if regressions:
+            raise CommandError(
+                "Regressions against the baseline:\n" + "\n".join(regressions)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Within {options['tolerance']:.0%} of the baseline, "
+                f"results written to {options['output']}"
+            )
+        )
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.schedule import ScheduleImporter, read_rows
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import flights, their routes and crew assignments from a CSV or "
+        "JSONL file (source, destination, airplane, departure_time, "
+        "arrival_time, distance, crew)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="File to import, or - to read standard input"
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(set(FORMATS.values())),
+            help="File format, by default taken from the file extension"
+        )
+        parser.add_argument(
+            "--show-rejected",
+            type=int,
+            default=20,
+            help="Number of rejected rows to list (default 20)"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or FORMATS.get(Path(path).suffix)
+        if file_format is None:
+            raise CommandError(
+                "Cannot tell the file format, pass --format csv or jsonl"
+            )
+
+        importer = ScheduleImporter()
+        if path == "-":
+            result = importer.run(read_rows(sys.stdin, file_format))
+        else:
+            try:
+                with open(path, newline="", encoding="utf-8") as stream:
+                    result = importer.run(read_rows(stream, file_format))
+            except OSError as error:
+                raise CommandError(error)
+
+        for line, reason in result.rejected[:options["show_rejected"]]:
+            self.stderr.write(f"Line {line}: {reason}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.rows} rows in {result.seconds:.2f} s "
+                f"({result.rows_per_second:.0f} rows/s): "
+                f"{result.created} flights created, "
+                f"{result.updated} updated, "
+                f"{result.routes_created} routes created, "
+                f"{len(result.rejected)} rows rejected"
+            )
+        )
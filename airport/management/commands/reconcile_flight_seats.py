@@ -0,0 +1,92 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from airport.cache import bump_version
+from airport.models import Flight, HeldSeat, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Flight.seat_map and Flight.tickets_available "
+        "from the tickets and held seats and fix the flights that drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of flights locked and checked per transaction"
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted flights, do not update them"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        flight_ids = list(
+            Flight.objects.order_by("id").values_list("id", flat=True)
+        )
+        checked = fixed = 0
+
+        for start in range(0, len(flight_ids), batch_size):
+            with transaction.atomic():
+                fixed += self.reconcile_batch(
+                    flight_ids[start:start + batch_size],
+                    options["dry_run"]
+                )
+            checked += len(flight_ids[start:start + batch_size])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {checked} flights, "
+                f"{'found' if options['dry_run'] else 'fixed'} "
+                f"{fixed} with drift"
+            )
+        )
+
+    def reconcile_batch(self, flight_ids, dry_run: bool) -> int:
+        flights = list(
+            Flight.objects
+            .select_for_update(of=("self",))
+            .select_related("airplane")
+            .filter(id__in=flight_ids)
+            .order_by("id")
+        )
+        taken_seats = defaultdict(list)
+        for model in (Ticket, HeldSeat):
+            for flight_id, row, seat in model.objects.filter(
+                    flight_id__in=flight_ids
+            ).values_list("flight_id", "row", "seat"):
+                taken_seats[flight_id].append((row, seat))
+
+        drifted = []
+        for flight in flights:
+            seat_map, tickets_available = (
+                bytes(flight.seat_map), flight.tickets_available
+            )
+            flight.rebuild_seats(taken_seats[flight.id])
+            if (
+                bytes(flight.seat_map) != seat_map
+                or flight.tickets_available != tickets_available
+            ):
+                drifted.append(flight)
+                self.stdout.write(
+                    f"Flight {flight.id}: tickets_available "
+                    f"{tickets_available} -> {flight.tickets_available}"
+                )
+
+        if drifted and not dry_run:
+            now = timezone.now()
+            for flight in drifted:
+                flight.updated_at = now
+            Flight.objects.bulk_update(
+                drifted, ["seat_map", "tickets_available", "updated_at"]
+            )
+            bump_version(Flight)
+        return len(drifted)
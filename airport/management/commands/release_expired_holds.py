@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.booking import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Release expired seat holds in batches. Safe to run from several "
+        "workers at once: holds are claimed with FOR UPDATE SKIP LOCKED"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of holds released per transaction"
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep sweeping until interrupted"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30,
+            help="Seconds to sleep between sweeps with --loop"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = 0
+            while batch := release_expired_holds(options["batch_size"]):
+                released += batch
+            self.stdout.write(f"Released {released} expired holds")
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,76 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from airport.seed import AirportSeeder, SeedVolumes
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic cities, airports, routes, "
+        "airplanes, crew, users, flights, orders and tickets: hub-heavy "
+        "routes, seasonal schedules and near-full popular flights, the "
+        "same for the same --seed and --start"
+    )
+
+    def add_arguments(self, parser):
+        for name, default in SeedVolumes._field_defaults.items():
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=f"Number of {name} (default {default})"
+            )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Random seed (default 1)"
+        )
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day of the schedule, YYYY-MM-DD (default today)"
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Number of days the flights are spread over (default 365)"
+        )
+
+    def handle(self, *args, **options):
+        volumes = SeedVolumes(
+            **{name: options[name] for name in SeedVolumes._fields}
+        )
+        if min(volumes) < 0 or options["days"] < 1:
+            raise CommandError("Volumes can not be negative, days >= 1")
+        if volumes.cities < 2 or volumes.airports < 2:
+            raise CommandError("At least 2 cities and 2 airports are needed")
+        if volumes.flights and not (volumes.routes and volumes.airplanes):
+            raise CommandError("Flights need --routes and --airplanes")
+        if volumes.tickets and not (volumes.users and volumes.orders):
+            raise CommandError("Tickets need --users and --orders")
+
+        seeder = AirportSeeder(
+            volumes, options["seed"], options["start"], options["days"]
+        )
+        try:
+            result = seeder.run()
+        except IntegrityError as error:
+            raise CommandError(
+                f"{error}\nThe users of this --seed may already exist, "
+                "use another --seed or an empty database"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created in {result.seconds:.1f} s: "
+                + ", ".join(
+                    f"{count} {name}" for name, count in result.rows.items()
+                )
+                + f"; load factor {result.load_factor:.0%}, "
+                f"{result.full_flights} full flights"
+            )
+        )
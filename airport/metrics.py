@@ -0,0 +1,275 @@
+"""
+Per-endpoint request metrics in the Prometheus text exposition format.
+
+MetricsMiddleware records, for every request, its latency, the number
+and total duration of its database queries and its response size,
+labelled by endpoint: "<router basename>-<action>" for viewsets
+(flight-list, order-create), the URL name otherwise. GET /metrics/
+publishes them.
+
+Queries are counted by an execute wrapper installed on every database
+connection (see connection_created in airport.signals). It finds the
+request through a context variable, which asgiref copies into the
+threads sync_to_async runs ORM calls in, so async views are counted
+too. Metrics are kept per process: with several workers each one
+reports its own.
+"""
+import contextvars
+import hmac
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from airport import cache
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape(value: str) -> str:
+    return (
+        str(value).replace("\\", r"\\").replace("\n", r"\n")
+        .replace('"', r"\"")
+    )
+
+
+def format_labels(names, values) -> str:
+    return ",".join(
+        f'{name}="{escape(value)}"' for name, value in zip(names, values)
+    )
+
+
+def format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.lock = threading.Lock()
+        self.values = defaultdict(float)
+
+    def inc(self, labels=(), amount=1) -> None:
+        with self.lock:
+            self.values[labels] += amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            yield self.name, format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, buckets, labelnames=()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self.lock = threading.Lock()
+        # labels -> [count per bucket..., +Inf count, sum]
+        self.values = {}
+
+    def observe(self, labels, value) -> None:
+        with self.lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self.lock:
+            values = {labels: list(counts)
+                      for labels, counts in self.values.items()}
+        for labels, counts in sorted(values.items()):
+            for bound, count in zip(
+                [*map(format_value, self.buckets), "+Inf"], counts
+            ):
+                yield (
+                    f"{self.name}_bucket",
+                    format_labels((*self.labelnames, "le"), (*labels, bound)),
+                    count
+                )
+            label_text = format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum", label_text, counts[-1]
+            yield f"{self.name}_count", label_text, counts[-2]
+
+
+REQUESTS = Counter(
+    "airport_http_requests_total",
+    "Requests by endpoint, method and status code.",
+    ("endpoint", "method", "status")
+)
+LATENCY = Histogram(
+    "airport_http_request_duration_seconds",
+    "Time from the request entering the middleware to the response.",
+    LATENCY_BUCKETS,
+    ("endpoint", "method")
+)
+QUERIES = Histogram(
+    "airport_db_queries_per_request",
+    "Database queries run by one request.",
+    QUERY_COUNT_BUCKETS,
+    ("endpoint",)
+)
+DB_TIME = Histogram(
+    "airport_db_duration_seconds",
+    "Time one request spent in database queries.",
+    LATENCY_BUCKETS,
+    ("endpoint",)
+)
+RESPONSE_SIZE = Histogram(
+    "airport_http_response_size_bytes",
+    "Response body size; streamed responses are not observed.",
+    SIZE_BUCKETS,
+    ("endpoint",)
+)
+METRICS = (REQUESTS, LATENCY, QUERIES, DB_TIME, RESPONSE_SIZE)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting the current request's queries."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+def install_query_recorder(connection) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def endpoint_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    actions = getattr(match.func, "actions", None)
+    basename = getattr(match.func, "initkwargs", {}).get("basename")
+    if actions and basename:
+        action = actions.get(request.method.lower())
+        if action:
+            return f"{basename}-{action}"
+    return match.url_name or match.view_name or "unnamed"
+
+
+class MetricsMiddleware:
+    """Records REQUESTS, LATENCY, QUERIES, DB_TIME and RESPONSE_SIZE."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def record(request, response, stats, seconds) -> None:
+        endpoint = endpoint_name(request)
+        REQUESTS.inc((endpoint, request.method, str(response.status_code)))
+        LATENCY.observe((endpoint, request.method), seconds)
+        QUERIES.observe((endpoint,), stats.queries)
+        DB_TIME.observe((endpoint,), stats.db_seconds)
+        if not response.streaming:
+            RESPONSE_SIZE.observe((endpoint,), len(response.content))
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{{{labels}}} {format_value(value)}")
+
+    name = "airport_reference_cache_requests_total"
+    lines.append(
+        f"# HELP {name} Reference cache lookups by model and outcome"
+        " (airport.cache)."
+    )
+    lines.append(f"# TYPE {name} counter")
+    for (model, outcome), count in sorted(cache.stats.items()):
+        lines.append(
+            f'{name}{{model="{escape(model)}",outcome="{escape(outcome)}"}}'
+            f" {count}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    GET /metrics/ for Prometheus. Scrapes must send METRICS_TOKEN as
+    "Authorization: Bearer <token>"; without METRICS_TOKEN every scrape
+    is forbidden.
+    """
+    token = settings.METRICS_TOKEN
+    # Compared as bytes: compare_digest() rejects non-ASCII strings.
+    if not token or not hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {token}".encode()
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
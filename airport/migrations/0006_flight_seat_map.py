@@ -0,0 +1,43 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+def build_seat_map(rows, seats_in_row, taken_seats):
+    # airport.models.build_seat_map as of this migration.
+    seat_map = bytearray((rows * seats_in_row + 7) // 8)
+    for row, seat in taken_seats:
+        if not (1 <= row <= rows and 1 <= seat <= seats_in_row):
+            continue
+        position = (row - 1) * seats_in_row + seat - 1
+        seat_map[position >> 3] |= 1 << (position & 7)
+    return bytes(seat_map)
+
+
+def fill_seat_maps(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    for flight in Flight.objects.select_related("airplane").iterator():
+        flight.seat_map = build_seat_map(
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            Ticket.objects.filter(flight=flight).values_list("row", "seat")
+        )
+        flight.save(update_fields=["seat_map"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0005_airplane_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seat_map",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.RunPython(fill_seat_maps, migrations.RunPython.noop),
+    ]
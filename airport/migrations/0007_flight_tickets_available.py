@@ -0,0 +1,38 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:41
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def fill_tickets_available(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+
+    Flight.objects.update(
+        tickets_available=(
+            Flight.objects
+            .filter(pk=models.OuterRef("pk"))
+            .annotate(
+                available=F("airplane__rows") * F("airplane__seats_in_row")
+                - Count("tickets")
+            )
+            .values("available")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0006_flight_seat_map"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="tickets_available",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(
+            fill_tickets_available, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.4 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_flight_tickets_available"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="ticket",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="ticket",
+            constraint=models.UniqueConstraint(
+                fields=("flight", "row", "seat"),
+                name="unique_ticket_flight_row_seat",
+                violation_error_message="Selected seat is already taken."
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 22:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0012_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airplane",
+            name="image_renditions",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
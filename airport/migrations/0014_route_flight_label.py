@@ -0,0 +1,72 @@
+# Generated by Django 5.0.4 on 2026-10-18 23:12
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+
+
+def airport_label(path):
+    return Concat(
+        F(f"{path}__name"),
+        Value("("),
+        F(f"{path}__closest_big_city__name"),
+        Value(")"),
+    )
+
+
+def fill_labels(apps, schema_editor):
+    Route = apps.get_model("airport", "Route")
+    Flight = apps.get_model("airport", "Flight")
+
+    Route.objects.update(
+        label=(
+            Route.objects
+            .filter(pk=models.OuterRef("pk"))
+            .values(
+                new_label=Concat(
+                    airport_label("source"),
+                    Value(" - "),
+                    airport_label("destination"),
+                    Value("("),
+                    airport_label("destination"),
+                    Value(")"),
+                    output_field=models.TextField(),
+                )
+            )
+        )
+    )
+    Flight.objects.update(
+        label=(
+            Flight.objects
+            .filter(pk=models.OuterRef("pk"))
+            .values(
+                new_label=Concat(
+                    F("route__label"),
+                    Value(" - "),
+                    F("airplane__name"),
+                    output_field=models.TextField(),
+                )
+            )
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0013_airplane_image_renditions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="label",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="route",
+            name="label",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.RunPython(fill_labels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.4 on 2026-10-18 23:55
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0016_modelversion"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="route",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("label"),
+                    name="text_pattern_ops",
+                ),
+                name="route_label_upper_idx",
+            ),
+        ),
+    ]
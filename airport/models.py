@@ -1,14 +1,25 @@
 import os
 import uuid
+from collections import defaultdict
+from datetime import timedelta
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import OpClass
+from django.db import models, transaction
+from django.db.models import F, Func, Min, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Concat, Now, Upper
+from django.db.models.lookups import Exact
+from django.utils import timezone
 from django.utils.text import slugify
 from rest_framework.exceptions import ValidationError
 
+from airport.cache import bump_version
+from airport.renditions import rendition_pool
+
 
 class City(models.Model):
     name = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "cities"
@@ -17,9 +28,25 @@ class City(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_name = instance.__dict__.get("name")
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if getattr(self, "_loaded_name", self.name) != self.name:
+            Route.objects.filter(
+                Q(source__closest_big_city=self)
+                | Q(destination__closest_big_city=self)
+            ).refresh_labels()
+        self._loaded_name = self.name
+
 
 class AirplaneType(models.Model):
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("name",)
@@ -35,6 +62,7 @@ class Airport(models.Model):
         on_delete=models.CASCADE,
         related_name="airports"
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("name",)
@@ -42,6 +70,26 @@ class Airport(models.Model):
     def __str__(self) -> str:
         return f"{self.name}({self.closest_big_city})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_label_fields = (
+            instance.__dict__.get("name"),
+            instance.__dict__.get("closest_big_city_id")
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        label_fields = (self.name, self.closest_big_city_id)
+        if getattr(self, "_loaded_label_fields", label_fields) != (
+            label_fields
+        ):
+            Route.objects.filter(
+                Q(source=self) | Q(destination=self)
+            ).refresh_labels()
+        self._loaded_label_fields = label_fields
+
 
 def airplane_image_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
@@ -61,6 +109,10 @@ class Airplane(models.Model):
         related_name="airplanes"
     )
     image = models.ImageField(null=True, upload_to=airplane_image_file_path)
+    # Resized copies of image made by airport.renditions:
+    # [{"width", "height", "format", "name"}, ...]
+    image_renditions = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("name",)
@@ -68,6 +120,164 @@ class Airplane(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_dimensions = (
+            instance.__dict__.get("rows"),
+            instance.__dict__.get("seats_in_row")
+        )
+        instance._loaded_name = instance.__dict__.get("name")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # A newly assigned upload is not in storage until super().save().
+        new_image = bool(self.image) and not self.image._committed
+        if new_image or not self.image:
+            self.image_renditions = []
+        super().save(*args, **kwargs)
+        if new_image:
+            rendition_pool.schedule(self)
+        dimensions = (self.rows, self.seats_in_row)
+        if getattr(self, "_loaded_dimensions", dimensions) != dimensions:
+            Flight.objects.filter(airplane=self).rebuild_seats()
+        self._loaded_dimensions = dimensions
+        if getattr(self, "_loaded_name", self.name) != self.name:
+            Flight.objects.filter(airplane=self).refresh_labels()
+        self._loaded_name = self.name
+
+
+def airport_label(path: str) -> Concat:
+    """Airport.__str__ of the airport at `path`, in SQL."""
+    return Concat(
+        F(f"{path}__name"),
+        Value("("),
+        F(f"{path}__closest_big_city__name"),
+        Value(")")
+    )
+
+
+def route_label(source: str, destination: str) -> str:
+    return f"{source} - {destination}({destination})"
+
+
+# The labels in SQL, for updating many rows at once.
+ROUTE_LABEL = Concat(
+    airport_label("source"),
+    Value(" - "),
+    airport_label("destination"),
+    Value("("),
+    airport_label("destination"),
+    Value(")"),
+    output_field=models.TextField()
+)
+FLIGHT_LABEL = Concat(
+    F("route__label"),
+    Value(" - "),
+    F("airplane__name"),
+    output_field=models.TextField()
+)
+
+
+class IndexedDatesMixin:
+    """
+    datetimes() for the admin date hierarchy of large tables. Django
+    lists the years, months or days that have rows with SELECT DISTINCT
+    date_trunc(...), which reads every row in range; here each period
+    is the MIN() of the rows after the previous period, one index
+    lookup, so a month takes at most 31 of them. Ascending years,
+    months and days come back as a list, not a queryset.
+    """
+
+    def datetimes(self, field_name, kind, order="ASC", tzinfo=None):
+        if kind not in ("year", "month", "day") or order != "ASC":
+            return super().datetimes(field_name, kind, order, tzinfo)
+        tzinfo = tzinfo or timezone.get_current_timezone()
+        periods = []
+        queryset = self
+        while first := queryset.aggregate(first=Min(field_name))["first"]:
+            start = timezone.localtime(first, tzinfo).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            if kind == "day":
+                end = start + timedelta(days=1)
+            elif kind == "month":
+                start = start.replace(day=1)
+                end = (start + timedelta(days=31)).replace(day=1)
+            else:
+                start = start.replace(month=1, day=1)
+                end = start.replace(year=start.year + 1)
+            periods.append(start)
+            queryset = self.filter(**{f"{field_name}__gte": end})
+        return periods
+
+
+class IndexedDatesQuerySet(IndexedDatesMixin, models.QuerySet):
+    pass
+
+
+class LabelQuerySet(models.QuerySet):
+    label = None
+
+    def refresh_labels(self) -> int:
+        """Recompute `label` of every row in one UPDATE."""
+        updated = self.update(
+            label=Subquery(
+                self.model.objects
+                .filter(pk=OuterRef("pk"))
+                .values(new_label=self.label)[:1]
+            ),
+            updated_at=Now()
+        )
+        if updated:
+            bump_version(self.model)
+        return updated
+
+
+class RouteQuerySet(LabelQuerySet):
+    label = ROUTE_LABEL
+
+    def refresh_labels(self) -> int:
+        """Recompute the labels of the routes and of their flights."""
+        route_ids = list(self.values_list("id", flat=True))
+        updated = super().refresh_labels()
+        Flight.objects.filter(route__in=route_ids).refresh_labels()
+        return updated
+
+
+class FlightQuerySet(IndexedDatesMixin, LabelQuerySet):
+    label = FLIGHT_LABEL
+
+    def rebuild_seats(self) -> list:
+        """
+        Recompute seat_map and tickets_available of the flights from
+        their tickets and held seats. The flights stay locked until
+        the maps are written, so no booking lands in between.
+        """
+        with transaction.atomic():
+            flights = list(
+                self.select_for_update(of=("self",))
+                .select_related("airplane")
+                .order_by("id")
+            )
+            flight_ids = [flight.id for flight in flights]
+            taken_seats = defaultdict(list)
+            for model in (Ticket, HeldSeat):
+                for flight_id, row, seat in model.objects.filter(
+                    flight_id__in=flight_ids
+                ).values_list("flight_id", "row", "seat"):
+                    taken_seats[flight_id].append((row, seat))
+            now = timezone.now()
+            for flight in flights:
+                flight.rebuild_seats(taken_seats[flight.id])
+                flight.updated_at = now
+            Flight.objects.bulk_update(
+                flights, ["seat_map", "tickets_available", "updated_at"]
+            )
+        if flights:
+            bump_version(Flight)
+        return flights
+
 
 class Route(models.Model):
     source = models.ForeignKey(
@@ -81,19 +291,160 @@ class Route(models.Model):
         related_name="routes_destination"
     )
     distance = models.IntegerField()
+    # str() of the route, kept up to date when airports or their cities
+    # are renamed, so showing a route needs no airport or city rows.
+    label = models.TextField(editable=False, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RouteQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # For label__istartswith, as in the flight admin search.
+            models.Index(
+                OpClass(Upper("label"), name="text_pattern_ops"),
+                name="route_label_upper_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
-        return f"{self.source} - {self.destination}({self.destination})"
+        return self.label
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_airports = (
+            instance.__dict__.get("source_id"),
+            instance.__dict__.get("destination_id")
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        airports = (self.source_id, self.destination_id)
+        relabel = not self.label or airports != getattr(
+            self, "_loaded_airports", airports
+        )
+        if relabel:
+            self.label = route_label(self.source, self.destination)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "label", "updated_at"
+                }
+        super().save(*args, **kwargs)
+        if relabel and airports != getattr(
+            self, "_loaded_airports", airports
+        ):
+            Flight.objects.filter(route=self).refresh_labels()
+        self._loaded_airports = airports
 
 
 class Crew(models.Model):
     name = models.CharField(max_length=255)
     position = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return f"{self.position} - {self.name}"
 
 
+def seat_map_size(rows: int, seats_in_row: int) -> int:
+    """Number of bytes needed to store one bit per seat."""
+    return (rows * seats_in_row + 7) // 8
+
+
+def seat_position(row: int, seat: int, seats_in_row: int) -> int:
+    """Bit index of a seat, counting row by row from row 1, seat 1."""
+    return (row - 1) * seats_in_row + seat - 1
+
+
+def build_seat_map(rows: int, seats_in_row: int, taken_seats) -> bytes:
+    """
+    Build a seat bitmap from (row, seat) pairs.
+
+    Bit n is bit (n % 8) of byte (n // 8), least significant bit first,
+    which is the layout used by Postgres set_bit()/get_bit() on bytea.
+    """
+    seat_map = bytearray(seat_map_size(rows, seats_in_row))
+    for row, seat in taken_seats:
+        if not (1 <= row <= rows and 1 <= seat <= seats_in_row):
+            continue
+        position = seat_position(row, seat, seats_in_row)
+        seat_map[position >> 3] |= 1 << (position & 7)
+    return bytes(seat_map)
+
+
+def iter_seat_map(seat_map: bytes, rows: int, seats_in_row: int):
+    """Yield (row, seat) pairs for every bit set in the seat bitmap."""
+    for position in range(min(rows * seats_in_row, len(seat_map) * 8)):
+        if seat_map[position >> 3] >> (position & 7) & 1:
+            yield position // seats_in_row + 1, position % seats_in_row + 1
+
+
+# Written only by FlightManager and FlightQuerySet.rebuild_seats().
+SEAT_FIELDS = ("seat_map", "tickets_available")
+
+
+class FlightManager(models.Manager.from_queryset(FlightQuerySet)):
+    def _set_seats(self, flight, seats, value: int) -> int:
+        seats_in_row = flight.airplane.seats_in_row
+        positions = sorted({
+            seat_position(row, seat, seats_in_row) for row, seat in seats
+        })
+        queryset = self.filter(pk=flight.pk)
+        seat_map = F("seat_map")
+        bits = [
+            Func(
+                F("seat_map"),
+                Value(position),
+                function="get_bit",
+                output_field=models.IntegerField()
+            )
+            for position in positions
+        ]
+        for position, bit in zip(positions, bits):
+            if value:
+                queryset = queryset.filter(Exact(bit, 0))
+            seat_map = Func(
+                seat_map,
+                Value(position),
+                Value(value),
+                function="set_bit",
+                output_field=models.BinaryField()
+            )
+        if value:
+            tickets_available = F("tickets_available") - len(positions)
+        else:
+            # Only seats that were taken give a ticket back, releasing a
+            # seat twice must not push the count over capacity.
+            tickets_available = F("tickets_available")
+            for bit in bits:
+                tickets_available += bit
+        updated = queryset.update(
+            seat_map=seat_map,
+            tickets_available=tickets_available,
+            updated_at=Now()
+        )
+        if updated:
+            bump_version(Flight)
+        return updated
+
+    def occupy_seats(self, flight, seats) -> int:
+        """
+        Mark (row, seat) pairs as taken and decrease tickets_available
+        in a single UPDATE. Nothing is updated, and 0 is returned, if any
+        of the seats is already taken or held.
+        """
+        return self._set_seats(flight, seats, 1)
+
+    def release_seats(self, flight, seats) -> int:
+        """
+        Mark (row, seat) pairs as free and increase tickets_available
+        by the number of them that were taken, in a single UPDATE.
+        """
+        return self._set_seats(flight, seats, 0)
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         "Route",
@@ -112,21 +463,153 @@ class Flight(models.Model):
         related_name="crews",
         null=True
     )
+    seat_map = models.BinaryField(default=b"")
+    tickets_available = models.IntegerField(default=0)
+    # "<route label> - <airplane name>", kept up to date like
+    # Route.label.
+    label = models.TextField(editable=False, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = FlightManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=("departure_time", "id"),
+                name="flight_departure_id_idx"
+            ),
+            models.Index(
+                fields=("route", "departure_time"),
+                name="flight_route_departure_idx"
+            ),
+            models.Index(
+                fields=("airplane", "departure_time"),
+                name="flight_airplane_departure_idx"
+            ),
+            models.Index(
+                fields=("arrival_time",),
+                name="flight_arrival_idx"
+            ),
+            models.Index(
+                fields=("departure_time",),
+                condition=models.Q(tickets_available__gt=0),
+                name="flight_departure_available_idx"
+            )
+        ]
 
     def __str__(self) -> str:
-        return f"{self.route} - {self.airplane}" \
-               f"({self.departure_time}-{self.arrival_time})"
+        return f"{self.label}({self.departure_time}-{self.arrival_time})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_airplane_id = instance.__dict__.get("airplane_id")
+        instance._loaded_route_id = instance.__dict__.get("route_id")
+        return instance
+
+    @property
+    def capacity(self) -> int:
+        return self.airplane.rows * self.airplane.seats_in_row
+
+    def rebuild_seats(self, taken_seats=None) -> None:
+        """
+        Recompute seat_map and tickets_available from the tickets and
+        held seats, or from already fetched (row, seat) pairs.
+        """
+        if taken_seats is None:
+            taken_seats = (
+                list(self.tickets.values_list("row", "seat"))
+                + list(self.held_seats.values_list("row", "seat"))
+                if self.pk else []
+            )
+        self.seat_map = build_seat_map(
+            self.airplane.rows,
+            self.airplane.seats_in_row,
+            taken_seats
+        )
+        self.tickets_available = self.capacity - sum(
+            bin(byte).count("1") for byte in self.seat_map
+        )
+
+    def save(self, *args, **kwargs):
+        airplane_changed = self.airplane_id != getattr(
+            self, "_loaded_airplane_id", self.airplane_id
+        )
+        if self._state.adding:
+            if not self.seat_map:
+                self.rebuild_seats()
+        elif kwargs.get("update_fields") is None:
+            # Bookings change seat_map and tickets_available with their
+            # own UPDATEs after this flight was loaded, writing them back
+            # would undo those bookings.
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in SEAT_FIELDS
+            ]
+        if (
+            not self.label
+            or airplane_changed
+            or self.route_id != getattr(
+                self, "_loaded_route_id", self.route_id
+            )
+        ):
+            self.label = f"{self.route.label} - {self.airplane.name}"
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "label", "updated_at"
+                }
+        if self._state.adding or not airplane_changed:
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                (flight,) = Flight.objects.filter(pk=self.pk).rebuild_seats()
+            self.seat_map = flight.seat_map
+            self.tickets_available = flight.tickets_available
+            self.updated_at = flight.updated_at
+        self._loaded_airplane_id = self.airplane_id
+        self._loaded_route_id = self.route_id
+
+    def is_seat_taken(self, row: int, seat: int) -> bool:
+        position = seat_position(row, seat, self.airplane.seats_in_row)
+        seat_map = bytes(self.seat_map)
+        return bool(
+            position >> 3 < len(seat_map)
+            and seat_map[position >> 3] >> (position & 7) & 1
+        )
+
+    @property
+    def taken_seats(self):
+        return iter_seat_map(
+            bytes(self.seat_map),
+            self.airplane.rows,
+            self.airplane.seats_in_row
+        )
 
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
 
+    objects = IndexedDatesQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=("user", "created_at", "id"),
+                name="order_user_created_id_idx"
+            ),
+            models.Index(
+                fields=("created_at", "id"),
+                name="order_created_id_idx"
+            )
+        ]
 
     def __str__(self) -> str:
         return str(self.created_at)
@@ -146,6 +629,20 @@ class Ticket(models.Model):
     )
     row = models.IntegerField()
     seat = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = IndexedDatesQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_seat = (
+            instance.__dict__.get("flight_id"),
+            instance.__dict__.get("row"),
+            instance.__dict__.get("seat")
+        )
+        return instance
 
     def clean(self):
         if self.row is not None and self.seat is not None:
@@ -155,17 +652,82 @@ class Ticket(models.Model):
                     "Selected seat is not within available range."
                 )
 
-        if self.row is not None and self.seat is not None:
-            if Ticket.objects.filter(
-                    flight=self.flight,
-                    row=self.row,
-                    seat=self.seat
-            ).exclude(pk=self.pk).exists():
-                raise ValidationError("Selected seat is already taken.")
-
     class Meta:
-        unique_together = ("seat", "row")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("flight", "row", "seat"),
+                name="unique_ticket_flight_row_seat",
+                violation_error_message="Selected seat is already taken."
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=("created_at", "id"),
+                name="ticket_created_id_idx"
+            )
+        ]
         ordering = ("seat",)
 
     def __str__(self) -> str:
         return f"{self.flight}(row:{self.row}, seat:{self.seat})"
+
+
+class SeatHold(models.Model):
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ("expires_at",)
+
+    def __str__(self) -> str:
+        return f"{self.flight_id} hold until {self.expires_at}"
+
+
+class HeldSeat(models.Model):
+    hold = models.ForeignKey(
+        SeatHold,
+        on_delete=models.CASCADE,
+        related_name="seats"
+    )
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="held_seats"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("flight", "row", "seat"),
+                name="unique_held_seat_flight_row_seat"
+            )
+        ]
+        ordering = ("row", "seat")
+
+    def __str__(self) -> str:
+        return f"row:{self.row} seat:{self.seat}"
+
+
+class ModelVersion(models.Model):
+    """
+    Time of the last change of each model's rows, in nanoseconds,
+    shared by every process. Written and read by airport.cache.
+    """
+
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self) -> str:
+        return f"{self.label}: {self.version}"
@@ -0,0 +1,241 @@
+import base64
+import binascii
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Estimated number of rows of a queryset without running COUNT(*):
+    pg_class.reltuples for a whole table, the planner's row estimate
+    for a filtered queryset. None if Postgres has no statistics yet.
+    """
+    if not queryset.query.where:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] >= 0 else None
+
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+def keyset_filter(ordering, values) -> Q:
+    """
+    Rows that come after `values` when ordered by `ordering`, e.g.
+    ("departure_time", "id") -> departure_time >= v0 AND
+    (departure_time > v0 OR (departure_time = v0 AND id > v1)).
+    The leading inclusive bound lets Postgres range scan the index.
+    """
+    after = None
+    for field, value in reversed(list(zip(ordering, values))):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition = Q(**{f"{name}__{lookup}": value})
+        if after is not None:
+            condition |= Q(**{name: value}) & after
+        after = condition
+
+    name = ordering[0].lstrip("-")
+    lookup = "lte" if ordering[0].startswith("-") else "gte"
+    return Q(**{f"{name}__{lookup}": values[0]}) & after
+
+
+class LimitOffsetKeysetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination, or keyset pagination on views that define
+    `cursor_ordering` when the request asks for it:
+
+    ?pagination=cursor&limit=100 -> first page, then follow "next"
+    (?cursor=...), which stays as fast on page 10,000 as on page 1.
+
+    ?count=estimate reports a pg_class/planner estimate instead of
+    COUNT(*); in cursor mode the count is only reported when asked for
+    (?count=exact or ?count=estimate).
+    """
+
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    count_query_param = "count"
+
+    def setup(self, request, view) -> None:
+        self.request = request
+        self.cursor_ordering = getattr(view, "cursor_ordering", None)
+        self.use_cursor = bool(self.cursor_ordering) and (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == "cursor"
+        )
+        self.count_mode = request.query_params.get(self.count_query_param)
+        self.count_estimated = False
+
+    def cursor_queryset(self, queryset):
+        self.model = queryset.model
+        position = self.decode_cursor(queryset.model)
+        queryset = queryset.order_by(*self.cursor_ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                keyset_filter(self.cursor_ordering, position)
+            )
+        return queryset[:self.limit + 1]
+
+    def cursor_page(self, page) -> list:
+        self.next_position = None
+        if len(page) > self.limit:
+            page = page[:self.limit]
+            self.next_position = self.encode_position(page[-1])
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.setup(request, view)
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = (
+            self.get_count(queryset) if self.count_mode else None
+        )
+        return self.cursor_page(list(self.cursor_queryset(queryset)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() with the async ORM, for async views."""
+        self.setup(request, view)
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        if self.use_cursor:
+            self.count = (
+                await self.aget_count(queryset) if self.count_mode else None
+            )
+            return self.cursor_page(
+                [obj async for obj in self.cursor_queryset(queryset)]
+            )
+
+        self.count = await self.aget_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [
+            obj async for obj in
+            queryset[self.offset:self.offset + self.limit]
+        ]
+
+    def get_count(self, queryset):
+        if self.count_mode == "estimate":
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                self.count_estimated = True
+                return estimate
+        return super().get_count(queryset)
+
+    async def aget_count(self, queryset):
+        if self.count_mode == "estimate":
+            estimate = await sync_to_async(estimate_count)(queryset)
+            if estimate is not None:
+                self.count_estimated = True
+                return estimate
+        return await queryset.acount()
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            response = super().get_paginated_response(data)
+            if self.count_estimated:
+                response.data["count_estimated"] = True
+            return response
+
+        response = {"next": self.get_next_cursor_link(), "results": data}
+        if self.count is not None:
+            response = {
+                "count": self.count,
+                "count_estimated": self.count_estimated,
+                **response
+            }
+        return Response(response)
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.mode_query_param
+        )
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.cursor_query_param, self.next_position
+        )
+
+    def encode_position(self, obj) -> str:
+        if isinstance(obj, dict):
+            # A values() row: the ordering fields on an unsaved instance.
+            obj = self.model(**{
+                field.lstrip("-"): obj[field.lstrip("-")]
+                for field in self.cursor_ordering
+            })
+        values = [
+            obj._meta.get_field(field.lstrip("-")).value_to_string(obj)
+            for field in self.cursor_ordering
+        ]
+        return base64.urlsafe_b64encode(
+            json.dumps(values).encode()
+        ).decode()
+
+    def decode_cursor(self, model):
+        cursor = self.request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.cursor_ordering):
+                raise ValueError(cursor)
+            return [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.cursor_ordering, values)
+            ]
+        except (
+            binascii.Error, TypeError, ValueError, DjangoValidationError
+        ):
+            raise NotFound("Invalid cursor")
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            "name": self.count_query_param,
+            "required": False,
+            "in": "query",
+            "description": "exact or estimate (pg_class/planner estimate)",
+            "schema": {"type": "string", "enum": ["exact", "estimate"]},
+        })
+        if getattr(view, "cursor_ordering", None):
+            parameters += [
+                {
+                    "name": self.mode_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "cursor: keyset pagination ordered by "
+                                   + ", ".join(view.cursor_ordering),
+                    "schema": {"type": "string", "enum": ["cursor"]},
+                },
+                {
+                    "name": self.cursor_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Cursor from the \"next\" link",
+                    "schema": {"type": "string"},
+                },
+            ]
+        return parameters
@@ -0,0 +1,104 @@
+"""
+Faster JSON and MessagePack renderers/parsers, picked by Accept and
+Content-Type like the DRF ones (see REST_FRAMEWORK in settings).
+
+orjson and msgpack are optional: without orjson the JSON classes fall
+back to DRF's stdlib json code, and the MessagePack classes are only
+registered when msgpack is installed.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# DRF's encoder for what JSON has no type for: datetimes (ISO 8601, "Z"
+# for UTC), dates, times, timedeltas, decimals (as floats), lazy strings.
+encode_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer output written by orjson. Datetimes are passed through
+    to DRF's encoder so they are spelled exactly as before; indented
+    output and anything orjson rejects (e.g. integers over 64 bits) go
+    through JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.ensure_ascii or not self.compact or (
+            self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            content = orjson.dumps(
+                data,
+                default=encode_default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Same \u2028 / \u2029 escaping as JSONRenderer.
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(
+                b"\xe2\x80\xa8", b"\\u2028"
+            ).replace(b"\xe2\x80\xa9", b"\\u2029")
+        return content
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser with orjson for UTF-8 bodies."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack with the values the JSON renderer would write:
+    datetimes, decimals etc. go through the same encoder.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(
+            data, default=encode_default, use_bin_type=True, datetime=False
+        )
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except ValueError as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
@@ -0,0 +1,158 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models.functions import Now
+from PIL import Image, ImageOps
+
+from airport.cache import bump_version
+
+logger = logging.getLogger(__name__)
+
+RENDITION_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+RENDITION_QUALITY = 80
+RENDITION_DIR = os.path.join("uploads", "airplanes", "renditions")
+
+
+def render_image(data: bytes, widths) -> list[tuple[dict, bytes]]:
+    """
+    (rendition, encoded bytes) pairs: the image scaled down to each of
+    `widths` narrower than it, or to its own width if it is narrower
+    than all of them, in every RENDITION_FORMATS format.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        largest = max(widths)
+        # JPEGs are decoded at the smallest scale still >= the largest
+        # rendition, which is most of the work for big photos.
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+    if image.mode in ("RGBA", "LA", "P"):
+        # Transparent areas go white, not black, in JPEG and WebP.
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    else:
+        image = image.convert("RGB")
+
+    targets = sorted(
+        {width for width in widths if width < image.width}
+        or {image.width},
+        reverse=True
+    )
+    rendered = []
+    for width in targets:
+        # Each size is scaled from the previous, larger one.
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+        for extension, pillow_format in RENDITION_FORMATS.items():
+            buffer = io.BytesIO()
+            image.save(
+                buffer, pillow_format, quality=RENDITION_QUALITY,
+                optimize=pillow_format == "JPEG"
+            )
+            rendered.append((
+                {"width": width, "height": height, "format": extension},
+                buffer.getvalue()
+            ))
+    return rendered
+
+
+def store_renditions(name: str) -> list[dict]:
+    """
+    Render the image stored as `name` and save each rendition under a
+    name ending in a hash of its content, so it can be cached forever
+    and identical uploads share files.
+    """
+    with default_storage.open(name) as file:
+        data = file.read()
+
+    stem, _ = os.path.splitext(os.path.basename(name))
+    renditions = []
+    for rendition, content in render_image(
+        data, settings.AIRPLANE_IMAGE_WIDTHS
+    ):
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        rendition["name"] = os.path.join(
+            RENDITION_DIR,
+            f"{stem}-{rendition['width']}w-{digest}.{rendition['format']}"
+        )
+        if not default_storage.exists(rendition["name"]):
+            default_storage.save(rendition["name"], ContentFile(content))
+        renditions.append(rendition)
+    return renditions
+
+
+def generate_renditions(model, pk: int, name: str) -> None:
+    renditions = store_renditions(name)
+    # A newer upload replaces the image: renditions of the old one
+    # are not recorded.
+    updated = model.objects.filter(pk=pk, image=name).update(
+        image_renditions=renditions,
+        updated_at=Now()
+    )
+    if updated:
+        bump_version(model)
+
+
+def _run_in_worker(model, pk: int, name: str) -> None:
+    try:
+        generate_renditions(model, pk, name)
+    except Exception:
+        logger.exception("Rendering %s failed", name)
+    finally:
+        connections.close_all()
+
+
+class RenditionPool:
+    """
+    Worker threads that render uploaded images after the upload is
+    committed, so the upload request does not wait for Pillow (which
+    releases the GIL while resizing and encoding).
+
+    AIRPLANE_IMAGE_WORKERS = 0 renders in the committing thread instead.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def submit(self, model, pk: int, name: str):
+        if not settings.AIRPLANE_IMAGE_WORKERS:
+            generate_renditions(model, pk, name)
+            return None
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.AIRPLANE_IMAGE_WORKERS,
+                    thread_name_prefix="renditions"
+                )
+        return self.executor.submit(_run_in_worker, model, pk, name)
+
+    def schedule(self, instance) -> None:
+        """Render instance.image once the current transaction commits."""
+        model, pk, name = type(instance), instance.pk, instance.image.name
+        transaction.on_commit(lambda: self.submit(model, pk, name))
+
+
+rendition_pool = RenditionPool()
+
+
+def pick_rendition(renditions, width: int, image_format: str = "webp"):
+    """The narrowest rendition at least `width` wide, else the widest."""
+    candidates = sorted(
+        (rendition for rendition in renditions
+         if rendition["format"] == image_format),
+        key=lambda rendition: rendition["width"]
+    )
+    for rendition in candidates:
+        if rendition["width"] >= width:
+            return rendition
+    return candidates[-1] if candidates else None
@@ -0,0 +1,339 @@
+import csv
+import json
+import time
+from collections import Counter
+from typing import Iterable, Iterator, NamedTuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.cache import bump_version
+from airport.itinerary import flight_graph
+from airport.models import Airplane, Airport, Crew, Flight, Route
+
+STAGING_TABLE = "import_schedule_flight"
+IMPORT_LOCK_ID = 0x5C4ED01E
+
+STAGING_COLUMNS = (
+    "line", "route_id", "source_id", "destination_id", "distance",
+    "airplane_id", "seats", "departure_time", "arrival_time", "crew_ids",
+)
+
+
+class RejectedRow(Exception):
+    pass
+
+
+class ImportResult(NamedTuple):
+    rows: int
+    created: int
+    updated: int
+    routes_created: int
+    rejected: list
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_rows(stream, file_format: str) -> Iterator[tuple[int, dict]]:
+    """
+    (line number, row) pairs from a CSV file with a header row or a JSONL
+    file with one object per line. The crew column of a CSV file holds
+    crew names separated by ";".
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            crew = row.get("crew") or ""
+            row["crew"] = [name.strip() for name in crew.split(";")]
+            yield reader.line_num, row
+        return
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else {"_invalid": text}
+
+
+def natural_key_lookup(queryset, key: str, *fields) -> dict:
+    """
+    {natural key: values} for every row; keys shared by several rows
+    map to None, so rows referencing them can be rejected as ambiguous.
+    """
+    lookup = {}
+    counts = Counter()
+    for values in queryset.values_list(key, *fields):
+        counts[values[0]] += 1
+        lookup[values[0]] = values[1:] if fields else values[0]
+    return {
+        name: (value if counts[name] == 1 else None)
+        for name, value in lookup.items()
+    }
+
+
+class ScheduleImporter:
+    """
+    Bulk import of flights: rows are resolved against in-memory lookup
+    tables of airports, airplanes, crew and routes, streamed with COPY
+    into a temporary staging table and merged into airport_route,
+    airport_flight and airport_flight_crew with a few set-based queries.
+
+    A flight is identified by (route, airplane, departure_time): an
+    existing one gets the new arrival_time and crew, everything else
+    is inserted with an empty seat map.
+    """
+
+    def __init__(self):
+        self.airports = natural_key_lookup(Airport.objects, "name", "id")
+        self.airplanes = natural_key_lookup(
+            Airplane.objects, "name", "id", "rows", "seats_in_row"
+        )
+        self.crew = natural_key_lookup(Crew.objects, "name", "id")
+        self.routes = {
+            (source_id, destination_id): route_id
+            for route_id, source_id, destination_id in (
+                Route.objects.order_by("id")
+                .values_list("id", "source_id", "destination_id")
+            )
+        }
+        self.new_routes = set()
+        # Looked up once: get_current_timezone() is slow enough to show
+        # up at 100k rows.
+        self.timezone = timezone.get_current_timezone()
+
+    def resolve(self, kind: str, lookup: dict, name):
+        if name in (None, ""):
+            raise RejectedRow(f"missing {kind}")
+        if name not in lookup:
+            raise RejectedRow(f"unknown {kind} {name!r}")
+        if lookup[name] is None:
+            raise RejectedRow(f"ambiguous {kind} {name!r}")
+        return lookup[name]
+
+    def parse_time(self, value, name: str):
+        parsed = parse_datetime(str(value)) if value else None
+        if parsed is None:
+            raise RejectedRow(f"invalid {name} {value!r}")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, self.timezone)
+        return parsed
+
+    def staging_row(self, line: int, row: dict) -> tuple:
+        if "_invalid" in row:
+            raise RejectedRow("not a JSON object")
+
+        (source_id,) = self.resolve(
+            "airport", self.airports, row.get("source")
+        )
+        (destination_id,) = self.resolve(
+            "airport", self.airports, row.get("destination")
+        )
+        if source_id == destination_id:
+            raise RejectedRow("source and destination are the same airport")
+        airplane_id, rows, seats_in_row = self.resolve(
+            "airplane", self.airplanes, row.get("airplane")
+        )
+        departure_time = self.parse_time(
+            row.get("departure_time"), "departure_time"
+        )
+        arrival_time = self.parse_time(
+            row.get("arrival_time"), "arrival_time"
+        )
+        if arrival_time <= departure_time:
+            raise RejectedRow("arrival_time is not after departure_time")
+        crew_ids = sorted({
+            self.resolve("crew", self.crew, name)[0]
+            for name in row.get("crew") or () if name
+        })
+
+        route = (source_id, destination_id)
+        distance = None
+        if route not in self.routes and route not in self.new_routes:
+            try:
+                distance = int(row.get("distance"))
+            except (TypeError, ValueError):
+                raise RejectedRow("distance is required for a new route")
+            self.new_routes.add(route)
+
+        return (
+            line, self.routes.get(route), source_id, destination_id,
+            distance, airplane_id, rows * seats_in_row,
+            departure_time, arrival_time, crew_ids,
+        )
+
+    def copy_rows(self, cursor, rows: Iterable[tuple[int, dict]]):
+        """COPY the valid rows into the staging table, return them counted."""
+        count = 0
+        rejected = []
+        with cursor.copy(
+            f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) "
+            "FROM STDIN"
+        ) as copy:
+            for line, row in rows:
+                try:
+                    copy.write_row(self.staging_row(line, row))
+                except RejectedRow as error:
+                    rejected.append((line, str(error)))
+                else:
+                    count += 1
+        return count, rejected
+
+    def run(self, rows: Iterable[tuple[int, dict]]) -> ImportResult:
+        start = time.perf_counter()
+        flight_crew = Flight.crew.through._meta.db_table
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Only one import merges flights at a time; bookings and API
+            # writes are not blocked.
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s)", [IMPORT_LOCK_ID]
+            )
+            cursor.execute(
+                f"""
+                CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                    line integer NOT NULL,
+                    route_id bigint,
+                    source_id bigint NOT NULL,
+                    destination_id bigint NOT NULL,
+                    distance integer,
+                    airplane_id bigint NOT NULL,
+                    seats integer NOT NULL,
+                    departure_time timestamptz NOT NULL,
+                    arrival_time timestamptz NOT NULL,
+                    crew_ids bigint[] NOT NULL,
+                    flight_id bigint,
+                    created boolean NOT NULL DEFAULT false
+                )
+                """
+            )
+            count, rejected = self.copy_rows(cursor.cursor, rows)
+            # Temporary tables are never analyzed by autovacuum.
+            cursor.execute(f"ANALYZE {STAGING_TABLE}")
+
+            cursor.execute(
+                f"""
+                INSERT INTO airport_route
+                    (source_id, destination_id, distance, label, updated_at)
+                SELECT DISTINCT ON (source_id, destination_id)
+                    source_id, destination_id, distance, '', now()
+                FROM {STAGING_TABLE}
+                WHERE route_id IS NULL AND distance IS NOT NULL
+                ORDER BY source_id, destination_id, line
+                RETURNING id
+                """
+            )
+            route_ids = [route_id for (route_id,) in cursor.fetchall()]
+            routes_created = len(route_ids)
+            if route_ids:
+                Route.objects.filter(pk__in=route_ids).refresh_labels()
+
+            # Later lines win when a flight is listed more than once.
+            cursor.execute(
+                f"""
+                DELETE FROM {STAGING_TABLE} s
+                USING {STAGING_TABLE} later
+                WHERE later.source_id = s.source_id
+                  AND later.destination_id = s.destination_id
+                  AND later.airplane_id = s.airplane_id
+                  AND later.departure_time = s.departure_time
+                  AND later.line > s.line
+                """
+            )
+            cursor.execute(
+                f"""
+                UPDATE {STAGING_TABLE} s SET route_id = r.id
+                FROM (
+                    SELECT DISTINCT ON (source_id, destination_id)
+                        id, source_id, destination_id
+                    FROM airport_route
+                    ORDER BY source_id, destination_id, id
+                ) r
+                WHERE s.route_id IS NULL
+                  AND r.source_id = s.source_id
+                  AND r.destination_id = s.destination_id
+                """
+            )
+            cursor.execute(
+                f"""
+                UPDATE {STAGING_TABLE} s SET flight_id = f.id
+                FROM airport_flight f
+                WHERE f.route_id = s.route_id
+                  AND f.airplane_id = s.airplane_id
+                  AND f.departure_time = s.departure_time
+                """
+            )
+            cursor.execute(
+                f"""
+                UPDATE airport_flight f
+                SET arrival_time = s.arrival_time, updated_at = now()
+                FROM {STAGING_TABLE} s
+                WHERE f.id = s.flight_id
+                """
+            )
+            updated = cursor.rowcount
+            cursor.execute(
+                f"""
+                WITH created AS (
+                    INSERT INTO airport_flight (
+                        route_id, airplane_id, departure_time, arrival_time,
+                        seat_map, tickets_available, label, updated_at
+                    )
+                    SELECT
+                        s.route_id, s.airplane_id, s.departure_time,
+                        s.arrival_time,
+                        decode(repeat('00', (s.seats + 7) / 8), 'hex'),
+                        s.seats, r.label || ' - ' || a.name, now()
+                    FROM {STAGING_TABLE} s
+                    JOIN airport_route r ON r.id = s.route_id
+                    JOIN airport_airplane a ON a.id = s.airplane_id
+                    WHERE s.flight_id IS NULL
+                    RETURNING id, route_id, airplane_id, departure_time
+                )
+                UPDATE {STAGING_TABLE} s
+                SET flight_id = created.id, created = true
+                FROM created
+                WHERE created.route_id = s.route_id
+                  AND created.airplane_id = s.airplane_id
+                  AND created.departure_time = s.departure_time
+                """
+            )
+            created = cursor.rowcount
+            cursor.execute(
+                f"""
+                DELETE FROM {flight_crew} fc
+                USING {STAGING_TABLE} s
+                WHERE NOT s.created
+                  AND fc.flight_id = s.flight_id
+                  AND NOT fc.crew_id = ANY(s.crew_ids)
+                """
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {flight_crew} (flight_id, crew_id)
+                SELECT s.flight_id, unnest(s.crew_ids)
+                FROM {STAGING_TABLE} s
+                ON CONFLICT DO NOTHING
+                """
+            )
+            cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+
+            if routes_created:
+                bump_version(Route)
+            bump_version(Flight)
+            transaction.on_commit(flight_graph.invalidate)
+
+        return ImportResult(
+            rows=count,
+            created=created,
+            updated=updated,
+            routes_created=routes_created,
+            rejected=rejected,
+            seconds=time.perf_counter() - start
+        )
@@ -0,0 +1,579 @@
+import bisect
+import math
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from datetime import time as day_time
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from airport.cache import bump_version
+from airport.itinerary import flight_graph
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+    build_seat_map,
+    route_label
+)
+
+CITY_SYLLABLES = (
+    "ka", "lo", "ri", "va", "ne", "to", "mi", "sa", "dor", "len", "bur",
+    "grad", "vi", "ta", "mar", "ko", "zel", "pol", "an", "ber", "ost",
+    "lin", "ra", "sel", "mo", "tir", "ha", "fen", "dal", "ves",
+)
+AIRPORT_SUFFIXES = (
+    "International", "Central", "North", "West", "Regional", "City",
+)
+FIRST_NAMES = (
+    "Olena", "Andrii", "Maria", "Taras", "Iryna", "Dmytro", "Sofia",
+    "Oleh", "Anna", "Mykola", "Kateryna", "Ivan", "Julia", "Petro",
+    "Emma", "Lucas", "Mia", "Noah", "Lena", "Jan", "Eva", "Marco",
+    "Giulia", "Pierre", "Claire", "Tomas", "Zofia", "Lars", "Ingrid",
+)
+LAST_NAMES = (
+    "Kovalenko", "Shevchenko", "Bondarenko", "Tkachenko", "Kravets",
+    "Melnyk", "Boyko", "Novak", "Müller", "Schmidt", "Rossi", "Bianchi",
+    "Dubois", "Martin", "Nowak", "Kowalski", "Hansen", "Larsen",
+    "Svoboda", "Horvat", "Silva", "Garcia", "Weber", "Fischer",
+)
+PASSENGERS = tuple(
+    f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES
+)
+# name, rows, seats in row, size class, share of the fleet
+AIRPLANE_TYPES = (
+    ("ATR 72-600", 18, 4, "regional", 0.12),
+    ("Embraer E190", 25, 4, "regional", 0.13),
+    ("Airbus A320neo", 30, 6, "narrowbody", 0.3),
+    ("Boeing 737-800", 32, 6, "narrowbody", 0.3),
+    ("Airbus A330-300", 44, 8, "widebody", 0.08),
+    ("Boeing 787-9", 42, 9, "widebody", 0.07),
+)
+# Departure banks: share of flights leaving in each hour of the day.
+DEPARTURE_HOURS = (
+    0.2, 0.1, 0.1, 0.1, 0.3, 1.5, 4.0, 6.0, 5.5, 4.5, 3.5, 3.0,
+    3.0, 3.0, 3.5, 4.0, 4.5, 5.5, 6.0, 5.0, 3.5, 2.0, 1.0, 0.5,
+)
+# Monday to Sunday.
+WEEKDAY_DEMAND = (1.0, 0.9, 0.9, 1.0, 1.15, 1.05, 1.1)
+CREW_POSITIONS = (
+    ("Captain", 0.2), ("First Officer", 0.2), ("Flight Attendant", 0.6),
+)
+
+
+class SeedVolumes(NamedTuple):
+    cities: int = 150
+    airports: int = 200
+    routes: int = 1500
+    airplanes: int = 300
+    crew: int = 2000
+    users: int = 10_000
+    flights: int = 8_000
+    orders: int = 400_000
+    tickets: int = 1_000_000
+
+
+class SeedResult(NamedTuple):
+    rows: dict
+    load_factor: float
+    full_flights: int
+    seconds: float
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    """Weight of rank 1..count under Zipf's law: a few hubs, a long tail."""
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def seasonal_demand(day: date) -> float:
+    """Relative demand on a day: a late July peak and busy Fridays."""
+    season = math.cos(2 * math.pi * (day.timetuple().tm_yday - 200) / 365.25)
+    return (1 + 0.35 * season) * WEEKDAY_DEMAND[day.weekday()]
+
+
+def distance_km(a: tuple, b: tuple) -> int:
+    """Great circle distance between two (latitude, longitude) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return round(2 * 6371 * math.asin(math.sqrt(h)))
+
+
+def size_class(distance: int) -> str:
+    if distance < 700:
+        return "regional"
+    return "narrowbody" if distance < 3500 else "widebody"
+
+
+def copy_value(value) -> str:
+    if value is None:
+        return r"\N"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return r"\\x" + value.hex()
+    return str(value)
+
+
+class AirportSeeder:
+    """
+    Synthetic, production-shaped data for performance work.
+
+    Airports get Zipf weights, so a few hubs carry most routes and
+    flights; flights are spread over `days` days by a seasonal and
+    weekly demand curve and departure banks; each flight is booked to a
+    load factor that grows with the popularity of its route and day, so
+    the busiest flights are (nearly) full. Everything comes from one
+    random.Random(seed): the same seed and start give the same rows.
+
+    Reference data is written with bulk_create; flights, crew
+    assignments, orders and tickets are generated into temporary files
+    and loaded with COPY, with their seat maps built from the tickets.
+    """
+
+    def __init__(
+        self,
+        volumes: SeedVolumes,
+        seed: int = 1,
+        start: date = None,
+        days: int = 365
+    ):
+        self.volumes = volumes
+        self.random = random.Random(seed)
+        self.seed = seed
+        self.start = timezone.make_aware(
+            datetime.combine(start or timezone.localdate(), day_time.min)
+        )
+        self.days = days
+        self.rows = Counter()
+        self.full_flights = 0
+
+    def choices(self, population, weights, k: int) -> list:
+        return self.random.choices(
+            population, cum_weights=list(_accumulate(weights)), k=k
+        )
+
+    def create_cities(self) -> list:
+        names = set()
+        while len(names) < self.volumes.cities:
+            name = "".join(
+                self.random.choice(CITY_SYLLABLES)
+                for _ in range(self.random.randint(2, 3))
+            ).capitalize()
+            names.add(f"{name} {len(names)}" if name in names else name)
+        cities = City.objects.bulk_create(
+            City(name=name) for name in sorted(names)
+        )
+        self.rows["cities"] = len(cities)
+        self.random.shuffle(cities)
+        for city in cities:
+            city.location = (
+                self.random.uniform(36, 60), self.random.uniform(-9, 40)
+            )
+        return cities
+
+    def create_airports(self, cities) -> None:
+        """
+        One airport for each of the largest cities, the rest shared out
+        by city size, so large cities get several.
+        """
+        city_weights = zipf_weights(len(cities), 1.0)
+        count = self.volumes.airports
+        hosts = list(range(min(count, len(cities))))
+        hosts += self.choices(
+            range(len(cities)), city_weights, count - len(hosts)
+        )
+        airports = []
+        served = Counter()
+        for index in hosts:
+            city = cities[index]
+            suffix = AIRPORT_SUFFIXES[served[index] % len(AIRPORT_SUFFIXES)]
+            number = served[index] // len(AIRPORT_SUFFIXES)
+            name = f"{city.name} {suffix}" + (f" {number}" if number else "")
+            airport = Airport(name=name, closest_big_city=city)
+            airport.weight = city_weights[index] * 0.4 ** served[index]
+            airport.location = (
+                city.location[0] + self.random.uniform(-0.3, 0.3),
+                city.location[1] + self.random.uniform(-0.3, 0.3)
+            )
+            served[index] += 1
+            airports.append(airport)
+        Airport.objects.bulk_create(airports)
+        self.rows["airports"] = len(airports)
+        self.airports = sorted(
+            airports, key=lambda airport: airport.weight, reverse=True
+        )
+
+    def create_routes(self) -> None:
+        """
+        Every airport is linked both ways to one of the hubs, the other
+        routes join airports picked by weight: hub-to-hub most often.
+        """
+        airports = self.airports
+        hubs = airports[:max(1, len(airports) // 20)]
+        limit = self.volumes.routes
+        pairs = {}
+
+        def add(source, destination):
+            if (
+                len(pairs) < limit
+                and source.closest_big_city_id
+                != destination.closest_big_city_id
+            ):
+                pairs.setdefault(
+                    (source.pk, destination.pk), (source, destination)
+                )
+
+        hub_weights = [hub.weight for hub in hubs]
+        for airport, hub in zip(
+            airports[len(hubs):],
+            self.choices(hubs, hub_weights, len(airports) - len(hubs))
+        ):
+            add(airport, hub)
+            add(hub, airport)
+        weights = [airport.weight for airport in airports]
+        # Small networks may not have `limit` distinct pairs.
+        for _ in range(limit * 20):
+            if len(pairs) >= limit:
+                break
+            source, destination = self.choices(airports, weights, 2)
+            add(source, destination)
+            add(destination, source)
+
+        routes = Route.objects.bulk_create(
+            Route(
+                source=source,
+                destination=destination,
+                distance=max(80, distance_km(
+                    source.location, destination.location
+                )),
+                label=route_label(source, destination)
+            )
+            for source, destination in pairs.values()
+        )
+        self.rows["routes"] = len(routes)
+        for route, (source, destination) in zip(routes, pairs.values()):
+            route.weight = math.sqrt(source.weight * destination.weight)
+        self.routes = routes
+
+    def create_airplanes(self) -> None:
+        types = AirplaneType.objects.bulk_create(
+            AirplaneType(name=name) for name, *_ in AIRPLANE_TYPES
+        )
+        self.rows["airplane types"] = len(types)
+        kinds = self.choices(
+            range(len(AIRPLANE_TYPES)),
+            [share for *_, share in AIRPLANE_TYPES],
+            self.volumes.airplanes
+        )
+        airplanes = Airplane.objects.bulk_create(
+            Airplane(
+                name=f"UR-{AIRPLANE_TYPES[kind][0][0]}{number:05d}",
+                rows=AIRPLANE_TYPES[kind][1],
+                seats_in_row=AIRPLANE_TYPES[kind][2],
+                airplane_type=types[kind]
+            )
+            for number, kind in enumerate(kinds, start=1)
+        )
+        self.rows["airplanes"] = len(airplanes)
+        self.fleet = {}
+        for airplane, kind in zip(airplanes, kinds):
+            self.fleet.setdefault(AIRPLANE_TYPES[kind][3], []).append(
+                airplane
+            )
+
+    def create_crew(self) -> None:
+        positions = [name for name, _ in CREW_POSITIONS]
+        assigned = positions[:self.volumes.crew] + self.choices(
+            positions,
+            [share for _, share in CREW_POSITIONS],
+            max(0, self.volumes.crew - len(positions))
+        )
+        crew = Crew.objects.bulk_create(
+            Crew(
+                name=f"{self.random.choice(FIRST_NAMES)} "
+                     f"{self.random.choice(LAST_NAMES)}",
+                position=position
+            )
+            for position in assigned
+        )
+        self.rows["crew"] = len(crew)
+        self.crew = {position: [] for position in positions}
+        for member in crew:
+            self.crew[member.position].append(member.pk)
+
+    def create_users(self) -> None:
+        password = make_password("password")
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(
+                email=f"passenger{number}.{self.seed}@example.com",
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                password=password
+            )
+            for number in range(1, self.volumes.users + 1)
+        )
+        self.rows["users"] = len(users)
+        self.user_ids = [user.pk for user in users]
+        # Frequent flyers: a few users place many of the orders.
+        self.user_weights = list(_accumulate(
+            zipf_weights(len(users), 0.7)
+        ))
+
+    def plan_flights(self) -> list:
+        """
+        (departure, route, airplane, capacity, load) of every flight,
+        by departure time. Routes are picked by weight, days by demand.
+        """
+        count = self.volumes.flights
+        days = [
+            self.start.date() + timedelta(days=day)
+            for day in range(self.days)
+        ]
+        demand = [seasonal_demand(day) for day in days]
+        peak = max(demand)
+        route_weights = [route.weight for route in self.routes]
+        popularity = {
+            route.pk: rank / len(self.routes)
+            for rank, route in enumerate(
+                sorted(self.routes, key=lambda route: route.weight), start=1
+            )
+        }
+        routes = self.choices(self.routes, route_weights, count)
+        day_numbers = self.choices(range(self.days), demand, count)
+        hours = self.choices(range(24), DEPARTURE_HOURS, count)
+
+        plan = []
+        for route, day, hour in zip(routes, day_numbers, hours):
+            departure = self.start + timedelta(
+                days=day, hours=hour, minutes=5 * self.random.randrange(12)
+            )
+            pool = (
+                self.fleet.get(size_class(route.distance))
+                or [airplane for pool in self.fleet.values()
+                    for airplane in pool]
+            )
+            airplane = self.random.choice(pool)
+            base = (
+                0.25 + 0.5 * popularity[route.pk]
+                + 0.25 * demand[day] / peak
+            )
+            load = min(1.0, max(0.02, self.random.gauss(base, 0.08)))
+            plan.append((
+                departure, route, airplane,
+                airplane.rows * airplane.seats_in_row, load
+            ))
+        plan.sort(key=lambda flight: (flight[0], flight[1].pk))
+        return plan
+
+    def load_exponent(self, plan) -> float:
+        """
+        Exponent e so that booking capacity * load ** e seats on every
+        flight adds up to the ticket volume. Loads stay in (0, 1], so
+        the fullest flights stay the fullest whatever the volume.
+        """
+        target = self.volumes.tickets
+
+        def booked(exponent):
+            return sum(
+                min(capacity, round(capacity * load ** exponent))
+                for *_, capacity, load in plan
+            )
+
+        low, high = -8.0, 8.0
+        if booked(math.exp(low)) <= target:
+            return math.exp(low)
+        for _ in range(40):
+            middle = (low + high) / 2
+            if booked(math.exp(middle)) > target:
+                low = middle
+            else:
+                high = middle
+        return math.exp(high)
+
+    def party_size(self, mean: float) -> int:
+        """Geometric number of tickets per order, at most 9."""
+        if mean <= 1:
+            return 1
+        u = self.random.random()
+        return min(9, 1 + int(math.log(1 - u) / math.log(1 - 1 / mean)))
+
+    def write_rows(self, plan, files) -> None:
+        flights, flight_crew, orders, tickets = files
+        exponent = self.load_exponent(plan)
+        mean_party = self.volumes.tickets / max(1, self.volumes.orders)
+        flight_id = self.next_id(Flight)
+        order_id = self.next_id(Order)
+        write = _row_writer
+        choice = self.random.choice
+        updated_at = copy_value(self.start)
+
+        for departure, route, airplane, capacity, load in plan:
+            seats_in_row = airplane.seats_in_row
+            booked = min(capacity, round(capacity * load ** exponent))
+            if not self.user_ids:
+                booked = 0
+            seats = [
+                (position // seats_in_row + 1, position % seats_in_row + 1)
+                for position in sorted(
+                    self.random.sample(range(capacity), booked)
+                )
+            ]
+            arrival = departure + timedelta(
+                minutes=5 * round((route.distance / 800 * 60 + 30) / 5)
+            )
+            flights.write(write(
+                flight_id, route.pk, airplane.pk, departure, arrival,
+                build_seat_map(airplane.rows, seats_in_row, seats),
+                capacity - booked, f"{route.label} - {airplane.name}",
+                updated_at
+            ))
+
+            crew = []
+            for position, needed in (
+                ("Captain", 1), ("First Officer", 1),
+                ("Flight Attendant", 1 + capacity // 60),
+            ):
+                pool = self.crew.get(position) or ()
+                crew += self.random.sample(pool, min(needed, len(pool)))
+            for crew_id in crew:
+                flight_crew.write(write(flight_id, crew_id))
+            self.rows["flight crew"] += len(crew)
+
+            index = 0
+            while index < booked:
+                size = self.party_size(mean_party)
+                user_id = self.user_ids[bisect.bisect(
+                    self.user_weights,
+                    self.random.random() * self.user_weights[-1]
+                )]
+                created_at = departure - timedelta(
+                    seconds=3600 + self.random.expovariate(1 / 2_600_000)
+                )
+                if created_at > self.start:
+                    created_at = self.start - timedelta(
+                        seconds=self.random.uniform(0, 2_600_000)
+                    )
+                # Formatted by hand: this loop writes every ticket.
+                created_at = created_at.isoformat()
+                orders.write(
+                    f"{order_id}\t{created_at}\t{created_at}\t{user_id}\n"
+                )
+                tickets.write("".join(
+                    f"{choice(PASSENGERS)}\t{flight_id}\t{order_id}\t"
+                    f"{row}\t{seat}\t{created_at}\t{created_at}\n"
+                    for row, seat in seats[index:index + size]
+                ))
+                index += size
+                order_id += 1
+                self.rows["orders"] += 1
+            self.rows["tickets"] += booked
+            self.rows["flights"] += 1
+            self.full_flights += booked == capacity
+            flight_id += 1
+
+    @staticmethod
+    def next_id(model) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"LOCK TABLE {model._meta.db_table} IN EXCLUSIVE MODE"
+            )
+            cursor.execute(
+                f"SELECT COALESCE(MAX(id), 0) + 1 FROM {model._meta.db_table}"
+            )
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def copy(cursor, model, columns, stream) -> None:
+        stream.seek(0)
+        with cursor.copy(
+            f"COPY {model._meta.db_table} ({', '.join(columns)}) FROM STDIN"
+        ) as copy:
+            while data := stream.read(1 << 20):
+                copy.write(data)
+
+    def run(self) -> SeedResult:
+        started = time.perf_counter()
+        flight_crew = Flight.crew.through
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Check foreign keys row by row instead of queueing millions
+            # of deferred checks until commit.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            self.create_airports(self.create_cities())
+            self.create_routes()
+            self.create_airplanes()
+            self.create_crew()
+            self.create_users()
+            plan = self.plan_flights()
+
+            files = [
+                tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+                for _ in range(4)
+            ]
+            try:
+                self.write_rows(plan, files)
+                for model, columns, stream in zip(
+                    (Flight, flight_crew, Order, Ticket),
+                    (
+                        ("id", "route_id", "airplane_id", "departure_time",
+                         "arrival_time", "seat_map", "tickets_available",
+                         "label", "updated_at"),
+                        ("flight_id", "crew_id"),
+                        ("id", "created_at", "updated_at", "user_id"),
+                        ("passenger", "flight_id", "order_id", "row",
+                         "seat", "created_at", "updated_at"),
+                    ),
+                    files
+                ):
+                    self.copy(cursor.cursor, model, columns, stream)
+            finally:
+                for stream in files:
+                    stream.close()
+
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [Flight, Order]
+            ):
+                cursor.execute(sql)
+            for model in (Flight, flight_crew, Order, Ticket):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+            for model in (
+                City, Airport, Route, AirplaneType, Airplane, Crew,
+                Flight, Order, Ticket
+            ):
+                bump_version(model)
+            transaction.on_commit(flight_graph.invalidate)
+
+        capacity = sum(flight[3] for flight in plan)
+        return SeedResult(
+            rows=dict(self.rows),
+            load_factor=self.rows["tickets"] / capacity if capacity else 0,
+            full_flights=self.full_flights,
+            seconds=time.perf_counter() - started
+        )
+
+
+def _accumulate(weights):
+    total = 0
+    for weight in weights:
+        total += weight
+        yield total
+
+
+def _row_writer(*values) -> str:
+    return "\t".join(map(copy_value, values)) + "\n"
@@ -1,6 +1,19 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
 from django.db import transaction
+from django.db.models import OuterRef
+from django.db.models.functions import JSONObject
+from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 
+from airport.booking import SeatsTaken, book_tickets, hold_seats
 from airport.models import (
     AirplaneType,
     Airport,
@@ -10,26 +23,30 @@ from airport.models import (
     Order,
     Ticket,
     City,
-    Crew
+    Crew,
+    SeatHold,
+    HeldSeat,
+    iter_seat_map
 )
+from airport.renditions import pick_rendition
 
 
 class CitySerializer(serializers.ModelSerializer):
     class Meta:
         model = City
-        fields = "__all__"
+        fields = ("id", "name")
 
 
 class CrewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Crew
-        fields = "__all__"
+        fields = ("id", "name", "position")
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = AirplaneType
-        fields = "__all__"
+        fields = ("id", "name")
 
 
 class AirportSerializer(serializers.ModelSerializer):
@@ -63,12 +80,17 @@ class AirplaneSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "rows", "seats_in_row", "airplane_type")
 
 
+def media_url(request, name: str) -> str:
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request else url
+
+
 class AirplaneListSerializer(serializers.ModelSerializer):
     airplane_type = serializers.SlugRelatedField(
         slug_field="name",
         queryset=AirplaneType.objects.all()
     )
-    image = serializers.ImageField(use_url=True, required=False)
+    image = serializers.SerializerMethodField()
 
     class Meta:
         model = Airplane
@@ -78,28 +100,143 @@ class AirplaneListSerializer(serializers.ModelSerializer):
             "airplane_type", "image"
         )
 
+    def image_width(self) -> int:
+        request = self.context.get("request")
+        try:
+            return int(request.query_params["image_width"])
+        except (AttributeError, KeyError, ValueError):
+            return settings.AIRPLANE_IMAGE_LIST_WIDTH
+
+    def get_image(self, obj) -> str | None:
+        """
+        URL of the narrowest WebP rendition at least ?image_width= wide,
+        or of the uploaded image until its renditions are ready.
+        """
+        rendition = pick_rendition(obj.image_renditions, self.image_width())
+        if rendition:
+            return media_url(self.context.get("request"), rendition["name"])
+        if obj.image:
+            return media_url(self.context.get("request"), obj.image.name)
+        return None
+
+
+class AirplaneRenditionSerializer(serializers.Serializer):
+    width = serializers.IntegerField()
+    height = serializers.IntegerField()
+    format = serializers.CharField()
+    url = serializers.SerializerMethodField()
+
+    def get_url(self, obj) -> str:
+        return media_url(self.context.get("request"), obj["name"])
+
 
 class AirplaneDetailSerializer(serializers.ModelSerializer):
     airplane_type = AirplaneTypeSerializer(many=False, read_only=True)
+    image = serializers.ImageField(use_url=True, read_only=True)
+    image_renditions = AirplaneRenditionSerializer(many=True, read_only=True)
 
     class Meta:
         model = Airplane
         fields = (
             "id", "name",
             "rows", "seats_in_row",
-            "airplane_type"
+            "airplane_type", "image",
+            "image_renditions"
         )
 
 
+class AirplaneImageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Airplane
+        fields = ("id", "image")
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """ManyRelatedField that looks all the primary keys up in one query."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pks = []
+        for item in data:
+            try:
+                if isinstance(item, bool):
+                    raise TypeError
+                pks.append(queryset.model._meta.pk.to_python(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                child.fail("incorrect_type", data_type=type(item).__name__)
+        objects = queryset.in_bulk(pks)
+        for pk in pks:
+            if pk not in objects:
+                child.fail("does_not_exist", pk_value=pk)
+        return [objects[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+
 class FlightSerializer(serializers.ModelSerializer):
+    serializer_related_field = BulkPrimaryKeyRelatedField
+
     class Meta:
         model = Flight
-        fields = "__all__"
+        fields = (
+            "id", "route",
+            "airplane", "departure_time",
+            "arrival_time", "crew"
+        )
+
+
+def flight_pk(data) -> int | None:
+    """
+    `data` as a flight id if it is an int or a string of digits, so
+    that True or 1.9 is never read as flight 1.
+    """
+    if type(data) is int:
+        return data
+    if isinstance(data, str) and data.isdigit():
+        return int(data)
+    return None
+
+
+class FlightPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Flight lookup that reuses the flights a parent serializer fetched
+    in bulk (context["flights"]) instead of querying once per ticket.
+    """
+
+    def to_internal_value(self, data):
+        pk = flight_pk(data)
+        if pk is None and not isinstance(data, str):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        flights = self.context.get("flights")
+        if flights is not None and pk in flights:
+            return flights[pk]
+        return super().to_internal_value(data)
+
+
+# What a ticket shows of its flight: the route label and the airplane.
+TICKET_FLIGHT_RELATED = ("route", "airplane")
 
 
 class TicketSerializer(serializers.ModelSerializer):
-    route = serializers.StringRelatedField(
-        source="flight.route",
+    flight = FlightPrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related(*TICKET_FLIGHT_RELATED)
+    )
+    route = serializers.CharField(
+        source="flight.route.label",
         read_only=True
     )
     departure_time = serializers.StringRelatedField(
@@ -128,6 +265,9 @@ class TicketSerializer(serializers.ModelSerializer):
             "arrival_time",
             "airplane"
         )
+        # Taken seats are rejected by the (flight, row, seat) constraint
+        # on insert, see airport.booking.book_tickets().
+        validators = []
 
     def get_user(self, obj):
         return obj.order.user.name if obj.order else None
@@ -145,26 +285,17 @@ class TicketSerializer(serializers.ModelSerializer):
                 "Selected seat is not within the available range."
             )
 
-        return data
-
-    def validate_seat(self, value):
-        flight = self.context["request"].data.get("flight")
-
-        if flight and Ticket.objects.filter(
-                flight=flight, seat=value
-        ).exists():
-            raise serializers.ValidationError(
-                "Selected seat is already taken."
-            )
+        if self.parent is None and flight.is_seat_taken(row, seat):
+            raise SeatsTaken([(flight.id, row, seat)])
 
-        return value
+        return data
 
 
 class FlightListSerializer(AirplaneSerializer):
-    route = serializers.StringRelatedField(many=False, read_only=True)
+    route = serializers.CharField(source="route.label", read_only=True)
     airplane = serializers.StringRelatedField(many=False, read_only=True)
     crew = CrewSerializer(many=True, read_only=True)
-    taken_seats = serializers.SerializerMethodField()
+    seat_map = serializers.SerializerMethodField()
     tickets_available = serializers.IntegerField(read_only=True)
 
     class Meta:
@@ -173,20 +304,109 @@ class FlightListSerializer(AirplaneSerializer):
             "id", "route",
             "airplane", "departure_time",
             "arrival_time", "crew",
-            "taken_seats", "tickets_available"
+            "seat_map", "tickets_available"
         )
 
-    def get_taken_seats(self, obj):
-        return [
-            f"row:{ticket.row} seat:{ticket.seat}"
-            for ticket in obj.tickets.all()
-        ]
+    def get_seat_map(self, obj) -> dict:
+        """
+        Taken seats as a base64 bitmap of rows * seats_in_row bits.
+        Pass ?seat_map=expanded to also get the taken (row, seat) pairs.
+        """
+        seat_map = {
+            "rows": obj.airplane.rows,
+            "seats_in_row": obj.airplane.seats_in_row,
+            "bitmap": base64.b64encode(bytes(obj.seat_map)).decode()
+        }
+        request = self.context.get("request")
+        if request and request.query_params.get("seat_map") == "expanded":
+            seat_map["taken_seats"] = [
+                f"row:{row} seat:{seat}" for row, seat in obj.taken_seats
+            ]
+        return seat_map
+
+
+def format_datetime(value: datetime, tz) -> str:
+    """The ISO 8601 string serializers.DateTimeField renders in `tz`."""
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+class FlightListValuesSerializer(serializers.BaseSerializer):
+    """
+    Read-only FlightListSerializer output built from values() rows.
+
+    project() selects exactly the columns the list shows, with the crew
+    of each flight as a JSON array from a correlated subquery, so a page
+    is one query and serializing a row is plain dict and string work:
+    no model instances, related objects or nested serializers.
+    """
+
+    fields = (
+        "id", "departure_time", "arrival_time", "seat_map",
+        "tickets_available", "airplane__name", "airplane__rows",
+        "airplane__seats_in_row", "route__label",
+    )
+
+    @classmethod
+    def project(cls, queryset):
+        crew = (
+            Crew.objects
+            .filter(crews=OuterRef("pk"))
+            .order_by("id")
+            .values(json=JSONObject(
+                id="id",
+                name="name",
+                position="position"
+            ))
+        )
+        return queryset.values(*cls.fields, crew_members=ArraySubquery(crew))
+
+    @cached_property
+    def current_timezone(self):
+        # Looked up once: get_current_timezone() costs more than
+        # formatting the datetime.
+        return timezone.get_current_timezone()
+
+    def to_representation(self, row) -> dict:
+        tz = self.current_timezone
+        rows = row["airplane__rows"]
+        seats_in_row = row["airplane__seats_in_row"]
+        seat_map = {
+            "rows": rows,
+            "seats_in_row": seats_in_row,
+            "bitmap": base64.b64encode(row["seat_map"]).decode()
+        }
+        request = self.context.get("request")
+        if request and request.query_params.get("seat_map") == "expanded":
+            seat_map["taken_seats"] = [
+                f"row:{seat_row} seat:{seat}"
+                for seat_row, seat in iter_seat_map(
+                    row["seat_map"], rows, seats_in_row
+                )
+            ]
+        return {
+            "id": row["id"],
+            "route": row["route__label"],
+            "airplane": row["airplane__name"],
+            "departure_time": format_datetime(row["departure_time"], tz),
+            "arrival_time": format_datetime(row["arrival_time"], tz),
+            "crew": row["crew_members"],
+            "seat_map": seat_map,
+            "tickets_available": row["tickets_available"],
+        }
 
 
 class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
-        fields = "__all__"
+        fields = ("id", "source", "destination", "distance")
+        # The label names the airports' cities.
+        extra_kwargs = {
+            field: {
+                "queryset": Airport.objects.select_related("closest_big_city")
+            }
+            for field in ("source", "destination")
+        }
 
 
 class RouteListSerializer(serializers.ModelSerializer):
@@ -236,16 +456,46 @@ class OrderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Order
-        fields = "__all__"
+        fields = ("id", "created_at", "user", "tickets")
+        read_only_fields = ("user",)
+
+    def to_internal_value(self, data):
+        tickets = data.get("tickets") if hasattr(data, "get") else None
+        flight_ids = set()
+        for ticket in tickets if isinstance(tickets, list) else ():
+            if isinstance(ticket, dict):
+                flight_ids.add(flight_pk(ticket.get("flight")))
+        flight_ids.discard(None)
+        self.context["flights"] = (
+            Flight.objects
+            .select_related(*TICKET_FLIGHT_RELATED)
+            .in_bulk(flight_ids)
+        )
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        seats = [
+            (ticket["flight"].id, ticket["row"], ticket["seat"])
+            for ticket in attrs.get("tickets", [])
+        ]
+        if len(set(seats)) != len(seats):
+            raise serializers.ValidationError(
+                {"tickets": "The same seat is selected more than once."}
+            )
+
+        taken_seats = [
+            seat for seat, ticket in zip(seats, attrs["tickets"])
+            if ticket["flight"].is_seat_taken(ticket["row"], ticket["seat"])
+        ]
+        if taken_seats:
+            raise SeatsTaken(taken_seats)
+        return attrs
 
     def create(self, validated_data):
-        request = self.context.get('request')
-        print(f"Current user: {request.user}")
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(user=request.user, **validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            order = Order.objects.create(**validated_data)
+            book_tickets(order, tickets_data)
             return order
 
 
@@ -254,8 +504,8 @@ class TicketListSerializer(TicketSerializer):
         queryset=Order.objects.all(),
         required=False
     )
-    route = serializers.StringRelatedField(
-        source="flight.route",
+    route = serializers.CharField(
+        source="flight.route.label",
         read_only=True
     )
     departure_time = serializers.StringRelatedField(
@@ -291,3 +541,169 @@ class OrderListSerializer(OrderSerializer):
         many=True,
         read_only=True
     )
+
+
+class HeldSeatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HeldSeat
+        fields = ("row", "seat")
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    flight = FlightPrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    seats = HeldSeatSerializer(many=True, allow_empty=False)
+    minutes = serializers.IntegerField(
+        write_only=True,
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_MINUTES,
+        default=settings.SEAT_HOLD_MINUTES
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = (
+            "id", "flight", "seats",
+            "minutes", "created_at", "expires_at"
+        )
+        read_only_fields = ("created_at", "expires_at")
+
+    def validate(self, attrs):
+        flight = attrs["flight"]
+        seats = [(seat["row"], seat["seat"]) for seat in attrs["seats"]]
+
+        if not all(
+                1 <= row <= flight.airplane.rows
+                and 1 <= seat <= flight.airplane.seats_in_row
+                for row, seat in seats
+        ):
+            raise serializers.ValidationError(
+                "Selected seat is not within the available range."
+            )
+        if len(set(seats)) != len(seats):
+            raise serializers.ValidationError(
+                {"seats": "The same seat is selected more than once."}
+            )
+
+        taken_seats = [
+            (flight.id, row, seat) for row, seat in seats
+            if flight.is_seat_taken(row, seat)
+        ]
+        if taken_seats:
+            raise SeatsTaken(taken_seats)
+        return attrs
+
+    def create(self, validated_data):
+        return hold_seats(
+            validated_data["user"],
+            validated_data["flight"],
+            [(seat["row"], seat["seat"]) for seat in validated_data["seats"]],
+            validated_data["minutes"]
+        )
+
+
+class HoldTicketSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Ticket
+        fields = ("passenger", "row", "seat")
+
+
+class SeatHoldConfirmSerializer(serializers.Serializer):
+    tickets = HoldTicketSerializer(many=True, allow_empty=False)
+
+
+# Plain dates are accepted as midnight of that day.
+DATETIME_OR_DATE_FORMATS = ("iso-8601", "%Y-%m-%d")
+
+
+class FlightFilterSerializer(serializers.Serializer):
+    departure_after = serializers.DateTimeField(
+        required=False, input_formats=DATETIME_OR_DATE_FORMATS
+    )
+    departure_before = serializers.DateTimeField(
+        required=False, input_formats=DATETIME_OR_DATE_FORMATS
+    )
+    arrival_after = serializers.DateTimeField(
+        required=False, input_formats=DATETIME_OR_DATE_FORMATS
+    )
+    arrival_before = serializers.DateTimeField(
+        required=False, input_formats=DATETIME_OR_DATE_FORMATS
+    )
+    source_city = serializers.IntegerField(required=False)
+    destination_city = serializers.IntegerField(required=False)
+    airplane_type = serializers.IntegerField(required=False)
+    min_available = serializers.IntegerField(required=False, min_value=0)
+
+    lookups = {
+        "departure_after": "departure_time__gte",
+        "departure_before": "departure_time__lt",
+        "arrival_after": "arrival_time__gte",
+        "arrival_before": "arrival_time__lt",
+        "source_city": "route__source__closest_big_city_id",
+        "destination_city": "route__destination__closest_big_city_id",
+        "airplane_type": "airplane__airplane_type_id",
+        "min_available": "tickets_available__gte",
+    }
+
+    def filter_queryset(self, queryset):
+        self.is_valid(raise_exception=True)
+        return queryset.filter(**{
+            self.lookups[name]: value
+            for name, value in self.validated_data.items()
+        })
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    origin = serializers.IntegerField(required=False)
+    origin_city = serializers.IntegerField(required=False)
+    destination = serializers.IntegerField(required=False)
+    destination_city = serializers.IntegerField(required=False)
+    date = serializers.DateField()
+    min_connection = serializers.IntegerField(min_value=0, default=45)
+    max_connection = serializers.IntegerField(min_value=1, default=360)
+    max_legs = serializers.IntegerField(min_value=1, max_value=3, default=3)
+    passengers = serializers.IntegerField(min_value=1, default=1)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    ordering = serializers.ChoiceField(
+        choices=("duration", "distance", "arrival"),
+        default="duration"
+    )
+
+    def validate(self, attrs):
+        for end in ("origin", "destination"):
+            if (attrs.get(end) is None) == (attrs.get(f"{end}_city") is None):
+                raise serializers.ValidationError(
+                    f"Provide either {end} or {end}_city."
+                )
+        if attrs["min_connection"] > attrs["max_connection"]:
+            raise serializers.ValidationError(
+                "min_connection can not be greater than max_connection."
+            )
+        return attrs
+
+
+class ItineraryLegSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    route = serializers.IntegerField(source="route_id")
+    source = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    distance = serializers.IntegerField()
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    duration = serializers.SerializerMethodField()
+    distance = serializers.IntegerField()
+    connections = serializers.SerializerMethodField()
+    legs = ItineraryLegSerializer(many=True)
+
+    def get_duration(self, obj) -> int:
+        """Total travel time in minutes"""
+        return int(obj.duration.total_seconds() // 60)
+
+    def get_connections(self, obj) -> int:
+        return len(obj.legs) - 1
@@ -0,0 +1,154 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.functions import Now
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from airport.booking import (
+    SeatsTaken,
+    cancelling_tickets,
+    find_occupied_seats
+)
+from airport.cache import bump_version
+from airport.itinerary import flight_graph
+from airport.metrics import install_query_recorder
+from airport.models import (
+    Airplane,
+    Airport,
+    AirplaneType,
+    City,
+    Crew,
+    Flight,
+    HeldSeat,
+    Order,
+    Route,
+    SeatHold,
+    Ticket
+)
+
+
+def _deleted_with(origin, *models) -> bool:
+    if isinstance(origin, QuerySet):
+        return origin.model in models
+    return isinstance(origin, models)
+
+
+def _occupy_ticket_seat(ticket) -> None:
+    seats = [(ticket.row, ticket.seat)]
+    if not Flight.objects.occupy_seats(ticket.flight, seats):
+        raise SeatsTaken(find_occupied_seats(ticket.flight, seats))
+
+
+@receiver(connection_created)
+def record_request_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+@receiver(post_save, sender=Ticket)
+def occupy_ticket_seat(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded_seat = getattr(instance, "_loaded_seat", None)
+    current_seat = (instance.flight_id, instance.row, instance.seat)
+    if created:
+        _occupy_ticket_seat(instance)
+    elif (
+        loaded_seat
+        and None not in loaded_seat
+        and loaded_seat != current_seat
+    ):
+        flight_id, row, seat = loaded_seat
+        Flight.objects.release_seats(
+            Flight.objects.select_related("airplane").get(pk=flight_id),
+            [(row, seat)]
+        )
+        _occupy_ticket_seat(instance)
+    instance._loaded_seat = current_seat
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, origin=None, **kwargs):
+    """
+    airport.booking.cancel_tickets releases the seats of the tickets it
+    deletes itself, one flight at a time.
+    """
+    if _deleted_with(origin, Flight) or cancelling_tickets.get():
+        return
+    Flight.objects.release_seats(
+        instance.flight,
+        [(instance.row, instance.seat)]
+    )
+
+
+@receiver(post_delete, sender=HeldSeat)
+def release_held_seat(sender, instance, origin=None, **kwargs):
+    """
+    Holds are released in batches by airport.booking; this only covers
+    holds deleted along with something else, e.g. their user.
+    """
+    if _deleted_with(origin, Flight, SeatHold, HeldSeat):
+        return
+    Flight.objects.release_seats(
+        instance.flight,
+        [(instance.row, instance.seat)]
+    )
+
+
+@receiver(post_save, sender=Flight)
+def update_graph_flight(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(
+            lambda: flight_graph.update_flight(instance.pk)
+        )
+
+
+@receiver(post_delete, sender=Flight)
+def remove_graph_flight(sender, instance, **kwargs):
+    flight_id = instance.pk
+    transaction.on_commit(lambda: flight_graph.remove_flight(flight_id))
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def invalidate_flight_graph(sender, **kwargs):
+    transaction.on_commit(flight_graph.invalidate)
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def bump_model_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def touch_flight_crew(sender, instance, action, reverse, pk_set, **kwargs):
+    """Crew changes show up in flight responses, see ConditionalGetMixin."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        flights = Flight.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        flights = Flight.objects.filter(crew=instance)
+    else:
+        flights = Flight.objects.filter(pk__in=pk_set)
+    flights.update(updated_at=Now())
+    bump_version(Flight)
@@ -0,0 +1,207 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from airport.admin import EstimatedCountPaginator
+from airport.models import Crew, Flight, Order, Route, Ticket
+from airport.tests.tests_flight_api import sample_airplane, sample_flight
+
+
+class AdminTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_login(self.user)
+        self.airplane = sample_airplane(rows=10, seats_in_row=6)
+        self.departure_time = timezone.make_aware(datetime(2026, 1, 1, 10))
+        self.flights = []
+
+    def add_flights(self, count: int, tickets: int) -> Order:
+        """`count` more flights, with `tickets` tickets in one order."""
+        order = Order.objects.create(user=self.user)
+        for _ in range(count):
+            flight = sample_flight(
+                airplane=self.airplane,
+                departure_time=self.departure_time + timedelta(
+                    hours=len(self.flights)
+                )
+            )
+            self.flights.append(flight)
+            for i in range(tickets):
+                Ticket.objects.create(
+                    order=order,
+                    flight=flight,
+                    row=i // 6 + 1,
+                    seat=i % 6 + 1,
+                    passenger=f"Passenger {i}"
+                )
+        return order
+
+    def count_queries(self, url: str) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_grow_with_rows(self):
+        self.add_flights(2, 2)
+        urls = [
+            reverse(f"admin:airport_{model}_changelist")
+            for model in ("flight", "ticket", "order")
+        ]
+        counts = [self.count_queries(url) for url in urls]
+
+        self.add_flights(5, 6)
+
+        self.assertEqual([self.count_queries(url) for url in urls], counts)
+
+    def test_order_page_does_not_grow_with_tickets(self):
+        small = self.add_flights(1, 2)
+        large = self.add_flights(4, 6)
+
+        self.assertEqual(
+            self.count_queries(
+                reverse("admin:airport_order_change", args=[large.pk])
+            ),
+            self.count_queries(
+                reverse("admin:airport_order_change", args=[small.pk])
+            )
+        )
+
+    def test_flight_page_does_not_list_every_route(self):
+        self.add_flights(2, 0)
+        url = reverse("admin:airport_flight_change", args=[self.flights[0].pk])
+        count = self.count_queries(url)
+
+        self.add_flights(5, 0)
+
+        self.assertEqual(self.count_queries(url), count)
+
+    def test_flight_search_by_route_label_prefix(self):
+        self.add_flights(2, 0)
+        url = reverse("admin:airport_flight_changelist")
+
+        self.assertEqual(
+            self.client.get(url, {"q": "source("}).context["cl"].result_count,
+            2
+        )
+        # The destination airport and its city.
+        for search in ("destin", "cit"):
+            self.assertEqual(
+                self.client.get(url, {"q": search}).context["cl"].result_count,
+                2
+            )
+        # No substrings.
+        self.assertEqual(
+            self.client.get(url, {"q": "ination"}).context["cl"].result_count,
+            0
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn(
+            "route_label_upper_idx",
+            Route.objects.filter(label__istartswith="source(").explain()
+        )
+
+    def test_delete_tickets_releases_seats_per_flight(self):
+        self.add_flights(2, 6)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(
+                reverse("admin:airport_ticket_changelist"),
+                {
+                    "action": "delete_selected",
+                    "post": "yes",
+                    "_selected_action": list(
+                        Ticket.objects.values_list("id", flat=True)
+                    )
+                }
+            )
+
+        self.assertEqual(res.status_code, 302)
+        self.assertFalse(Ticket.objects.exists())
+        for flight in Flight.objects.all():
+            self.assertEqual(flight.tickets_available, 60)
+        self.assertEqual(
+            len([
+                query for query in queries
+                if query["sql"].startswith('UPDATE "airport_flight"')
+            ]),
+            2
+        )
+
+    def test_delete_orders_releases_seats(self):
+        order = self.add_flights(2, 3)
+
+        res = self.client.post(
+            reverse("admin:airport_order_changelist"),
+            {
+                "action": "delete_selected",
+                "post": "yes",
+                "_selected_action": [order.pk]
+            }
+        )
+
+        self.assertEqual(res.status_code, 302)
+        self.assertFalse(Ticket.objects.exists())
+        for flight in Flight.objects.all():
+            self.assertEqual(flight.tickets_available, 60)
+
+    def test_flight_edit_keeps_seats_booked_meanwhile(self):
+        self.add_flights(1, 0)
+        flight = self.flights[0]
+        flight.crew.add(Crew.objects.create(name="Olena", position="Pilot"))
+        url = reverse("admin:airport_flight_change", args=[flight.pk])
+        # Booked after the form was opened.
+        Flight.objects.occupy_seats(flight, [(1, 1)])
+
+        res = self.client.post(url, {
+            "route": flight.route_id,
+            "airplane": flight.airplane_id,
+            "departure_time_0": "2026-01-02",
+            "departure_time_1": "10:00:00",
+            "arrival_time_0": "2026-01-02",
+            "arrival_time_1": "12:00:00",
+            "crew": list(flight.crew.values_list("id", flat=True))
+        })
+
+        self.assertEqual(res.status_code, 302)
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 59)
+        self.assertEqual(flight.departure_time.day, 2)
+
+    def test_date_hierarchy_periods(self):
+        for hours in (0, 20, 24 * 40, 24 * 400):
+            sample_flight(
+                airplane=self.airplane,
+                departure_time=self.departure_time + timedelta(hours=hours)
+            )
+        flights = Flight.objects.all()
+
+        for kind in ("year", "month", "day"):
+            self.assertEqual(
+                flights.datetimes("departure_time", kind),
+                list(QuerySet.datetimes(flights, "departure_time", kind))
+            )
+        # One per day and one that finds no more rows.
+        with self.assertNumQueries(5):
+            flights.datetimes("departure_time", "day")
+
+    def test_estimated_count(self):
+        self.add_flights(1, 3)
+        tickets = Ticket.objects.order_by("id")
+
+        self.assertEqual(EstimatedCountPaginator(tickets, 100).count, 3)
+        with mock.patch("airport.admin.estimate_count", return_value=50000):
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    EstimatedCountPaginator(tickets, 100).count, 50000
+                )
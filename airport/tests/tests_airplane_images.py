@@ -0,0 +1,192 @@
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airplane
+from airport.renditions import generate_renditions, pick_rendition
+from airport.tests.tests_airplane_api import sample_airplane
+
+AIRPLANE_URL = reverse("airport:airplane-list")
+
+
+def upload_url(airplane_id):
+    return reverse("airport:airplane-upload-image", args=[airplane_id])
+
+
+def detail_url(airplane_id):
+    return reverse("airport:airplane-detail", args=[airplane_id])
+
+
+def image_file(width, height, image_format="JPEG", mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), "navy").save(buffer, image_format)
+    return SimpleUploadedFile(
+        f"plane.{image_format.lower()}",
+        buffer.getvalue(),
+        content_type=f"image/{image_format.lower()}"
+    )
+
+
+@override_settings(
+    AIRPLANE_IMAGE_WIDTHS=(160, 320, 640, 1280),
+    AIRPLANE_IMAGE_LIST_WIDTH=320,
+    AIRPLANE_IMAGE_WORKERS=0
+)
+class AirplaneImageTests(TestCase):
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "testpass",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.airplane = sample_airplane()
+
+    def upload(self, image, execute=True):
+        with self.captureOnCommitCallbacks(execute=execute) as callbacks:
+            res = self.client.post(
+                upload_url(self.airplane.id), {"image": image},
+                format="multipart"
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.airplane.refresh_from_db()
+        return res, callbacks
+
+    def test_upload_renders_after_commit(self):
+        res, callbacks = self.upload(image_file(2000, 1000), execute=False)
+
+        self.assertTrue(self.airplane.image)
+        self.assertEqual(self.airplane.image_renditions, [])
+        self.assertIn("image", res.data)
+
+        for callback in callbacks:
+            callback()
+        self.airplane.refresh_from_db()
+        self.assertEqual(len(self.airplane.image_renditions), 8)
+
+    def test_renditions(self):
+        self.upload(image_file(2000, 1000))
+
+        renditions = self.airplane.image_renditions
+        self.assertEqual(
+            sorted((r["format"], r["width"], r["height"]) for r in renditions),
+            [
+                ("jpeg", 160, 80), ("jpeg", 320, 160),
+                ("jpeg", 640, 320), ("jpeg", 1280, 640),
+                ("webp", 160, 80), ("webp", 320, 160),
+                ("webp", 640, 320), ("webp", 1280, 640),
+            ]
+        )
+        for rendition in renditions:
+            self.assertTrue(default_storage.exists(rendition["name"]))
+            with default_storage.open(rendition["name"]) as file:
+                image = Image.open(file)
+                self.assertEqual(
+                    (image.format.lower(), image.width),
+                    (rendition["format"], rendition["width"])
+                )
+
+    def test_rendition_names_hash_content(self):
+        self.upload(image_file(800, 600))
+        first = {r["name"] for r in self.airplane.image_renditions}
+
+        self.upload(image_file(800, 600, image_format="PNG"))
+        second = {r["name"] for r in self.airplane.image_renditions}
+
+        self.assertEqual(len(first), 6)
+        self.assertEqual(
+            {name.rsplit("-", 1)[1] for name in first},
+            {name.rsplit("-", 1)[1] for name in second}
+        )
+
+    def test_small_image_keeps_its_width(self):
+        self.upload(image_file(100, 50, image_format="PNG", mode="RGBA"))
+
+        self.assertEqual(
+            sorted((r["format"], r["width"])
+                   for r in self.airplane.image_renditions),
+            [("jpeg", 100), ("webp", 100)]
+        )
+
+    def test_list_returns_smallest_suitable_rendition(self):
+        self.upload(image_file(2000, 1000))
+
+        res = self.client.get(AIRPLANE_URL)
+        wide = self.client.get(AIRPLANE_URL, {"image_width": 1000})
+
+        self.assertRegex(
+            res.data["results"][0]["image"],
+            r"^http://testserver/media/.*-320w-[0-9a-f]+\.webp$"
+        )
+        self.assertRegex(wide.data["results"][0]["image"], r"-1280w-")
+
+    def test_list_falls_back_to_upload_until_rendered(self):
+        self.upload(image_file(2000, 1000), execute=False)
+
+        res = self.client.get(AIRPLANE_URL)
+
+        self.assertTrue(
+            res.data["results"][0]["image"].endswith(self.airplane.image.name)
+        )
+
+    def test_detail_lists_renditions(self):
+        self.upload(image_file(400, 200))
+
+        res = self.client.get(detail_url(self.airplane.id))
+
+        self.assertEqual(len(res.data["image_renditions"]), 4)
+        self.assertTrue(
+            res.data["image_renditions"][0]["url"].startswith("http://")
+        )
+
+    def test_stale_job_does_not_overwrite_newer_image(self):
+        self.upload(image_file(400, 200), execute=False)
+        old_name = self.airplane.image.name
+        self.upload(image_file(800, 400))
+
+        generate_renditions(Airplane, self.airplane.id, old_name)
+
+        self.airplane.refresh_from_db()
+        self.assertEqual(
+            max(r["width"] for r in self.airplane.image_renditions), 640
+        )
+
+    def test_other_saves_keep_renditions(self):
+        self.upload(image_file(400, 200))
+
+        self.airplane.name = "Renamed"
+        self.airplane.save()
+
+        self.airplane.refresh_from_db()
+        self.assertEqual(len(self.airplane.image_renditions), 4)
+
+    def test_pick_rendition(self):
+        renditions = [
+            {"width": width, "format": image_format}
+            for width in (160, 640)
+            for image_format in ("webp", "jpeg")
+        ]
+
+        self.assertEqual(pick_rendition(renditions, 100)["width"], 160)
+        self.assertEqual(pick_rendition(renditions, 161)["width"], 640)
+        self.assertEqual(pick_rendition(renditions, 2000)["width"], 640)
+        self.assertEqual(
+            pick_rendition(renditions, 100, "jpeg")["format"], "jpeg"
+        )
+        self.assertIsNone(pick_rendition([], 100))
@@ -0,0 +1,119 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Crew
+from airport.tests.tests_flight_api import sample_airplane, sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+ROUTE_URL = reverse("airport:route-list")
+AIRPORT_URL = reverse("airport:airport-list")
+
+
+def flight_detail_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client = AsyncClient()
+        self.token = str(AccessToken.for_user(self.user))
+        self.flight = sample_flight()
+        self.flight.crew.add(
+            Crew.objects.create(name="Jane", position="Pilot")
+        )
+
+    def get(self, url, data=None, **headers):
+        # AsyncClient(headers=...) does not reach the ASGI scope here.
+        headers["Authorization"] = f"Bearer {self.token}"
+        return self.client.get(url, data, headers=headers)
+
+    def test_read_endpoints_are_async(self):
+        for url in (
+            FLIGHT_URL, flight_detail_url(self.flight.id),
+            ROUTE_URL, AIRPORT_URL
+        ):
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(url).func))
+
+    async def test_flight_list(self):
+        res = await self.get(FLIGHT_URL, {"seat_map": "expanded"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        flight = res.json()["results"][0]
+        self.assertEqual(flight["id"], self.flight.id)
+        self.assertEqual(flight["crew"][0]["name"], "Jane")
+        self.assertEqual(flight["route"], str(self.flight.route))
+        self.assertEqual(flight["seat_map"]["taken_seats"], [])
+
+    async def test_flight_list_cursor_pages(self):
+        res = await self.get(
+            FLIGHT_URL, {"pagination": "cursor", "count": "exact"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 1)
+        self.assertIsNone(res.json()["next"])
+
+    async def test_flight_detail(self):
+        res = await self.get(flight_detail_url(self.flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["route"]["id"], self.flight.route_id)
+        self.assertEqual(len(res.json()["crew"]), 1)
+
+    async def test_flight_detail_not_found(self):
+        for flight_id in (self.flight.id + 100, "abc"):
+            res = await self.get(f"{FLIGHT_URL}{flight_id}/")
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_flight_list_conditional_get(self):
+        res = await self.get(FLIGHT_URL)
+
+        res = await self.get(
+            FLIGHT_URL, **{"If-None-Match": res["ETag"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_route_and_airport_lists(self):
+        routes = await self.get(ROUTE_URL)
+        airports = await self.get(AIRPORT_URL)
+
+        self.assertEqual(routes.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            routes.json()["results"][0]["source"],
+            self.flight.route.source.name
+        )
+        self.assertEqual(airports.status_code, status.HTTP_200_OK)
+        self.assertEqual(airports.json()["count"], 2)
+
+    async def test_unauthenticated_request_is_rejected(self):
+        res = await AsyncClient().get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_writes_keep_the_sync_view(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        res = client.post(FLIGHT_URL, {
+            "route": self.flight.route_id,
+            "airplane": sample_airplane().id,
+            "departure_time": "2026-02-01T10:00:00Z",
+            "arrival_time": "2026-02-01T12:00:00Z",
+            "crew": [self.flight.crew.get().id],
+        }, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
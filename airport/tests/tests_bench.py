@@ -0,0 +1,127 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from airport.bench import BENCH_EMAIL, SCENARIOS, compare
+from airport.models import Order, Ticket
+from airport.tests.tests_seed_airport import seed
+
+
+def scenario_result(p50_ms=10, p95_ms=20, p99_ms=30, queries=3, rps=50):
+    return {
+        "p50_ms": p50_ms,
+        "p95_ms": p95_ms,
+        "p99_ms": p99_ms,
+        "queries": queries,
+        "throughput_rps": rps,
+    }
+
+
+class BenchCommandTests(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.output = os.path.join(directory, "results.json")
+        self.baseline = os.path.join(directory, "baseline.json")
+
+    def bench(self, *args) -> str:
+        out = StringIO()
+        call_command(
+            "bench",
+            "--requests=2",
+            "--warmup=0",
+            f"--output={self.output}",
+            f"--baseline={self.baseline}",
+            *args,
+            stdout=out,
+            stderr=StringIO()
+        )
+        return out.getvalue()
+
+    def write_baseline(self, **result) -> None:
+        with open(self.baseline, "w") as file:
+            json.dump({"scenarios": {
+                name: scenario_result(**result) for name in SCENARIOS
+            }}, file)
+
+    def test_results_and_baseline(self):
+        seed()
+        orders, tickets = Order.objects.count(), Ticket.objects.count()
+
+        out = self.bench("--update-baseline")
+
+        with open(self.output) as file:
+            results = json.load(file)
+        with open(self.baseline) as file:
+            self.assertEqual(json.load(file), results)
+        self.assertEqual(set(results["scenarios"]), set(SCENARIOS))
+        for name, result in results["scenarios"].items():
+            self.assertIn(name, out)
+            self.assertGreater(result["queries"], 0)
+            self.assertGreater(result["throughput_rps"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        # Everything the run created is rolled back.
+        self.assertEqual(Order.objects.count(), orders)
+        self.assertEqual(Ticket.objects.count(), tickets)
+        self.assertFalse(
+            get_user_model().objects.filter(email=BENCH_EMAIL).exists()
+        )
+
+    def test_compares_with_baseline(self):
+        seed()
+        self.write_baseline(p50_ms=1e6, p95_ms=1e6, p99_ms=1e6, rps=0.001,
+                            queries=100)
+        self.assertIn("Within 25% of the baseline", self.bench(
+            "--scenario=flight-detail", "--scenario=ticket-list"
+        ))
+
+        self.write_baseline(queries=0.1, rps=1e6)
+        with self.assertRaisesMessage(
+            CommandError, "flight-detail: queries"
+        ):
+            self.bench("--scenario=flight-detail")
+
+    def test_empty_database(self):
+        with self.assertRaisesMessage(CommandError, "seed_airport"):
+            self.bench()
+        self.assertFalse(os.path.exists(self.output))
+
+
+class CompareTests(TestCase):
+    def test_tolerance(self):
+        baseline = {"scenarios": {"flight-detail": scenario_result()}}
+
+        def regressions(**result):
+            return compare(
+                {"scenarios": {"flight-detail": scenario_result(**result)}},
+                baseline,
+                0.25
+            )
+
+        self.assertEqual(regressions(p95_ms=25, rps=40), [])
+        self.assertEqual(
+            regressions(p95_ms=25.1),
+            ["flight-detail: p95_ms 25.1 > 20"]
+        )
+        self.assertEqual(
+            regressions(rps=39.9),
+            ["flight-detail: throughput_rps 39.9 < 50"]
+        )
+        self.assertEqual(regressions(queries=3.5), [])
+        self.assertEqual(
+            regressions(queries=3.6),
+            ["flight-detail: queries 3.6 > 3"]
+        )
+        # Scenarios missing from the baseline are not compared.
+        self.assertEqual(compare(
+            {"scenarios": {"token-obtain": scenario_result(queries=9)}},
+            baseline,
+            0.25
+        ), [])
@@ -0,0 +1,183 @@
+import random
+import threading
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport.booking import SeatsTaken, book_tickets
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Flight,
+    Order,
+    Route,
+    Ticket
+)
+from airport.serializers import OrderSerializer
+
+TICKET_URL = reverse("airport:ticket-list")
+
+
+def sample_flight(rows=10, seats_in_row=6):
+    city = City.objects.create(name="City")
+    airport = Airport.objects.create(name="Airport", closest_big_city=city)
+    departure_time = timezone.make_aware(datetime(2026, 1, 1, 10))
+    return Flight.objects.create(
+        route=Route.objects.create(
+            source=airport, destination=airport, distance=500
+        ),
+        airplane=Airplane.objects.create(
+            name="Airplane Name",
+            rows=rows,
+            seats_in_row=seats_in_row,
+            airplane_type=AirplaneType.objects.create(name="Type1")
+        ),
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=2)
+    )
+
+
+def create_order(user, flight, seats):
+    request = APIRequestFactory().post("/")
+    request.user = user
+    serializer = OrderSerializer(
+        data={
+            "tickets": [
+                {"passenger": "Passenger", "row": row, "seat": seat,
+                 "flight": flight.id}
+                for row, seat in seats
+            ]
+        },
+        context={"request": request}
+    )
+    serializer.is_valid(raise_exception=True)
+    return serializer.save(user=user)
+
+
+def run_concurrent_bookings(create_order, flight, users, attempts):
+    """
+    Book random seat pairs on one flight from one thread per user.
+    Returns the number of orders created, rejected as taken and failed
+    with another database error (e.g. a deadlock).
+    """
+    counts = {"sold": 0, "taken": 0, "failed": 0}
+    lock = threading.Lock()
+    capacity = flight.airplane.rows * flight.airplane.seats_in_row
+
+    def worker(user, seed):
+        generator = random.Random(seed)
+        try:
+            for _ in range(attempts):
+                seats = [
+                    divmod(position, flight.airplane.seats_in_row)
+                    for position in generator.sample(range(capacity), 2)
+                ]
+                seats = [(row + 1, seat + 1) for row, seat in seats]
+                try:
+                    create_order(user, flight, seats)
+                    outcome = "sold"
+                except SeatsTaken:
+                    outcome = "taken"
+                except DatabaseError:
+                    outcome = "failed"
+                with lock:
+                    counts[outcome] += 1
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(user, seed))
+        for seed, user in enumerate(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+class BookTicketsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_integrity_error_reports_conflicting_seats(self):
+        create_order(self.user, self.flight, [(1, 1), (2, 2)])
+        order = Order.objects.create(user=self.user)
+
+        with self.assertRaises(SeatsTaken) as context:
+            with transaction.atomic():
+                book_tickets(order, [
+                    {"passenger": "A", "flight": self.flight,
+                     "row": row, "seat": seat}
+                    for row, seat in ((2, 2), (3, 3), (1, 1))
+                ])
+
+        self.assertEqual(
+            context.exception.seats,
+            [
+                {"flight": self.flight.id, "row": 1, "seat": 1},
+                {"flight": self.flight.id, "row": 2, "seat": 2},
+            ]
+        )
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_same_seat_on_other_flight_can_be_booked(self):
+        other_flight = sample_flight()
+
+        create_order(self.user, self.flight, [(1, 1)])
+        create_order(self.user, other_flight, [(1, 1)])
+
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_ticket_create_conflict(self):
+        create_order(self.user, self.flight, [(4, 5)])
+        payload = {
+            "passenger": "A", "flight": self.flight.id, "row": 4, "seat": 5
+        }
+
+        res = self.client.post(TICKET_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"flight": self.flight.id, "row": 4, "seat": 5}]
+        )
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    def test_concurrent_bookings_never_double_sell(self):
+        flight = sample_flight()
+        users = [
+            get_user_model().objects.create_user(
+                f"user{i}@test.com", "testpass"
+            )
+            for i in range(12)
+        ]
+
+        counts = run_concurrent_bookings(create_order, flight, users, 25)
+        flight.refresh_from_db()
+        seats = list(
+            Ticket.objects.filter(flight=flight).values_list("row", "seat")
+        )
+
+        self.assertEqual(counts["sold"] + counts["taken"], 300)
+        self.assertEqual(counts["failed"], 0)
+        self.assertGreater(counts["taken"], 0)
+        self.assertEqual(len(seats), len(set(seats)))
+        self.assertEqual(len(seats), counts["sold"] * 2)
+        self.assertEqual(flight.tickets_available, 60 - len(seats))
+        self.assertEqual(sorted(flight.taken_seats), sorted(seats))
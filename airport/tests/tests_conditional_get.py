@@ -0,0 +1,160 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import parse_http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Flight, ModelVersion, Order, Ticket
+from airport.tests.tests_flight_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+ROUTE_URL = reverse("airport:route-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def flight_detail_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def get(self, url, etag=None, **headers):
+        if etag:
+            headers["HTTP_IF_NONE_MATCH"] = etag
+        return self.client.get(url, **headers)
+
+    def test_list_sends_validators(self):
+        res = self.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertRegex(res["ETag"], r'^"[0-9a-f]{40}"$')
+        self.assertIn("Last-Modified", res)
+
+    def test_matching_etag_returns_304_before_the_list_query(self):
+        etag = self.get(FLIGHT_URL)["ETag"]
+
+        # The model versions only.
+        with self.assertNumQueries(1):
+            res = self.get(FLIGHT_URL, etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        self.assertEqual(res.content, b"")
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.get(FLIGHT_URL)["Last-Modified"]
+
+        res = self.get(FLIGHT_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_booking_changes_flight_list_etag(self):
+        etag = self.get(FLIGHT_URL)["ETag"]
+
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            order=order, flight=self.flight, row=1, seat=1, passenger="Jane"
+        )
+
+        res = self.get(FLIGHT_URL, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_change_made_by_another_process_changes_etag(self):
+        etag = self.get(FLIGHT_URL)["ETag"]
+
+        # What the hold sweeper or another worker leaves behind: the row
+        # and the versions table changed, this process untouched.
+        Flight.objects.filter(pk=self.flight.pk).update(tickets_available=0)
+        ModelVersion.objects.update_or_create(
+            label="airport.flight", defaults={"version": time.time_ns()}
+        )
+
+        res = self.get(FLIGHT_URL, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 0)
+
+    def test_related_change_changes_list_etag(self):
+        etag = self.get(ROUTE_URL)["ETag"]
+
+        source = self.flight.route.source
+        source.name = "Renamed"
+        source.save()
+
+        self.assertEqual(
+            self.get(ROUTE_URL, etag).status_code, status.HTTP_200_OK
+        )
+
+    def test_query_string_changes_etag(self):
+        etag = self.get(FLIGHT_URL)["ETag"]
+
+        res = self.client.get(
+            FLIGHT_URL, {"limit": 1}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_ignores_changes_of_other_flights(self):
+        other = sample_flight()
+        url = flight_detail_url(self.flight.id)
+        etag = self.get(url)["ETag"]
+
+        other.departure_time = other.departure_time.replace(hour=12)
+        other.save()
+
+        # The flight's updated_at and the model versions.
+        with self.assertNumQueries(2):
+            res = self.get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_follows_flight_and_crew_changes(self):
+        url = flight_detail_url(self.flight.id)
+        etag = self.get(url)["ETag"]
+
+        self.flight.crew.add(
+            Crew.objects.create(name="Jane", position="Pilot")
+        )
+
+        res = self.get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["crew"]), 1)
+
+        etag = res["ETag"]
+        Flight.objects.get(pk=self.flight.pk).save()
+        self.assertEqual(self.get(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_detail_last_modified_is_updated_at(self):
+        res = self.get(flight_detail_url(self.flight.id))
+
+        self.flight.refresh_from_db()
+        self.assertGreaterEqual(
+            parse_http_date(res["Last-Modified"]),
+            int(self.flight.updated_at.timestamp())
+        )
+
+    def test_missing_detail_has_no_etag(self):
+        res = self.get(flight_detail_url(self.flight.id + 100))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", res)
+
+    def test_etag_depends_on_user(self):
+        etag = self.get(ORDER_URL)["ETag"]
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "testpass")
+        )
+
+        self.assertEqual(
+            self.get(ORDER_URL, etag).status_code, status.HTTP_200_OK
+        )
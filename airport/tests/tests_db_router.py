@@ -0,0 +1,190 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.test import (
+    AsyncClient,
+    TransactionTestCase,
+    override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.cache import get_cache
+from airport.db_router import (
+    ReplicaRouter,
+    RequestRouting,
+    _request_routing,
+    is_pinned
+)
+from airport.models import Airport, City
+
+REPLICA = "replica"
+CITY_URL = reverse("airport:city-list")
+AIRPORT_URL = reverse("airport:airport-list")
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The replica is a second Postgres test database that never receives
+    the primary's writes: whatever a request reads tells which database
+    it read from, as with a replica that lags behind.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        default = connections["default"].settings_dict
+        settings.DATABASES[REPLICA] = {
+            **default,
+            "TEST": {**default["TEST"], "NAME": f"{default['NAME']}_{REPLICA}"}
+        }
+        connections[REPLICA].creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].creation.destroy_test_db(
+            connections["default"].settings_dict["NAME"], verbosity=0
+        )
+        del connections[REPLICA]
+        del settings.DATABASES[REPLICA]
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        # Only the databases the test case knew of at start are flushed.
+        self.addCleanup(
+            call_command,
+            "flush", database=REPLICA, interactive=False, verbosity=0
+        )
+        # Not while the replica is migrated or flushed, the router skips
+        # replicas.
+        self.enterContext(override_settings(DATABASE_REPLICAS=[REPLICA]))
+        get_cache().clear()
+        # The cache table is not flushed with the models' tables.
+        self.addCleanup(caches[settings.REPLICA_PIN_CACHE_ALIAS].clear)
+        self.staff = get_user_model().objects.create_user(
+            "staff@test.com", "testpass", is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "testpass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+        City.objects.create(name="Primary")
+        City.objects.using(REPLICA).create(name="Replica")
+
+    def tearDown(self) -> None:
+        get_cache().clear()
+
+    def city_names(self, user=None) -> list:
+        client = self.client
+        if user is not None:
+            client = APIClient()
+            client.force_authenticate(user)
+        res = client.get(CITY_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [city["name"] for city in res.data["results"]]
+
+    def test_safe_requests_read_from_the_replica(self):
+        self.assertEqual(self.city_names(), ["Replica"])
+
+        # The async airport list too.
+        Airport.objects.using(REPLICA).create(
+            name="Boryspil",
+            closest_big_city=City.objects.using(REPLICA).get()
+        )
+        res = self.client.get(AIRPORT_URL)
+        self.assertEqual(
+            [airport["name"] for airport in res.data["results"]], ["Boryspil"]
+        )
+
+    def test_writes_go_to_the_primary(self):
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            res = self.client.post(CITY_URL, {"name": "Lviv"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(City.objects.filter(name="Lviv").exists())
+        self.assertEqual(len(replica_queries), 0)
+
+    def test_writer_reads_the_primary(self):
+        self.client.post(CITY_URL, {"name": "Lviv"})
+
+        self.assertTrue(is_pinned(self.staff.pk))
+        self.assertEqual(self.city_names(), ["Lviv", "Primary"])
+        # Other users get the response the writer read from the primary
+        # from the cache, or else read the replica.
+        self.assertEqual(self.city_names(self.user), ["Lviv", "Primary"])
+        get_cache().clear()
+        self.assertEqual(self.city_names(self.user), ["Replica"])
+
+    def test_pins_are_shared_by_processes(self):
+        self.client.post(CITY_URL, {"name": "Lviv"})
+
+        # Another worker reads the pin from the primary's cache table.
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM airport_cache")
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    async def test_async_writer_is_pinned(self):
+        token = AccessToken.for_user(self.staff)
+        res = await AsyncClient().post(
+            CITY_URL, {"name": "Lviv"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await sync_to_async(is_pinned)(self.staff.pk))
+
+    def test_no_pins_without_replicas(self):
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.client.post(CITY_URL, {"name": "Lviv"})
+
+        self.assertFalse(is_pinned(self.staff.pk))
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_sticky_window(self):
+        self.client.post(CITY_URL, {"name": "Lviv"})
+
+        self.assertFalse(is_pinned(self.staff.pk))
+        self.assertEqual(self.city_names(), ["Replica"])
+
+    def test_failed_writes_do_not_pin(self):
+        res = self.client.post(CITY_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.city_names(), ["Replica"])
+
+    def test_lagging_replica_responses_are_not_cached(self):
+        res = self.client.get(CITY_URL)
+        self.assertNotIn("ETag", res)
+        self.assertEqual(self.client.get(CITY_URL)["X-Cache"], "MISS")
+
+        with override_settings(REPLICA_MAX_LAG_SECONDS=0):
+            res = self.client.get(CITY_URL)
+            self.assertIn("ETag", res)
+            self.assertEqual(self.client.get(CITY_URL)["X-Cache"], "HIT")
+
+    def test_router(self):
+        router = ReplicaRouter()
+        # Outside a request everything uses the primary.
+        self.assertIsNone(router.db_for_read(City))
+        self.assertEqual(router.db_for_write(City), "default")
+        self.assertFalse(router.allow_migrate(REPLICA, "airport"))
+        self.assertIsNone(router.allow_migrate("default", "airport"))
+
+        routing = RequestRouting()
+        routing.replica = REPLICA
+        token = _request_routing.set(routing)
+        self.addCleanup(_request_routing.reset, token)
+        self.assertEqual(router.db_for_read(City), REPLICA)
+        # Pins are read from the primary, where they are written.
+        self.assertIsNone(router.db_for_read(
+            caches[settings.REPLICA_PIN_CACHE_ALIAS].cache_model_class
+        ))
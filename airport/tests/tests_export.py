@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Order, Ticket
+from airport.tests.tests_flight_api import sample_flight
+
+FLIGHT_EXPORT_URL = reverse("airport:flight-export")
+TICKET_EXPORT_URL = reverse("airport:ticket-export")
+ORDER_EXPORT_URL = reverse("airport:order-export")
+
+
+def create_order(user, flight, seats):
+    order = Order.objects.create(user=user)
+    for row, seat in seats:
+        Ticket.objects.create(
+            order=order, flight=flight, row=row, seat=seat, passenger="P"
+        )
+    return order
+
+
+class ExportTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.other_flight = sample_flight(
+            departure_time=self.flight.departure_time + timedelta(days=1),
+            arrival_time=self.flight.arrival_time + timedelta(days=1),
+        )
+
+    def export(self, url, params=None, **headers):
+        res = self.client.get(url, params, **headers)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return res, b"".join(res.streaming_content).decode()
+
+    def ndjson(self, url, params=None):
+        _, body = self.export(url, params)
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_flight_export_ndjson(self):
+        res, _ = self.export(FLIGHT_EXPORT_URL)
+        rows = self.ndjson(FLIGHT_EXPORT_URL)
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [self.flight.id, self.other_flight.id]
+        )
+        self.assertEqual(rows[0]["source"], self.flight.route.source.name)
+        self.assertEqual(rows[0]["tickets_available"], 12)
+        self.assertEqual(
+            parse_datetime(rows[0]["departure_time"]),
+            self.flight.departure_time
+        )
+
+    def test_flight_export_csv(self):
+        res, body = self.export(
+            FLIGHT_EXPORT_URL,
+            {"export_format": "csv"},
+            HTTP_ACCEPT="text/csv"
+        )
+        rows = list(csv.reader(io.StringIO(body)))
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertIn('filename="flights.csv"', res["Content-Disposition"])
+        self.assertEqual(rows[0][:3], ["id", "route", "source"])
+        self.assertEqual(len(rows), 3)
+
+    def test_rows_are_read_while_streaming(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(FLIGHT_EXPORT_URL)
+
+        with self.assertNumQueries(1):
+            lines = list(res.streaming_content)
+        self.assertEqual(len(lines), 2)
+
+    async def test_asgi_export_streams_asynchronously(self):
+        # A sync iterator would be read whole before the first byte is sent.
+        token = AccessToken.for_user(self.user)
+        res = await AsyncClient().get(
+            FLIGHT_EXPORT_URL, headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertTrue(res.is_async)
+        body = b"".join([part async for part in res.streaming_content])
+        self.assertEqual(
+            [json.loads(line)["id"] for line in body.splitlines()],
+            [self.flight.id, self.other_flight.id]
+        )
+
+    def test_flight_export_uses_list_filters(self):
+        rows = self.ndjson(
+            FLIGHT_EXPORT_URL,
+            {"departure_after": self.other_flight.departure_time.date()}
+        )
+
+        self.assertEqual([row["id"] for row in rows], [self.other_flight.id])
+
+    def test_ticket_and_order_exports_are_scoped_to_user(self):
+        order = create_order(self.user, self.flight, [(1, 1), (1, 2)])
+        other_user = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        create_order(other_user, self.flight, [(2, 1)])
+
+        tickets = self.ndjson(TICKET_EXPORT_URL)
+        orders = self.ndjson(ORDER_EXPORT_URL)
+
+        self.assertEqual(
+            sorted((row["row"], row["seat"]) for row in tickets),
+            [(1, 1), (1, 2)]
+        )
+        self.assertEqual({row["order"] for row in tickets}, {order.id})
+        self.assertEqual(orders, [{
+            "id": order.id,
+            "created_at": orders[0]["created_at"],
+            "tickets": 2,
+        }])
+
+    def test_unknown_format_returns_400(self):
+        res = self.client.get(FLIGHT_EXPORT_URL, {"export_format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("export_format", res.data)
+
+    def test_export_requires_authentication(self):
+        self.client.force_authenticate(None)
+
+        res = self.client.get(TICKET_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,249 @@
+import base64
+from datetime import datetime, timedelta
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Flight,
+    Order,
+    Route,
+    Ticket
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def sample_airport(**params):
+    defaults = {
+        "name": "Airport",
+        "closest_big_city": City.objects.create(name="City"),
+    }
+    defaults.update(params)
+    return Airport.objects.create(**defaults)
+
+
+def sample_airplane(**params):
+    defaults = {
+        "name": "Airplane Name",
+        "rows": 3,
+        "seats_in_row": 4,
+        "airplane_type": AirplaneType.objects.create(name="Type1"),
+    }
+    defaults.update(params)
+    return Airplane.objects.create(**defaults)
+
+
+def sample_flight(**params):
+    departure_time = timezone.make_aware(datetime(2026, 1, 1, 10))
+    defaults = {
+        "route": Route.objects.create(
+            source=sample_airport(name="Source"),
+            destination=sample_airport(name="Destination"),
+            distance=500
+        ),
+        "airplane": sample_airplane(),
+        "departure_time": departure_time,
+        "arrival_time": departure_time + timedelta(hours=2),
+    }
+    defaults.update(params)
+    return Flight.objects.create(**defaults)
+
+
+def decode_seat_map(seat_map):
+    bitmap = base64.b64decode(seat_map["bitmap"])
+    return {
+        (position // seat_map["seats_in_row"] + 1,
+         position % seat_map["seats_in_row"] + 1)
+        for position in range(len(bitmap) * 8)
+        if bitmap[position >> 3] >> (position & 7) & 1
+    }
+
+
+class FlightSeatMapTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.user)
+
+    def book(self, row, seat):
+        return Ticket.objects.create(
+            passenger="Passenger",
+            flight=self.flight,
+            order=self.order,
+            row=row,
+            seat=seat
+        )
+
+    def test_new_flight_has_empty_seat_map(self):
+        self.assertEqual(bytes(self.flight.seat_map), bytes(2))
+
+    def test_seat_map_follows_ticket_create_and_delete(self):
+        self.book(1, 1)
+        ticket = self.book(3, 4)
+        self.book(2, 3)
+        ticket.delete()
+
+        res = self.client.get(FLIGHT_URL)
+        seat_map = res.data["results"][0]["seat_map"]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(seat_map["rows"], 3)
+        self.assertEqual(seat_map["seats_in_row"], 4)
+        self.assertEqual(decode_seat_map(seat_map), {(1, 1), (2, 3)})
+        self.assertNotIn("taken_seats", seat_map)
+
+    def test_seat_map_expanded(self):
+        self.book(2, 1)
+
+        res = self.client.get(FLIGHT_URL, {"seat_map": "expanded"})
+
+        self.assertEqual(
+            res.data["results"][0]["seat_map"]["taken_seats"],
+            ["row:2 seat:1"]
+        )
+
+    def test_seat_map_rebuilt_on_airplane_change(self):
+        self.book(2, 2)
+        self.flight.airplane = sample_airplane(rows=2, seats_in_row=2)
+        self.flight.save()
+
+        self.flight.refresh_from_db()
+        self.assertEqual(list(self.flight.taken_seats), [(2, 2)])
+        self.assertEqual(bytes(self.flight.seat_map), bytes([0b1000]))
+
+    def test_seat_map_rebuilt_on_airplane_resize(self):
+        self.book(2, 2)
+        airplane = Airplane.objects.get(pk=self.flight.airplane_id)
+        airplane.seats_in_row = 2
+        airplane.save()
+
+        self.flight.refresh_from_db()
+        self.assertEqual(list(self.flight.taken_seats), [(2, 2)])
+        self.assertEqual(self.flight.tickets_available, 5)
+
+    def test_save_keeps_seats_booked_after_load(self):
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.book(1, 2)
+
+        flight.departure_time += timedelta(hours=1)
+        flight.save()
+
+        flight.refresh_from_db()
+        self.assertEqual(list(flight.taken_seats), [(1, 2)])
+        self.assertEqual(flight.tickets_available, 11)
+
+    def test_flight_list_does_not_load_tickets(self):
+        self.book(1, 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(FLIGHT_URL)
+
+        for query in queries.captured_queries:
+            self.assertNotIn('"airport_ticket"."seat"', query["sql"])
+
+
+class FlightTicketsAvailableTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_new_flight_has_full_capacity(self):
+        self.assertEqual(self.flight.tickets_available, 12)
+
+    def test_order_create_updates_tickets_available(self):
+        payload = {
+            "tickets": [
+                {"passenger": "A", "row": 1, "seat": 1,
+                 "flight": self.flight.id},
+                {"passenger": "B", "row": 1, "seat": 2,
+                 "flight": self.flight.id},
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.flight.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.flight.tickets_available, 10)
+
+    def test_ticket_destroy_updates_tickets_available(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            passenger="A", flight=self.flight, order=order, row=1, seat=1
+        )
+        order.delete()
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.tickets_available, 12)
+
+    def test_ticket_queryset_delete_releases_seats(self):
+        order = Order.objects.create(user=self.user)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                passenger="A", flight=self.flight, order=order,
+                row=1, seat=seat
+            )
+
+        Ticket.objects.filter(order=order).delete()
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.tickets_available, 12)
+        self.assertEqual(list(self.flight.taken_seats), [])
+
+    def test_release_counts_only_taken_seats(self):
+        Flight.objects.occupy_seats(self.flight, [(1, 1)])
+
+        Flight.objects.release_seats(self.flight, [(1, 1), (1, 1), (2, 2)])
+        Flight.objects.release_seats(self.flight, [(1, 1)])
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.tickets_available, 12)
+        self.assertEqual(list(self.flight.taken_seats), [])
+
+    def test_flight_list_has_no_ticket_aggregate(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 12)
+        for query in queries.captured_queries:
+            self.assertNotIn("GROUP BY", query["sql"])
+
+    def test_reconcile_flight_seats_fixes_drift(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            passenger="A", flight=self.flight, order=order, row=3, seat=1
+        )
+        Flight.objects.update(tickets_available=0, seat_map=bytes(2))
+
+        out = StringIO()
+        call_command("reconcile_flight_seats", stdout=out)
+        self.flight.refresh_from_db()
+
+        self.assertIn("fixed 1 with drift", out.getvalue())
+        self.assertEqual(self.flight.tickets_available, 11)
+        self.assertEqual(list(self.flight.taken_seats), [(3, 1)])
@@ -0,0 +1,215 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport.models import Flight, Route
+from airport.tests.tests_flight_api import (
+    sample_airplane,
+    sample_airport,
+    sample_flight,
+)
+from airport.views import FlightViewSet
+
+FLIGHT_URL = reverse("airport:flight-list")
+START = timezone.make_aware(datetime(2026, 1, 1, 10))
+
+
+class FlightFilterTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.morning = sample_flight()
+        self.evening = sample_flight(
+            departure_time=START + timedelta(hours=10),
+            arrival_time=START + timedelta(hours=14),
+        )
+        self.next_day = sample_flight(
+            departure_time=START + timedelta(days=1),
+            arrival_time=START + timedelta(days=1, hours=2),
+        )
+
+    def assert_flights(self, params, expected):
+        res = self.client.get(FLIGHT_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [flight["id"] for flight in res.data["results"]],
+            [flight.id for flight in expected]
+        )
+
+    def test_filter_by_departure_window(self):
+        self.assert_flights(
+            {
+                "departure_after": "2026-01-01T12:00:00Z",
+                "departure_before": "2026-01-02",
+            },
+            [self.evening]
+        )
+
+    def test_filter_by_departure_date(self):
+        self.assert_flights(
+            {"departure_after": "2026-01-02"},
+            [self.next_day]
+        )
+
+    def test_filter_by_arrival_window(self):
+        self.assert_flights(
+            {"arrival_after": "2026-01-01T13:00:00Z"},
+            [self.evening, self.next_day]
+        )
+        self.assert_flights(
+            {"arrival_before": "2026-01-01T13:00:00Z"},
+            [self.morning]
+        )
+
+    def test_filter_by_cities(self):
+        route = self.evening.route
+
+        self.assert_flights(
+            {"source_city": route.source.closest_big_city_id},
+            [self.evening]
+        )
+        self.assert_flights(
+            {"destination_city": route.destination.closest_big_city_id},
+            [self.evening]
+        )
+
+    def test_filter_by_airplane_type(self):
+        self.assert_flights(
+            {"airplane_type": self.next_day.airplane.airplane_type_id},
+            [self.next_day]
+        )
+
+    def test_filter_by_min_available(self):
+        Flight.objects.filter(pk=self.morning.pk).update(tickets_available=0)
+
+        self.assert_flights(
+            {"min_available": 1},
+            [self.evening, self.next_day]
+        )
+        self.assert_flights({"min_available": 13}, [])
+
+    def test_invalid_filter_returns_400(self):
+        for params in (
+            {"departure_after": "tomorrow"},
+            {"min_available": -1},
+            {"source_city": "abc"},
+        ):
+            res = self.client.get(FLIGHT_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_detail_ignores_list_filters(self):
+        url = reverse("airport:flight-detail", args=[self.morning.id])
+
+        res = self.client.get(
+            url, {"departure_after": "tomorrow", "airplane": "abc"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["id"], self.morning.id)
+
+
+class FlightFilterPlanTests(TestCase):
+    """The common filters are answered from an index, not a full scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        airplanes = [sample_airplane(name=f"Plane {i}") for i in range(10)]
+        airports = [sample_airport(name=f"Airport {i}") for i in range(10)]
+        routes = [
+            Route.objects.create(
+                source=source, destination=destination, distance=500
+            )
+            for source in airports
+            for destination in airports
+            if source != destination
+        ]
+        flights = []
+        for i in range(5000):
+            departure_time = START + timedelta(hours=i)
+            flights.append(Flight(
+                route=routes[i % len(routes)],
+                airplane=airplanes[i % len(airplanes)],
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=3),
+                seat_map=bytes(2),
+                tickets_available=12 if i % 50 == 0 else 0,
+            ))
+        Flight.objects.bulk_create(flights)
+        # Tables the plan joins too: statistics left from other tests'
+        # rows would change the plan.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "ANALYZE airport_flight, airport_airplane, airport_route"
+            )
+
+    def plan(self, params):
+        view = FlightViewSet(action="list", format_kwarg=None)
+        view.request = Request(
+            APIRequestFactory().get(FLIGHT_URL, params)
+        )
+        queryset = view.filter_queryset(view.get_queryset())
+        return queryset.explain()
+
+    def assert_uses_index(self, params, index):
+        self.assertIn(index, self.plan(params))
+
+    def test_departure_window_uses_index(self):
+        self.assert_uses_index(
+            {
+                "departure_after": "2026-02-01",
+                "departure_before": "2026-02-02",
+            },
+            "flight_departure_id_idx"
+        )
+
+    def test_arrival_window_uses_index(self):
+        self.assert_uses_index(
+            {
+                "arrival_after": "2026-02-01",
+                "arrival_before": "2026-02-02",
+            },
+            "flight_arrival_idx"
+        )
+
+    def test_route_and_date_uses_index(self):
+        route = Route.objects.first()
+
+        self.assert_uses_index(
+            {
+                "route_source": route.source_id,
+                "route_destination": route.destination_id,
+                "departure_after": "2026-02-01",
+                "departure_before": "2026-03-01",
+            },
+            "flight_route_departure_idx"
+        )
+
+    def test_airplane_and_date_uses_index(self):
+        self.assert_uses_index(
+            {
+                "airplane": Flight.objects.first().airplane_id,
+                "departure_after": "2026-02-01",
+                "departure_before": "2026-03-01",
+            },
+            "flight_airplane_departure_idx"
+        )
+
+    def test_available_seats_uses_index(self):
+        self.assert_uses_index(
+            {"min_available": 1, "departure_after": "2026-02-01"},
+            "flight_departure_available_idx"
+        )
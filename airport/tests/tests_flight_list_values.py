@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport.models import Crew, Flight, Order, Ticket
+from airport.serializers import (
+    FlightListSerializer,
+    FlightListValuesSerializer,
+)
+from airport.tests.tests_flight_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+def render(data) -> bytes:
+    return JSONRenderer().render(data)
+
+
+class FlightListValuesSerializerTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        winter = sample_flight()
+        summer = sample_flight(
+            route=winter.route,
+            departure_time=timezone.make_aware(
+                datetime(2026, 7, 1, 23, 30, 0, 123456)
+            ),
+            arrival_time=datetime(2026, 7, 2, 1, 5, tzinfo=dt_timezone.utc),
+        )
+        crew = [
+            Crew.objects.create(name=name, position=position)
+            for name, position in (
+                ("Jane", "Pilot"), ("Ольга", "Steward \"Senior\"")
+            )
+        ]
+        winter.crew.set(crew)
+        summer.crew.add(crew[1])
+        order = Order.objects.create(user=self.user)
+        for row, seat in ((1, 1), (3, 4)):
+            Ticket.objects.create(
+                order=order, flight=winter, row=row, seat=seat,
+                passenger="P"
+            )
+        self.flights = [winter, summer]
+
+    def serialize_both(self, params=None):
+        request = APIRequestFactory().get(FLIGHT_URL, params)
+        request.query_params = request.GET
+        context = {"request": request}
+        instances = (
+            Flight.objects
+            .select_related(
+                "route__source__closest_big_city",
+                "route__destination__closest_big_city",
+                "airplane"
+            )
+            .prefetch_related(
+                Prefetch("crew", queryset=Crew.objects.order_by("id"))
+            )
+            .order_by("id")
+        )
+        rows = FlightListValuesSerializer.project(
+            Flight.objects.order_by("id")
+        )
+        return (
+            FlightListSerializer(instances, many=True, context=context).data,
+            FlightListValuesSerializer(rows, many=True, context=context).data
+        )
+
+    def assert_identical(self, params=None):
+        expected, actual = self.serialize_both(params)
+        self.assertEqual(render(actual), render(expected))
+        return actual
+
+    def test_same_json_as_model_serializer(self):
+        self.assert_identical()
+
+    def test_same_json_with_expanded_seat_map(self):
+        data = self.assert_identical({"seat_map": "expanded"})
+
+        self.assertEqual(
+            data[0]["seat_map"]["taken_seats"],
+            ["row:1 seat:1", "row:3 seat:4"]
+        )
+
+    @override_settings(TIME_ZONE="UTC")
+    def test_same_json_in_utc(self):
+        data = self.assert_identical()
+
+        self.assertTrue(data[0]["departure_time"].endswith("Z"))
+
+    def test_flight_without_crew(self):
+        self.flights[1].crew.clear()
+
+        data = self.assert_identical()
+
+        self.assertEqual(data[1]["crew"], [])
+
+    def test_golden_output(self):
+        jane, olga = Crew.objects.order_by("id")
+
+        _, data = self.serialize_both()
+
+        self.assertEqual(data[0], {
+            "id": self.flights[0].id,
+            "route": "Source(City) - Destination(City)(Destination(City))",
+            "airplane": "Airplane Name",
+            "departure_time": "2026-01-01T10:00:00+02:00",
+            "arrival_time": "2026-01-01T12:00:00+02:00",
+            "crew": [
+                {
+                    "id": jane.id,
+                    "name": "Jane",
+                    "position": "Pilot"
+                },
+                {
+                    "id": olga.id,
+                    "name": "Ольга",
+                    "position": "Steward \"Senior\""
+                },
+            ],
+            "seat_map": {
+                "rows": 3,
+                "seats_in_row": 4,
+                "bitmap": "AQg=",
+            },
+            "tickets_available": 10,
+        })
+        self.assertEqual(
+            (data[1]["departure_time"], data[1]["arrival_time"]),
+            ("2026-07-01T23:30:00.123456+03:00", "2026-07-02T04:05:00+03:00")
+        )
+
+    def test_list_endpoint_runs_one_query_per_page(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        # Each after the model versions.
+        with self.assertNumQueries(3):
+            res = client.get(FLIGHT_URL)
+        with self.assertNumQueries(2):
+            cursor_page = client.get(
+                FLIGHT_URL, {"pagination": "cursor", "limit": 1}
+            )
+        with self.assertNumQueries(2):
+            next_page = client.get(cursor_page.data["next"])
+
+        expected, _ = self.serialize_both()
+        self.assertEqual(render(res.data["results"]), render(expected))
+        self.assertEqual(
+            [cursor_page.data["results"][0]["id"],
+             next_page.data["results"][0]["id"]],
+            [flight.id for flight in self.flights]
+        )
+        self.assertEqual(
+            next_page.data["results"][0]["departure_time"],
+            expected[1]["departure_time"]
+        )
+
+    def test_filters_apply_to_rows(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(FLIGHT_URL, {
+            "departure_after": (
+                self.flights[1].departure_time - timedelta(hours=1)
+            ).isoformat()
+        })
+
+        self.assertEqual(
+            [flight["id"] for flight in res.data["results"]],
+            [self.flights[1].id]
+        )
@@ -0,0 +1,231 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.booking import (
+    hold_seats,
+    release_expired_holds,
+    release_hold
+)
+from airport.models import Flight, HeldSeat, SeatHold, Ticket
+from airport.tests.tests_booking import create_order, sample_flight
+
+HOLD_URL = reverse("airport:seathold-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def detail_url(hold_id):
+    return reverse("airport:seathold-detail", args=(hold_id,))
+
+
+def confirm_url(hold_id):
+    return reverse("airport:seathold-confirm", args=(hold_id,))
+
+
+class SeatHoldApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def create_hold(self, seats, **payload):
+        payload.update({
+            "flight": self.flight.id,
+            "seats": [{"row": row, "seat": seat} for row, seat in seats]
+        })
+        return self.client.post(HOLD_URL, payload, format="json")
+
+    def test_hold_counts_against_availability(self):
+        res = self.create_hold([(1, 1), (1, 2)], minutes=5)
+        self.flight.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.flight.tickets_available, 58)
+        self.assertEqual(list(self.flight.taken_seats), [(1, 1), (1, 2)])
+        hold = SeatHold.objects.get(id=res.data["id"])
+        self.assertAlmostEqual(
+            hold.expires_at,
+            timezone.now() + timedelta(minutes=5),
+            delta=timedelta(seconds=10)
+        )
+
+    def test_held_seat_cannot_be_ordered_by_others(self):
+        hold_seats(self.other_user, self.flight, [(2, 2)], 10)
+
+        payload = {
+            "tickets": [
+                {"passenger": "A", "row": 2, "seat": 2,
+                 "flight": self.flight.id}
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_taken_seat_cannot_be_held(self):
+        create_order(self.other_user, self.flight, [(3, 3)])
+
+        res = self.create_hold([(3, 3), (3, 4)])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"flight": self.flight.id, "row": 3, "seat": 3}]
+        )
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_confirm_hold_creates_order(self):
+        hold_id = self.create_hold([(1, 1), (1, 2)]).data["id"]
+        payload = {
+            "tickets": [
+                {"passenger": "A", "row": 1, "seat": 2},
+                {"passenger": "B", "row": 1, "seat": 1},
+            ]
+        }
+
+        res = self.client.post(confirm_url(hold_id), payload, format="json")
+        self.flight.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 2)
+        self.assertEqual(
+            Ticket.objects.filter(order__user=self.user).count(), 2
+        )
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertFalse(HeldSeat.objects.exists())
+        self.assertEqual(self.flight.tickets_available, 58)
+
+    def test_confirm_must_cover_held_seats(self):
+        hold_id = self.create_hold([(1, 1), (1, 2)]).data["id"]
+        payload = {"tickets": [{"passenger": "A", "row": 1, "seat": 1}]}
+
+        res = self.client.post(confirm_url(hold_id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(SeatHold.objects.exists())
+
+    def test_confirm_expired_hold(self):
+        hold_id = self.create_hold([(1, 1)]).data["id"]
+        SeatHold.objects.update(expires_at=timezone.now())
+        payload = {"tickets": [{"passenger": "A", "row": 1, "seat": 1}]}
+
+        res = self.client.post(confirm_url(hold_id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_cannot_confirm_hold_of_other_user(self):
+        hold = hold_seats(self.other_user, self.flight, [(1, 1)], 10)
+        payload = {"tickets": [{"passenger": "A", "row": 1, "seat": 1}]}
+
+        res = self.client.post(confirm_url(hold.id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_delete_hold_releases_seats(self):
+        hold_id = self.create_hold([(4, 1)]).data["id"]
+
+        res = self.client.delete(detail_url(hold_id))
+        self.flight.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.flight.tickets_available, 60)
+        self.assertEqual(list(self.flight.taken_seats), [])
+
+    def test_delete_hold_released_by_sweeper(self):
+        hold = SeatHold.objects.get(
+            pk=self.create_hold([(4, 1)]).data["id"]
+        )
+        SeatHold.objects.filter(pk=hold.pk).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        release_expired_holds()
+
+        release_hold(hold)
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.tickets_available, 60)
+
+    def test_deleting_user_releases_held_seats(self):
+        hold_seats(self.other_user, self.flight, [(4, 1)], 10)
+
+        self.other_user.delete()
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.tickets_available, 60)
+
+    def test_release_expired_holds(self):
+        hold_seats(self.user, self.flight, [(1, 1)], 10)
+        expired = hold_seats(self.other_user, self.flight, [(2, 1)], 10)
+        SeatHold.objects.filter(id=expired.id).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        out = StringIO()
+        call_command("release_expired_holds", stdout=out)
+        self.flight.refresh_from_db()
+
+        self.assertIn("Released 1 expired holds", out.getvalue())
+        self.assertEqual(list(self.flight.taken_seats), [(1, 1)])
+        self.assertEqual(self.flight.tickets_available, 59)
+
+    def test_reconcile_keeps_held_seats(self):
+        hold_seats(self.user, self.flight, [(1, 1)], 10)
+        create_order(self.user, self.flight, [(1, 2)])
+
+        call_command("reconcile_flight_seats", stdout=StringIO())
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.tickets_available, 58)
+
+
+class ExpiredHoldSweeperTests(TransactionTestCase):
+    def test_sweeper_skips_locked_holds(self):
+        user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        flight = sample_flight()
+        locked = hold_seats(user, flight, [(1, 1)], 10)
+        hold_seats(user, flight, [(1, 2)], 10)
+        SeatHold.objects.update(expires_at=timezone.now())
+        hold_locked = threading.Event()
+        sweep_done = threading.Event()
+
+        def lock_hold():
+            try:
+                with transaction.atomic():
+                    SeatHold.objects.select_for_update().get(pk=locked.pk)
+                    hold_locked.set()
+                    sweep_done.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=lock_hold)
+        thread.start()
+        hold_locked.wait(10)
+        released = release_expired_holds()
+        sweep_done.set()
+        thread.join()
+        flight = Flight.objects.get(pk=flight.pk)
+
+        self.assertEqual(released, 1)
+        self.assertEqual(list(SeatHold.objects.all()), [locked])
+        self.assertEqual(list(flight.taken_seats), [(1, 1)])
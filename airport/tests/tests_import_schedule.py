@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Crew,
+    Flight,
+    Route
+)
+
+CSV_HEADER = (
+    "source,destination,airplane,departure_time,arrival_time,distance,crew\n"
+)
+
+
+class ImportScheduleTests(TestCase):
+    def setUp(self) -> None:
+        city = City.objects.create(name="Kyiv")
+        self.kbp = Airport.objects.create(name="KBP", closest_big_city=city)
+        self.lwo = Airport.objects.create(name="LWO", closest_big_city=city)
+        airplane_type = AirplaneType.objects.create(name="Jet")
+        self.airplane = Airplane.objects.create(
+            name="UR-1", rows=10, seats_in_row=6, airplane_type=airplane_type
+        )
+        self.pilot = Crew.objects.create(name="Jane Doe", position="Pilot")
+        self.steward = Crew.objects.create(name="John Roe", position="Crew")
+
+    def import_schedule(self, content, suffix):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w") as stream:
+            stream.write(content)
+        out, err = StringIO(), StringIO()
+        call_command("import_schedule", path, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_creates_routes_flights_and_crew(self):
+        out, err = self.import_schedule(
+            CSV_HEADER
+            + "KBP,LWO,UR-1,2026-06-01T08:00:00Z,2026-06-01T09:10:00Z,"
+              "470,Jane Doe;John Roe\n"
+            + "KBP,LWO,UR-1,2026-06-02T08:00:00Z,2026-06-02T09:10:00Z,,\n"
+            + "LWO,KBP,UR-1,2026-06-01T12:00:00Z,2026-06-01T13:10:00Z,"
+              "470,Jane Doe\n",
+            ".csv"
+        )
+
+        self.assertIn("Imported 3 rows", out)
+        self.assertIn("3 flights created", out)
+        self.assertIn("2 routes created", out)
+        self.assertEqual(err, "")
+        route = Route.objects.get(source=self.kbp, destination=self.lwo)
+        self.assertEqual(route.distance, 470)
+        flight = Flight.objects.get(
+            route=route, departure_time="2026-06-01T08:00:00Z"
+        )
+        self.assertEqual(
+            set(flight.crew.all()), {self.pilot, self.steward}
+        )
+        self.assertEqual(bytes(flight.seat_map), bytes(8))
+        self.assertEqual(flight.tickets_available, 60)
+        self.assertEqual(list(flight.taken_seats), [])
+
+    def test_reimport_updates_flights_in_place(self):
+        row = {
+            "source": "KBP",
+            "destination": "LWO",
+            "airplane": "UR-1",
+            "departure_time": "2026-06-01T08:00:00Z",
+            "arrival_time": "2026-06-01T09:10:00Z",
+            "distance": 470,
+            "crew": ["Jane Doe", "John Roe"],
+        }
+        self.import_schedule(json.dumps(row) + "\n", ".jsonl")
+
+        row.update(arrival_time="2026-06-01T09:30:00Z", crew=["John Roe"])
+        out, _ = self.import_schedule(json.dumps(row) + "\n", ".jsonl")
+
+        self.assertIn("0 flights created, 1 updated", out)
+        flight = Flight.objects.get()
+        self.assertEqual(flight.arrival_time.minute, 30)
+        self.assertEqual(list(flight.crew.all()), [self.steward])
+
+    def test_later_duplicate_wins(self):
+        out, _ = self.import_schedule(
+            CSV_HEADER
+            + "KBP,LWO,UR-1,2026-06-01T08:00:00Z,2026-06-01T09:10:00Z,470,\n"
+            + "KBP,LWO,UR-1,2026-06-01T08:00:00Z,2026-06-01T09:20:00Z,,\n",
+            ".csv"
+        )
+
+        self.assertIn("1 flights created", out)
+        self.assertEqual(Flight.objects.get().arrival_time.minute, 20)
+
+    def test_invalid_rows_are_rejected_and_reported(self):
+        Airplane.objects.create(
+            name="UR-1", rows=1, seats_in_row=1,
+            airplane_type=self.airplane.airplane_type
+        )
+        lines = [
+            {"source": "XXX", "destination": "LWO"},
+            {"source": "KBP", "destination": "LWO", "airplane": "UR-1"},
+            "not json",
+        ]
+        out, err = self.import_schedule(
+            "\n".join(
+                line if isinstance(line, str) else json.dumps(line)
+                for line in lines
+            ) + "\n",
+            ".jsonl"
+        )
+
+        self.assertIn("Imported 0 rows", out)
+        self.assertIn("3 rows rejected", out)
+        self.assertIn("Line 1: unknown airport 'XXX'", err)
+        self.assertIn("Line 2: ambiguous airplane 'UR-1'", err)
+        self.assertIn("Line 3: not a JSON object", err)
+        self.assertFalse(Flight.objects.exists())
+
+    def test_new_route_needs_distance(self):
+        out, err = self.import_schedule(
+            CSV_HEADER
+            + "KBP,LWO,UR-1,2026-06-01T08:00:00Z,2026-06-01T09:10:00Z,,\n",
+            ".csv"
+        )
+
+        self.assertIn("1 rows rejected", out)
+        self.assertIn("Line 2: distance is required for a new route", err)
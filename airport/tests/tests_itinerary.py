@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.itinerary import flight_graph, load_legs
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Flight,
+    Route
+)
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+DAY = datetime(2030, 5, 1)
+
+
+def at(hour, minute=0, day=0):
+    return timezone.make_aware(
+        DAY + timedelta(days=day, hours=hour, minutes=minute)
+    )
+
+
+class ItinerarySearchTests(TestCase):
+    def setUp(self) -> None:
+        flight_graph.invalidate()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.city = City.objects.create(name="Kyiv")
+        self.airports = {
+            name: Airport.objects.create(
+                name=name,
+                closest_big_city=(
+                    self.city if name in "AE" else
+                    City.objects.create(name=f"City {name}")
+                )
+            )
+            for name in "ABCDE"
+        }
+        self.airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=1,
+            seats_in_row=2,
+            airplane_type=AirplaneType.objects.create(name="Type1")
+        )
+
+    def flight(self, source, destination, departure, arrival, distance=100):
+        route, _ = Route.objects.get_or_create(
+            source=self.airports[source],
+            destination=self.airports[destination],
+            defaults={"distance": distance}
+        )
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure,
+            arrival_time=arrival
+        )
+
+    def search(self, **params):
+        params.setdefault("origin", self.airports["A"].id)
+        params.setdefault("destination", self.airports["C"].id)
+        params.setdefault("date", "2030-05-01")
+        params = {
+            key: value for key, value in params.items() if value is not None
+        }
+        res = self.client.get(ITINERARY_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return [[leg["id"] for leg in item["legs"]] for item in res.data]
+
+    def test_direct_and_connecting_flights(self):
+        direct = self.flight("A", "C", at(10), at(16), distance=900)
+        first = self.flight("A", "B", at(9), at(10), distance=300)
+        second = self.flight("B", "C", at(11), at(12), distance=400)
+        self.flight("B", "C", at(10, 20), at(11, 20))
+        self.flight("A", "C", at(10, day=1), at(12, day=1))
+
+        self.assertEqual(
+            self.search(),
+            [[first.id, second.id], [direct.id]]
+        )
+        self.assertEqual(
+            self.search(ordering="distance"),
+            [[first.id, second.id], [direct.id]]
+        )
+        self.assertEqual(self.search(max_legs=1), [[direct.id]])
+
+    def test_connection_time_limits(self):
+        self.flight("A", "B", at(6), at(7))
+        late = self.flight("B", "C", at(15), at(16))
+
+        self.assertEqual(self.search(), [])
+        self.assertEqual(len(self.search(max_connection=600)), 1)
+        self.assertEqual(self.search(max_connection=600)[0][1], late.id)
+
+    def test_three_legs_without_revisiting_airports(self):
+        legs = [
+            self.flight("A", "B", at(8), at(9)),
+            self.flight("B", "D", at(10), at(11)),
+            self.flight("D", "C", at(12), at(13)),
+        ]
+        self.flight("B", "A", at(10), at(11))
+
+        self.assertEqual(
+            self.search(), [[flight.id for flight in legs]]
+        )
+        self.assertEqual(self.search(max_legs=2), [])
+
+    def test_search_by_city(self):
+        from_e = self.flight("E", "C", at(9), at(10))
+
+        self.assertEqual(
+            self.search(origin=None, origin_city=self.city.id),
+            [[from_e.id]]
+        )
+
+    def test_seat_availability(self):
+        flight = self.flight("A", "C", at(9), at(10))
+        self.assertEqual(self.search(passengers=2), [[flight.id]])
+
+        Flight.objects.filter(id=flight.id).update(tickets_available=1)
+
+        self.assertEqual(self.search(passengers=2), [])
+        self.assertEqual(self.search(passengers=1), [[flight.id]])
+
+    def test_graph_picks_up_new_and_deleted_flights(self):
+        self.assertEqual(self.search(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight = self.flight("A", "C", at(9), at(10))
+        self.assertEqual(self.search(), [[flight.id]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight.delete()
+        self.assertEqual(self.search(), [])
+
+    def test_search_does_not_wait_for_another_threads_rebuild(self):
+        flight = self.flight("A", "C", at(9), at(10))
+        self.assertEqual(self.search(), [[flight.id]])
+        flight_graph.invalidate()
+
+        # While another thread rebuilds, searches use the current graph.
+        with flight_graph.load_lock:
+            self.assertEqual(self.search(), [[flight.id]])
+        self.assertEqual(flight_graph.due(), "build")
+
+    def test_invalidate_during_build_keeps_the_graph_due(self):
+        def load_then_invalidate(queryset):
+            flight_graph.invalidate()
+            return load_legs(queryset)
+
+        with mock.patch("airport.itinerary.load_legs", load_then_invalidate):
+            flight_graph.build()
+
+        self.assertEqual(flight_graph.due(), "build")
+
+    def test_requires_origin_or_origin_city(self):
+        res = self.client.get(ITINERARY_URL, {
+            "destination": self.airports["C"].id, "date": "2030-05-01"
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,147 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Airport, City, Flight, Order, Route, Ticket
+from airport.tests.tests_flight_api import (
+    sample_airplane,
+    sample_airport,
+    sample_flight
+)
+
+ROUTE_URL = reverse("airport:route-list")
+TICKET_URL = reverse("airport:ticket-list")
+
+
+class LabelTests(TestCase):
+    def setUp(self) -> None:
+        self.flight = sample_flight()
+        self.route = self.flight.route
+
+    def labels(self) -> tuple:
+        return (
+            Route.objects.get(pk=self.route.pk).label,
+            Flight.objects.get(pk=self.flight.pk).label
+        )
+
+    def test_labels_on_create(self):
+        route_label = "Source(City) - Destination(City)(Destination(City))"
+        self.assertEqual(
+            self.labels(), (route_label, f"{route_label} - Airplane Name")
+        )
+        self.assertEqual(str(self.route), route_label)
+        self.assertEqual(
+            str(self.flight),
+            f"{route_label} - Airplane Name"
+            f"({self.flight.departure_time}-{self.flight.arrival_time})"
+        )
+
+    def test_str_does_not_query(self):
+        flight = Flight.objects.get(pk=self.flight.pk)
+        with self.assertNumQueries(0):
+            self.assertIn("Source(City)", str(flight))
+
+    def test_renames_propagate(self):
+        city = self.route.source.closest_big_city
+        city.name = "Kyiv"
+        city.save()
+        self.assertEqual(self.labels(), (
+            "Source(Kyiv) - Destination(City)(Destination(City))",
+            "Source(Kyiv) - Destination(City)(Destination(City))"
+            " - Airplane Name"
+        ))
+
+        airport = Airport.objects.get(pk=self.route.destination_id)
+        airport.name = "Boryspil"
+        airport.save()
+        airport.closest_big_city = City.objects.create(name="Lviv")
+        airport.save()
+        self.assertEqual(
+            self.labels()[0],
+            "Source(Kyiv) - Boryspil(Lviv)(Boryspil(Lviv))"
+        )
+
+        airplane = self.flight.airplane
+        airplane.name = "Dreamliner"
+        airplane.save()
+        self.assertEqual(
+            self.labels()[1],
+            "Source(Kyiv) - Boryspil(Lviv)(Boryspil(Lviv)) - Dreamliner"
+        )
+
+    def test_unchanged_save_keeps_labels(self):
+        city = City.objects.get(pk=self.route.source.closest_big_city_id)
+        with self.assertNumQueries(1):
+            city.save()
+        self.assertEqual(
+            self.labels()[1],
+            "Source(City) - Destination(City)(Destination(City))"
+            " - Airplane Name"
+        )
+
+    def test_changed_route_and_airplane(self):
+        route = Route.objects.get(pk=self.route.pk)
+        route.destination = sample_airport(name="Zhuliany")
+        route.save(update_fields=["destination"])
+        self.assertEqual(
+            self.labels()[1],
+            "Source(City) - Zhuliany(City)(Zhuliany(City)) - Airplane Name"
+        )
+
+        flight = Flight.objects.get(pk=self.flight.pk)
+        flight.airplane = sample_airplane(name="Embraer")
+        flight.route = Route.objects.create(
+            source=route.destination, destination=route.source, distance=500
+        )
+        flight.save()
+        self.assertEqual(
+            self.labels()[1],
+            "Zhuliany(City) - Source(City)(Source(City)) - Embraer"
+        )
+
+    def test_ticket_list_reads_labels(self):
+        user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        order = Order.objects.create(user=user)
+        for row in range(1, 4):
+            Ticket.objects.create(
+                passenger="Test", order=order, flight=self.flight,
+                row=row, seat=1
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            res = client.get(TICKET_URL)
+
+        self.assertEqual(
+            {ticket["route"] for ticket in res.data["results"]},
+            {self.route.label}
+        )
+        for query in queries.captured_queries:
+            self.assertNotIn("airport_city", query["sql"])
+
+    def test_route_api_does_not_expose_label(self):
+        staff = get_user_model().objects.create_user(
+            "staff@test.com", "testpass", is_staff=True
+        )
+        client = APIClient()
+        client.force_authenticate(staff)
+
+        res = client.post(ROUTE_URL, {
+            "source": self.route.destination_id,
+            "destination": self.route.source_id,
+            "distance": 500
+        })
+
+        self.assertEqual(
+            set(res.data), {"id", "source", "destination", "distance"}
+        )
+        self.assertEqual(
+            Route.objects.get(pk=res.data["id"]).label,
+            "Destination(City) - Source(City)(Source(City))"
+        )
@@ -0,0 +1,174 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.cache import stats
+from airport.metrics import Counter, Histogram, render_metrics
+from airport.tests.tests_flight_api import sample_flight
+from airport.tests.tests_order_api import tickets_payload
+
+METRICS_URL = reverse("metrics")
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def read_metrics() -> dict:
+    samples = {}
+    for line in render_metrics().splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def delta(before, after, name) -> float:
+    return after.get(name, 0) - before.get(name, 0)
+
+
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_viewset_action_labels_and_query_count(self):
+        before = read_metrics()
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(
+                ORDER_URL,
+                {"tickets": tickets_payload(self.flight, 2)},
+                format="json"
+            )
+        after = read_metrics()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(delta(before, after, (
+            'airport_http_requests_total'
+            '{endpoint="order-create",method="POST",status="201"}'
+        )), 1)
+        self.assertEqual(delta(before, after, (
+            'airport_db_queries_per_request_sum{endpoint="order-create"}'
+        )), len(queries))
+        self.assertEqual(delta(before, after, (
+            'airport_http_response_size_bytes_sum{endpoint="order-create"}'
+        )), len(res.content))
+        self.assertEqual(delta(before, after, (
+            'airport_http_request_duration_seconds_count'
+            '{endpoint="order-create",method="POST"}'
+        )), 1)
+        self.assertGreater(delta(before, after, (
+            'airport_db_duration_seconds_sum{endpoint="order-create"}'
+        )), 0)
+
+    def test_unresolved_requests(self):
+        before = read_metrics()
+        res = self.client.get("/no/such/path/")
+        after = read_metrics()
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(delta(before, after, (
+            'airport_http_requests_total'
+            '{endpoint="unresolved",method="GET",status="404"}'
+        )), 1)
+
+    async def test_async_view_queries_are_counted(self):
+        token = str(AccessToken.for_user(self.user))
+        before = read_metrics()
+        res = await AsyncClient().get(
+            FLIGHT_URL, headers={"Authorization": f"Bearer {token}"}
+        )
+        after = read_metrics()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(delta(before, after, (
+            'airport_http_requests_total'
+            '{endpoint="flight-list",method="GET",status="200"}'
+        )), 1)
+        self.assertGreaterEqual(delta(before, after, (
+            'airport_db_queries_per_request_sum{endpoint="flight-list"}'
+        )), 2)
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsEndpointTests(TestCase):
+    def test_exposition_format(self):
+        stats.clear()
+        self.addCleanup(stats.clear)
+        stats["city", "hit"] += 2
+        res = self.client.get(
+            METRICS_URL, headers={"Authorization": "Bearer secret"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith(
+            "text/plain; version=0.0.4"
+        ))
+        text = res.content.decode()
+        self.assertIn(
+            "# TYPE airport_http_request_duration_seconds histogram", text
+        )
+        self.assertIn(
+            "# TYPE airport_reference_cache_requests_total counter", text
+        )
+        self.assertIn(
+            'airport_reference_cache_requests_total'
+            '{model="city",outcome="hit"} 2',
+            text
+        )
+
+    def test_token(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+        for authorization in ("Bearer wrong", "Bearer sécret"):
+            self.assertEqual(
+                self.client.get(
+                    METRICS_URL, headers={"Authorization": authorization}
+                ).status_code,
+                status.HTTP_403_FORBIDDEN
+            )
+        self.assertEqual(
+            self.client.get(
+                METRICS_URL, headers={"Authorization": "Bearer secret"}
+            ).status_code,
+            status.HTTP_200_OK
+        )
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_forbidden_without_token(self):
+        for authorization in ("", "Bearer ", "Bearer None"):
+            self.assertEqual(
+                self.client.get(
+                    METRICS_URL, headers={"Authorization": authorization}
+                ).status_code,
+                status.HTTP_403_FORBIDDEN
+            )
+
+    def test_histogram_and_label_escaping(self):
+        counter = Counter("c_total", "C.", ("path",))
+        counter.inc(('a"b\\c\nd',))
+        histogram = Histogram("h", "H.", (1, 2.5), ("endpoint",))
+        for value in (0.5, 2, 3):
+            histogram.observe(("x",), value)
+
+        self.assertEqual(
+            list(counter.samples()),
+            [("c_total", 'path="a\\"b\\\\c\\nd"', 1.0)]
+        )
+        self.assertEqual(list(histogram.samples()), [
+            ("h_bucket", 'endpoint="x",le="1"', 1),
+            ("h_bucket", 'endpoint="x",le="2.5"', 2),
+            ("h_bucket", 'endpoint="x",le="+Inf"', 3),
+            ("h_sum", 'endpoint="x"', 5.5),
+            ("h_count", 'endpoint="x"', 3),
+        ])
@@ -0,0 +1,257 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Flight,
+    Order,
+    Route,
+    Ticket
+)
+from airport.serializers import (
+    FlightPrimaryKeyRelatedField,
+    OrderSerializer
+)
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def sample_flight(**params):
+    city = City.objects.create(name="City")
+    departure_time = timezone.make_aware(datetime(2026, 1, 1, 10))
+    defaults = {
+        "route": Route.objects.create(
+            source=Airport.objects.create(
+                name="Source", closest_big_city=city
+            ),
+            destination=Airport.objects.create(
+                name="Destination", closest_big_city=city
+            ),
+            distance=500
+        ),
+        "airplane": Airplane.objects.create(
+            name="Airplane Name",
+            rows=20,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Type1")
+        ),
+        "departure_time": departure_time,
+        "arrival_time": departure_time + timedelta(hours=2),
+    }
+    defaults.update(params)
+    return Flight.objects.create(**defaults)
+
+
+def tickets_payload(flight, count, start_row=1):
+    return [
+        {
+            "passenger": f"Passenger {i}",
+            "row": start_row + i // 6,
+            "seat": i % 6 + 1,
+            "flight": flight.id
+        }
+        for i in range(count)
+    ]
+
+
+class OrderCreateTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.other_flight = sample_flight()
+        request = APIRequestFactory().post(ORDER_URL)
+        request.user = self.user
+        self.context = {"request": request}
+
+    def test_create_order_with_tickets(self):
+        payload = {"tickets": tickets_payload(self.flight, 3)}
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.flight.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            set(res.data), {"id", "created_at", "user", "tickets"}
+        )
+        self.assertEqual(
+            Ticket.objects.filter(order__user=self.user).count(), 3
+        )
+        self.assertEqual(self.flight.tickets_available, 117)
+        self.assertEqual(
+            list(self.flight.taken_seats), [(1, 1), (1, 2), (1, 3)]
+        )
+
+    def test_validation_queries_do_not_grow_with_tickets(self):
+        for count in (1, 10, 50):
+            payload = {
+                "tickets": tickets_payload(self.flight, count)
+                + tickets_payload(self.other_flight, count, start_row=11)
+            }
+            serializer = OrderSerializer(data=payload, context=self.context)
+
+            with self.assertNumQueries(1):
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_create_queries_do_not_grow_with_tickets(self):
+        for count, start_row in ((1, 1), (10, 2), (30, 4)):
+            payload = {
+                "tickets": tickets_payload(self.flight, count, start_row)
+                + tickets_payload(self.other_flight, count, start_row + 10)
+            }
+            serializer = OrderSerializer(data=payload, context=self.context)
+            serializer.is_valid(raise_exception=True)
+
+            with self.assertNumQueries(8):
+                serializer.save(user=self.user)
+
+    def test_taken_seat_rejected(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            passenger="A", flight=self.flight, order=order, row=1, seat=2
+        )
+        payload = {"tickets": tickets_payload(self.flight, 2)}
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"flight": self.flight.id, "row": 1, "seat": 2}]
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_duplicate_seat_in_order_rejected(self):
+        payload = {
+            "tickets": tickets_payload(self.flight, 1)
+            + tickets_payload(self.flight, 1)
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_seat_out_of_range_rejected(self):
+        payload = {"tickets": tickets_payload(self.flight, 1, start_row=21)}
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_flight_rejected(self):
+        payload = {
+            "tickets": [
+                {"passenger": "A", "row": 1, "seat": 1, "flight": 0}
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_boolean_and_fractional_flight_ids_rejected(self):
+        for flight in (True, self.flight.id + 0.9):
+            with self.subTest(flight=flight):
+                payload = {
+                    "tickets": [
+                        {"passenger": "A", "row": 1, "seat": 1,
+                         "flight": flight}
+                    ]
+                }
+
+                res = self.client.post(ORDER_URL, payload, format="json")
+
+                self.assertEqual(
+                    res.status_code, status.HTTP_400_BAD_REQUEST
+                )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_bulk_fetched_flights_are_not_matched_by_boolean(self):
+        field = FlightPrimaryKeyRelatedField(queryset=Flight.objects.all())
+        field._context = {"flights": {1: self.flight}}
+
+        for data in (True, 1.9):
+            with self.subTest(data=data):
+                with self.assertRaises(ValidationError):
+                    field.run_validation(data)
+        self.assertEqual(field.run_validation("1"), self.flight)
+
+
+class OrderHistoryTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flights = [sample_flight() for _ in range(3)]
+        self.next_rows = {flight.id: 1 for flight in self.flights}
+
+    def create_orders(self, orders: int, tickets: int) -> None:
+        """`orders` orders of up to 6 `tickets`, each in its own row."""
+        for number in range(orders):
+            flight = self.flights[number % len(self.flights)]
+            serializer = OrderSerializer(data={
+                "tickets": tickets_payload(
+                    flight, tickets, start_row=self.next_rows[flight.id]
+                )
+            })
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=self.user)
+            self.next_rows[flight.id] += 1
+
+    def test_list_shows_tickets_with_their_flights(self):
+        self.create_orders(1, 2)
+        flight = Flight.objects.get(pk=self.flights[0].pk)
+
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ticket = res.data["results"][0]["tickets"][0]
+        self.assertEqual(ticket, {
+            "id": ticket["id"],
+            "passenger": "Passenger 0",
+            "row": 1,
+            "seat": 1,
+            "order": res.data["results"][0]["id"],
+            "route": str(flight.route),
+            "departure_time": str(flight.departure_time),
+            "arrival_time": str(flight.arrival_time),
+            "airplane": str(flight.airplane),
+        })
+
+        detail = self.client.get(reverse(
+            "airport:order-detail", args=[res.data["results"][0]["id"]]
+        ))
+        self.assertEqual(detail.data["tickets"][0]["flight"], flight.id)
+        self.assertEqual(
+            detail.data["tickets"][0]["route"], str(flight.route)
+        )
+
+    def test_queries_do_not_grow_with_orders_and_tickets(self):
+        self.create_orders(1, 1)
+        with self.assertNumQueries(4):
+            self.client.get(ORDER_URL, {"limit": 20})
+
+        self.create_orders(12, 6)
+        with self.assertNumQueries(4):
+            res = self.client.get(ORDER_URL, {"limit": 20})
+        self.assertEqual(
+            sum(len(order["tickets"]) for order in res.data["results"]), 73
+        )
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order
+from airport.tests.tests_booking import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        start = timezone.make_aware(datetime(2026, 1, 1, 10))
+        for i in range(11):
+            Flight.objects.create(
+                route=flight.route,
+                airplane=flight.airplane,
+                departure_time=start + timedelta(hours=i // 3),
+                arrival_time=start + timedelta(hours=i // 3 + 2)
+            )
+        self.flights = list(
+            Flight.objects.order_by("departure_time", "id")
+            .values_list("id", flat=True)
+        )
+
+    def walk(self, url, params):
+        ids = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [item["id"] for item in res.data["results"]]
+            if not res.data["next"]:
+                return ids, res
+            res = self.client.get(res.data["next"])
+
+    def test_cursor_pages_follow_departure_time_and_id(self):
+        ids, res = self.walk(FLIGHT_URL, {"pagination": "cursor", "limit": 4})
+
+        self.assertEqual(ids, self.flights)
+        self.assertNotIn("count", res.data)
+
+    def test_cursor_pages_keep_filters(self):
+        other = sample_flight()
+
+        ids, _ = self.walk(
+            FLIGHT_URL,
+            {"pagination": "cursor", "limit": 2, "airplane": other.airplane_id}
+        )
+
+        self.assertEqual(ids, [other.id])
+
+    def test_orders_newest_first(self):
+        other_user = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        Order.objects.create(user=other_user)
+        orders = [Order.objects.create(user=self.user) for _ in range(7)]
+        Order.objects.filter(id=orders[0].id).update(
+            created_at=orders[-1].created_at
+        )
+        expected = list(
+            Order.objects.filter(user=self.user)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+
+        ids, _ = self.walk(ORDER_URL, {"pagination": "cursor", "limit": 3})
+
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(FLIGHT_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_limit_offset_is_default(self):
+        res = self.client.get(FLIGHT_URL, {"limit": 5, "offset": 10})
+
+        self.assertEqual(res.data["count"], len(self.flights))
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]],
+            sorted(self.flights)[10:]
+        )
+
+    def test_estimated_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE airport_flight")
+
+        res = self.client.get(
+            FLIGHT_URL, {"pagination": "cursor", "count": "estimate"}
+        )
+
+        self.assertTrue(res.data["count_estimated"])
+        self.assertEqual(res.data["count"], len(self.flights))
+
+    def test_estimated_count_of_filtered_queryset(self):
+        res = self.client.get(ORDER_URL, {"count": "estimate"})
+
+        self.assertTrue(res.data["count_estimated"])
+        self.assertGreaterEqual(res.data["count"], 0)
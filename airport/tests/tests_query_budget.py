@@ -0,0 +1,293 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport.booking import hold_seats
+from airport.cache import get_cache
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket
+)
+
+
+def list_url(basename):
+    return reverse(f"airport:{basename}-list")
+
+
+def detail_url(basename, pk):
+    return reverse(f"airport:{basename}-detail", args=[pk])
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every list, retrieve and create runs a fixed number of queries,
+    however many rows the page holds and however many crew, tickets
+    or seats the objects have. The budgets are measured on a small
+    tree, then on a larger one; an N+1 makes the second count grow.
+    Cached and conditional responses start with one query for the
+    model versions (airport.cache.get_versions).
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "testpass",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.departure_time = timezone.make_aware(datetime(2026, 1, 1, 10))
+        self.flights = []
+        self.seed(flights=2, crew=2, tickets=2)
+
+    def seed(self, flights: int, crew: int, tickets: int) -> None:
+        """
+        `flights` more flights, each with its own cities, airports,
+        route and airplane, `crew` crew members, one order of `tickets`
+        tickets and a seat hold.
+        """
+        for _ in range(flights):
+            number = len(self.flights)
+            cities = [
+                City.objects.create(name=f"City {number}{end}")
+                for end in "ab"
+            ]
+            airports = [
+                Airport.objects.create(
+                    name=f"Airport {number}{end}", closest_big_city=city
+                )
+                for end, city in zip("ab", cities)
+            ]
+            flight = Flight.objects.create(
+                route=Route.objects.create(
+                    source=airports[0],
+                    destination=airports[1],
+                    distance=500
+                ),
+                airplane=Airplane.objects.create(
+                    name=f"Airplane {number}",
+                    rows=10,
+                    seats_in_row=6,
+                    airplane_type=AirplaneType.objects.create(
+                        name=f"Type {number}"
+                    )
+                ),
+                departure_time=self.departure_time + timedelta(hours=number),
+                arrival_time=self.departure_time + timedelta(
+                    hours=number + 2
+                )
+            )
+            self.flights.append(flight)
+            self.add_crew(flight, crew)
+            self.add_tickets(flight, tickets)
+            hold_seats(self.user, flight, [(10, 1), (10, 2)], 15)
+
+    @staticmethod
+    def add_crew(flight, count: int) -> None:
+        flight.crew.add(*Crew.objects.bulk_create(
+            Crew(name=f"Crew {flight.id}-{i}", position="Pilot")
+            for i in range(count)
+        ))
+
+    def add_tickets(self, flight, count: int, order=None) -> Order:
+        order = order or Order.objects.create(user=self.user)
+        taken = Ticket.objects.filter(flight=flight).count()
+        for i in range(taken, taken + count):
+            Ticket.objects.create(
+                order=order,
+                flight=flight,
+                row=i // 6 + 1,
+                seat=i % 6 + 1,
+                passenger=f"Passenger {i}"
+            )
+        return order
+
+    def count_queries(self, method: str, url: str, data=None) -> list:
+        # Cached responses would skip the queries being counted.
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            res = getattr(self.client, method)(url, data, format="json")
+        self.assertLess(res.status_code, 300, res.content)
+        return [query["sql"] for query in queries]
+
+    def assert_queries(self, budget: int, method: str, url: str, data=None):
+        queries = self.count_queries(method, url, data)
+        self.assertEqual(
+            len(queries), budget,
+            f"{method.upper()} {url}:\n" + "\n".join(queries)
+        )
+
+    def assert_list_budget(
+        self, basename: str, budget: int, cursor_budget: int = None
+    ) -> None:
+        url = list_url(basename)
+        self.assert_queries(budget, "get", url, {"limit": 2})
+        self.seed(flights=6, crew=5, tickets=6)
+        self.assert_queries(budget, "get", url, {"limit": 2})
+        self.assert_queries(budget, "get", url, {"limit": 50})
+        if cursor_budget is not None:
+            self.assert_queries(
+                cursor_budget, "get", url,
+                {"pagination": "cursor", "limit": 50}
+            )
+
+    def assert_retrieve_budget(self, basename: str, pk, budget: int):
+        url = detail_url(basename, pk)
+        self.assert_queries(budget, "get", url)
+        flight = self.flights[0]
+        self.add_crew(flight, 10)
+        self.add_tickets(flight, 20, Order.objects.order_by("id").first())
+        self.assert_queries(budget, "get", url)
+
+    def test_city(self):
+        self.assert_list_budget("city", 3)
+        self.assert_retrieve_budget(
+            "city", City.objects.order_by("id").first().id, 3
+        )
+        self.assert_queries(1, "post", list_url("city"), {"name": "Lviv"})
+
+    def test_crew(self):
+        self.assert_list_budget("crew", 3)
+        self.assert_retrieve_budget(
+            "crew", Crew.objects.order_by("id").first().id, 3
+        )
+        self.assert_queries(
+            1, "post", list_url("crew"), {"name": "Jane", "position": "Pilot"}
+        )
+
+    def test_airplane_type(self):
+        self.assert_list_budget("airplanetype", 3)
+        self.assert_retrieve_budget(
+            "airplanetype", AirplaneType.objects.order_by("id").first().id, 3
+        )
+        self.assert_queries(
+            1, "post", list_url("airplanetype"), {"name": "Boeing"}
+        )
+
+    def test_airplane(self):
+        self.assert_list_budget("airplane", 3)
+        self.assert_retrieve_budget("airplane", self.flights[0].airplane_id, 3)
+        self.assert_queries(2, "post", list_url("airplane"), {
+            "name": "New",
+            "rows": 10,
+            "seats_in_row": 4,
+            "airplane_type": AirplaneType.objects.order_by("id").first().id
+        })
+
+    def test_airport(self):
+        self.assert_list_budget("airport", 3)
+        self.assert_retrieve_budget(
+            "airport", self.flights[0].route.source_id, 3
+        )
+        self.assert_queries(2, "post", list_url("airport"), {
+            "name": "New",
+            "closest_big_city": City.objects.order_by("id").first().id
+        })
+
+    def test_route(self):
+        self.assert_list_budget("route", 3)
+        self.assert_retrieve_budget("route", self.flights[0].route_id, 3)
+        self.assert_queries(3, "post", list_url("route"), {
+            "source": self.flights[0].route.source_id,
+            "destination": self.flights[1].route.destination_id,
+            "distance": 100
+        })
+
+    def test_flight(self):
+        self.assert_list_budget("flight", 3, 2)
+        self.assert_retrieve_budget("flight", self.flights[0].id, 4)
+        for crew in (1, 10):
+            self.assert_queries(9, "post", list_url("flight"), {
+                "route": self.flights[0].route_id,
+                "airplane": self.flights[0].airplane_id,
+                "departure_time": "2026-05-01T10:00:00Z",
+                "arrival_time": "2026-05-01T12:00:00Z",
+                "crew": list(
+                    Crew.objects.order_by("id").values_list("id", flat=True)
+                )[:crew]
+            })
+
+    def test_flight_crew_looked_up_in_bulk(self):
+        crew = Crew.objects.order_by("id").first()
+        payload = {
+            "route": self.flights[0].route_id,
+            "airplane": self.flights[0].airplane_id,
+            "departure_time": "2026-05-01T10:00:00Z",
+            "arrival_time": "2026-05-01T12:00:00Z",
+        }
+
+        for ids, error in (
+            (
+                [crew.id, 999999],
+                'Invalid pk "999999" - object does not exist.'
+            ),
+            (
+                [crew.id, "x"],
+                "Incorrect type. Expected pk value, received str."
+            ),
+            ([True], "Incorrect type. Expected pk value, received bool."),
+            ([], "This list may not be empty."),
+        ):
+            res = self.client.post(
+                list_url("flight"), {**payload, "crew": ids}, format="json"
+            )
+            self.assertEqual(res.status_code, 400)
+            self.assertEqual(res.json(), {"crew": [error]})
+
+    def test_ticket(self):
+        self.assert_list_budget("ticket", 3, 2)
+        self.assert_retrieve_budget(
+            "ticket", Ticket.objects.order_by("id").first().id, 3
+        )
+        self.assert_queries(8, "post", list_url("ticket"), {
+            "passenger": "P",
+            "row": 9,
+            "seat": 1,
+            "flight": self.flights[0].id
+        })
+
+    def test_order(self):
+        self.assert_list_budget("order", 4, 3)
+        self.assert_retrieve_budget(
+            "order", Order.objects.order_by("id").first().id, 4
+        )
+        # Tickets on two flights either way: seats are taken with one
+        # UPDATE per flight.
+        for row, tickets in ((5, 2), (6, 10)):
+            self.assert_queries(10, "post", list_url("order"), {
+                "tickets": [
+                    {
+                        "passenger": f"P {i}",
+                        "row": row,
+                        "seat": i // 2 + 1,
+                        "flight": self.flights[i % 2].id
+                    }
+                    for i in range(tickets)
+                ]
+            })
+
+    def test_seat_hold(self):
+        self.assert_list_budget("seathold", 3)
+        self.assert_retrieve_budget(
+            "seathold", self.user.seat_holds.order_by("id").first().id, 2
+        )
+        for row, seats in ((8, 1), (9, 5)):
+            self.assert_queries(7, "post", list_url("seathold"), {
+                "flight": self.flights[1].id,
+                "seats": [
+                    {"row": row, "seat": seat + 1} for seat in range(seats)
+                ]
+            })
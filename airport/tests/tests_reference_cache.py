@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.cache import get_cache, stats
+from airport.models import Airport, City, Crew, ModelVersion
+
+CITY_URL = reverse("airport:city-list")
+AIRPORT_URL = reverse("airport:airport-list")
+CREW_URL = reverse("airport:crew-list")
+
+
+def detail_url(name, pk):
+    return reverse(f"airport:{name}-detail", args=[pk])
+
+
+class ReferenceCacheTests(TransactionTestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        stats.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.city = City.objects.create(name="Kyiv")
+
+    def tearDown(self) -> None:
+        get_cache().clear()
+
+    def get(self, url, params=None):
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def test_list_is_served_from_cache(self):
+        first = self.get(CITY_URL)
+
+        # Only the model versions.
+        with self.assertNumQueries(1):
+            second = self.get(CITY_URL)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(stats["city", "miss"], 1)
+        self.assertEqual(stats["city", "hit"], 1)
+
+    def test_change_made_by_another_process(self):
+        self.get(CITY_URL)
+
+        # What a save in another process leaves behind: the row and the
+        # versions table changed, the caches of this process untouched.
+        City.objects.filter(pk=self.city.pk).update(name="Odesa")
+        ModelVersion.objects.filter(label="airport.city").update(
+            version=F("version") + 1
+        )
+        res = self.get(CITY_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["name"], "Odesa")
+
+    def test_query_string_is_part_of_the_key(self):
+        City.objects.create(name="Lviv")
+        self.get(CITY_URL)
+
+        res = self.get(CITY_URL, {"limit": 1})
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_save_invalidates_list_and_detail(self):
+        self.get(CITY_URL)
+        self.get(detail_url("city", self.city.id))
+
+        self.city.name = "Kiev"
+        self.city.save()
+
+        res = self.get(CITY_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["name"], "Kiev")
+        res = self.get(detail_url("city", self.city.id))
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["name"], "Kiev")
+
+    def test_delete_invalidates_list(self):
+        crew = Crew.objects.create(name="Jane Doe", position="Pilot")
+        self.assertEqual(self.get(CREW_URL).data["count"], 1)
+
+        crew.delete()
+
+        self.assertEqual(self.get(CREW_URL).data["count"], 0)
+
+    def test_airport_list_follows_city_changes(self):
+        Airport.objects.create(name="Boryspil", closest_big_city=self.city)
+        self.get(AIRPORT_URL)
+
+        self.city.name = "Kiev"
+        self.city.save()
+
+        res = self.get(AIRPORT_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["closest_big_city"], "Kiev")
+
+    def test_missing_detail_is_not_cached(self):
+        for _ in range(2):
+            res = self.client.get(detail_url("city", self.city.id + 100))
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.assertEqual(stats["city", "miss"], 2)
+
+
+class ReferenceCacheTransactionTests(TestCase):
+    def test_responses_read_inside_a_transaction_are_not_stored(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("a@a.com", "testpass")
+        )
+        City.objects.create(name="Kyiv")
+
+        client.get(CITY_URL)
+        res = client.get(CITY_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
@@ -0,0 +1,141 @@
+import datetime
+import decimal
+import json
+import uuid
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from airport.models import City
+from airport.renderers import (
+    MessagePackRenderer,
+    ORJSONParser,
+    ORJSONRenderer,
+    msgpack,
+    orjson,
+)
+from airport.tests.tests_flight_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+CITY_URL = reverse("airport:city-list")
+
+SAMPLE = {
+    "utc": datetime.datetime(2026, 1, 1, 10, tzinfo=datetime.timezone.utc),
+    "aware": timezone.make_aware(datetime.datetime(2026, 7, 1, 9, 5, 1, 5)),
+    "naive": datetime.datetime(2026, 1, 1, 10, 0, 0, 250000),
+    "date": datetime.date(2026, 1, 1),
+    "time": datetime.time(10, 30, 0, 123456),
+    "duration": datetime.timedelta(hours=1, seconds=1),
+    "price": decimal.Decimal("10.50"),
+    "uuid": uuid.UUID(int=1),
+    "lazy": gettext_lazy("This field is required."),
+    "text": "Київ line\u2028separator\u2029",
+    "nested": [(1, 2), {"a": None, "b": True, "c": 1.5}],
+    10: "integer key",
+}
+
+
+@skipIf(orjson is None, "orjson is not installed")
+class ORJSONRendererTests(TestCase):
+    def test_same_bytes_as_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(SAMPLE),
+            JSONRenderer().render(SAMPLE)
+        )
+
+    def test_indent_and_big_integers_fall_back(self):
+        for data, media_type in (
+            (SAMPLE, "application/json; indent=4"),
+            ({"big": 2 ** 70}, "application/json"),
+        ):
+            self.assertEqual(
+                ORJSONRenderer().render(data, media_type),
+                JSONRenderer().render(data, media_type)
+            )
+
+    def test_parser(self):
+        class Stream:
+            def __init__(self, content):
+                self.content = content
+
+            def read(self):
+                return self.content
+
+        self.assertEqual(
+            ORJSONParser().parse(Stream(b'{"name": "\\u041a"}')),
+            {"name": "К"}
+        )
+
+
+class RendererNegotiationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "testpass",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        sample_flight()
+
+    def test_json_is_the_default(self):
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT="*/*")
+
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertEqual(
+            res.content,
+            JSONRenderer().render(res.data)
+        )
+
+    @skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_carries_the_json_values(self):
+        json_res = self.client.get(FLIGHT_URL)
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(res.content), json_res.json())
+        self.assertNotEqual(res["ETag"], json_res["ETag"])
+
+    @skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_encodes_like_json(self):
+        data = {key: value for key, value in SAMPLE.items() if key != 10}
+
+        self.assertEqual(
+            msgpack.unpackb(MessagePackRenderer().render(data)),
+            json.loads(JSONRenderer().render(data))
+        )
+
+    @skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_request_body(self):
+        res = self.client.post(
+            CITY_URL,
+            msgpack.packb({"name": "Lviv"}),
+            content_type="application/msgpack"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(City.objects.filter(name="Lviv").exists())
+
+    @skipIf(msgpack is None, "msgpack is not installed")
+    def test_malformed_msgpack_returns_400(self):
+        res = self.client.post(
+            CITY_URL, b"\x81\xa4na", content_type="application/msgpack"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("MessagePack parse error", res.json()["detail"])
+
+    def test_malformed_json_returns_400(self):
+        res = self.client.post(
+            CITY_URL, b'{"name": NaN}', content_type="application/json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("JSON parse error", res.json()["detail"])
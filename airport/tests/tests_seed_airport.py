@@ -0,0 +1,120 @@
+from collections import Counter, defaultdict
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.test import TestCase
+
+from airport.models import (
+    AirplaneType,
+    Airport,
+    City,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+    build_seat_map
+)
+
+VOLUMES = [
+    "--cities=12", "--airports=20", "--routes=60", "--airplanes=15",
+    "--crew=40", "--users=30", "--flights=150", "--orders=900",
+    "--tickets=2000", "--start=2026-03-01", "--days=60",
+]
+
+
+def seed(*args) -> str:
+    out = StringIO()
+    call_command("seed_airport", *VOLUMES, *args, stdout=out)
+    return out.getvalue()
+
+
+class SeedAirportTests(TestCase):
+    def test_volumes(self):
+        out = seed()
+
+        self.assertIn("150 flights", out)
+        self.assertEqual(City.objects.count(), 12)
+        self.assertEqual(Airport.objects.count(), 20)
+        self.assertEqual(Route.objects.count(), 60)
+        self.assertEqual(Flight.objects.count(), 150)
+        self.assertEqual(Ticket.objects.count(), 2000)
+        self.assertEqual(get_user_model().objects.count(), 30)
+        self.assertAlmostEqual(Order.objects.count(), 900, delta=150)
+        self.assertFalse(Order.objects.filter(tickets=None).exists())
+        self.assertFalse(
+            Route.objects.filter(
+                source__closest_big_city=F("destination__closest_big_city")
+            ).exists()
+        )
+
+    def test_seat_maps_match_tickets(self):
+        seed()
+        taken = defaultdict(list)
+        for flight_id, row, seat in Ticket.objects.values_list(
+                "flight_id", "row", "seat"
+        ):
+            taken[flight_id].append((row, seat))
+
+        for flight in Flight.objects.select_related("airplane"):
+            self.assertEqual(
+                bytes(flight.seat_map),
+                build_seat_map(
+                    flight.airplane.rows,
+                    flight.airplane.seats_in_row,
+                    taken[flight.id]
+                )
+            )
+            self.assertEqual(
+                flight.tickets_available,
+                flight.capacity - len(taken[flight.id])
+            )
+            self.assertGreaterEqual(flight.crew.count(), 2)
+
+    def test_same_seed_same_data(self):
+        def snapshot():
+            return (
+                list(
+                    Flight.objects.order_by("departure_time", "id")
+                    .values_list(
+                        "route__source__name", "route__destination__name",
+                        "airplane__name", "departure_time",
+                        "tickets_available"
+                    )
+                ),
+                list(
+                    Ticket.objects.order_by("flight__departure_time", "id")
+                    .values_list("passenger", "row", "seat", "created_at")
+                ),
+            )
+
+        seed()
+        first = snapshot()
+        for model in (City, AirplaneType, Crew, get_user_model()):
+            model.objects.all().delete()
+        seed()
+
+        self.assertEqual(snapshot(), first)
+
+        Flight.objects.all().delete()
+        seed("--seed=2")
+        self.assertNotEqual(snapshot()[0], first[0])
+
+    def test_hubs_and_full_flights(self):
+        seed("--tickets=12000")
+
+        departures = Counter(
+            Flight.objects.values_list("route__source_id", flat=True)
+        )
+        busiest = sum(count for _, count in departures.most_common(4))
+        self.assertGreater(busiest / 150, 0.3)
+        self.assertTrue(Flight.objects.filter(tickets_available=0).exists())
+
+    def test_invalid_volumes(self):
+        with self.assertRaises(CommandError):
+            seed("--airports=1")
+        with self.assertRaises(CommandError):
+            seed("--users=0")
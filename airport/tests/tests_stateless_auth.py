@@ -0,0 +1,273 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Order
+from airport.tests.tests_flight_api import sample_flight
+from airport.tests.tests_order_api import tickets_payload
+from user.authentication import UserRows, revocations, user_rows
+from user.models import ClaimsUser, RevokedToken
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+REVOKE_URL = reverse("user:token_revoke")
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+CITY_URL = reverse("airport:city-list")
+
+
+def user_queries(queries) -> list:
+    return [
+        query["sql"] for query in queries
+        if 'FROM "user_user"' in query["sql"]
+    ]
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+            first_name="Olena"
+        )
+        self.flight = sample_flight()
+        user_rows.clear()
+
+    def obtain(self, email="test@test.com", password="testpass") -> dict:
+        res = self.client.post(
+            TOKEN_URL, {"email": email, "password": password}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def get(self, url, access):
+        return self.client.get(url, headers={
+            "Authorization": f"Bearer {access}"
+        })
+
+    def test_requests_do_not_load_the_user(self):
+        access = self.obtain()["access"]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(
+                ORDER_URL,
+                {"tickets": tickets_payload(self.flight, 2)},
+                format="json",
+                headers={"Authorization": f"Bearer {access}"}
+            )
+            listed = self.get(ORDER_URL, access)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().user, self.user)
+        self.assertEqual(listed.data["count"], 1)
+        self.assertEqual(user_queries(queries), [])
+
+    def test_staff_claim(self):
+        access = self.obtain()["access"]
+        self.assertEqual(
+            self.client.post(
+                CITY_URL, {"name": "Lviv"},
+                headers={"Authorization": f"Bearer {access}"}
+            ).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+
+        self.user.is_staff = True
+        self.user.save()
+        # The old token says is_staff=False and is revoked.
+        self.assertEqual(
+            self.get(FLIGHT_URL, access).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        # A token issued right after, within the same second, is not.
+        self.assertEqual(
+            self.client.post(
+                CITY_URL, {"name": "Lviv"},
+                headers={"Authorization": f"Bearer {self.obtain()['access']}"}
+            ).status_code,
+            status.HTTP_201_CREATED
+        )
+
+    def test_other_fields_load_once(self):
+        user = ClaimsUser.from_claims(
+            self.user.id, {"email": "test@test.com", "is_staff": False}
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(user, self.user)
+            self.assertTrue(user.is_authenticated)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.first_name, "Olena")
+            self.assertEqual(user.date_joined, self.user.date_joined)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                ClaimsUser.from_claims(
+                    self.user.id, {"email": "test@test.com", "is_staff": False}
+                ).first_name,
+                "Olena"
+            )
+
+        self.user.first_name = "Iryna"
+        self.user.save()
+        self.assertEqual(
+            ClaimsUser.from_claims(
+                self.user.id, {"email": "test@test.com", "is_staff": False}
+            ).first_name,
+            "Iryna"
+        )
+
+    def test_tokens_without_claims(self):
+        access = AccessToken.for_user(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                res = self.get(FLIGHT_URL, access)
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(user_queries(queries)), 1)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(
+            self.get(FLIGHT_URL, access).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_revoke(self):
+        tokens = self.obtain()
+        other = self.obtain()
+
+        res = self.client.post(
+            REVOKE_URL,
+            {"refresh": tokens["refresh"]},
+            headers={"Authorization": f"Bearer {tokens['access']}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.get(FLIGHT_URL, tokens["access"]).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        self.assertEqual(
+            self.client.post(
+                REFRESH_URL, {"refresh": tokens["refresh"]}
+            ).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        self.assertEqual(
+            self.get(FLIGHT_URL, other["access"]).status_code,
+            status.HTTP_200_OK
+        )
+
+    def test_revoke_everywhere(self):
+        tokens = [self.obtain() for _ in range(2)]
+
+        res = self.client.post(
+            REVOKE_URL,
+            {"everywhere": True},
+            headers={"Authorization": f"Bearer {tokens[0]['access']}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        for pair in tokens:
+            self.assertEqual(
+                self.get(FLIGHT_URL, pair["access"]).status_code,
+                status.HTTP_401_UNAUTHORIZED
+            )
+            self.assertEqual(
+                self.client.post(
+                    REFRESH_URL, {"refresh": pair["refresh"]}
+                ).status_code,
+                status.HTTP_401_UNAUTHORIZED
+            )
+
+    def test_refresh_renews_claims_and_checks_the_user(self):
+        refresh = self.obtain()["refresh"]
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_staff=True
+        )
+
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(res.data["access"])["is_staff"])
+
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        self.assertEqual(
+            self.client.post(REFRESH_URL, {"refresh": refresh}).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    @override_settings(JWT_REVOCATION_CHECK_SECONDS=0)
+    def test_revocations_of_other_processes(self):
+        access = self.obtain()["access"]
+        self.assertEqual(
+            self.get(FLIGHT_URL, access).status_code, status.HTTP_200_OK
+        )
+
+        # What deactivating the user in another process leaves behind:
+        # the rows, none of this process's state.
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        RevokedToken.objects.create(
+            user=self.user,
+            expires_at=self.user.date_joined + timedelta(days=30)
+        )
+
+        self.assertEqual(
+            self.get(FLIGHT_URL, access).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        self.assertFalse(
+            ClaimsUser.from_claims(
+                self.user.id, {"email": "test@test.com", "is_staff": False}
+            ).is_active
+        )
+
+    def test_revocation_check_does_not_query(self):
+        access = AccessToken(self.obtain()["access"])
+        for number in range(50):
+            RevokedToken.objects.create(
+                jti=f"jti-{number}",
+                user=self.user,
+                expires_at=self.user.date_joined + timedelta(days=30)
+            )
+        RevokedToken.changed()
+        revocations.reload()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(revocations.is_revoked(access))
+
+
+class UserRowsTests(TestCase):
+    def test_size_and_expiry(self):
+        users = [
+            get_user_model().objects.create_user(f"{i}@test.com", "pass")
+            for i in range(3)
+        ]
+        rows = UserRows(size=2, seconds=60)
+
+        with self.assertNumQueries(3):
+            for user in users:
+                self.assertEqual(rows.get(user.pk)["email"], user.email)
+        with self.assertNumQueries(0):
+            rows.get(users[1].pk)
+            rows.get(users[2].pk)
+        with self.assertNumQueries(1):
+            rows.get(users[0].pk)
+        self.assertIsNone(rows.get(0))
+
+        rows = UserRows(size=2, seconds=0)
+        with self.assertNumQueries(2):
+            rows.get(users[0].pk)
+            rows.get(users[0].pk)
@@ -13,7 +13,9 @@ from airport.views import (
     OrderViewSet,
     TicketViewSet,
     CityViewSet,
-    CrewViewSet
+    CrewViewSet,
+    SeatHoldViewSet,
+    ItineraryViewSet
 )
 
 router = routers.DefaultRouter()
@@ -26,6 +28,8 @@ router.register("flight", FlightViewSet)
 router.register("ticket", TicketViewSet)
 router.register("order", OrderViewSet)
 router.register("crew", CrewViewSet)
+router.register("hold", SeatHoldViewSet)
+router.register("itinerary", ItineraryViewSet, basename="itinerary")
 
 
 urlpatterns = router.urls + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
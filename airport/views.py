@@ -1,10 +1,26 @@
+from datetime import datetime, time, timedelta
 from typing import Type
 
-from django.db.models import Count, F, QuerySet
+from django.db import transaction
+from django.db.models import (
+    Count,
+    Prefetch,
+    QuerySet,
+    prefetch_related_objects
+)
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, serializers, status
+from rest_framework import mixins, viewsets, serializers, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from airport.booking import book_tickets, confirm_hold, release_hold
+from airport.async_views import AsyncReadMixin
+from airport.cache import CachedResponseMixin, ConditionalGetMixin
+from airport.db_router import ReplicaReadMixin
+from airport.export import ExportMixin
+from airport.itinerary import flight_graph
 from airport.models import (
     AirplaneType,
     Airport,
@@ -14,7 +30,8 @@ from airport.models import (
     Order,
     Ticket,
     Crew,
-    City
+    City,
+    SeatHold
 )
 from airport.permissions import IsTicketOrderCreatorOrReadOnly
 
@@ -27,19 +44,33 @@ from airport.serializers import (
     FlightSerializer,
     TicketSerializer,
     OrderSerializer,
+    OrderListSerializer,
     CrewSerializer,
     AirplaneListSerializer,
     AirplaneDetailSerializer,
+    AirplaneImageSerializer,
     AirportListSerializer,
     AirportDetailSerializer,
     RouteListSerializer,
     RouteDetailSerializer,
     FlightListSerializer,
-    FlightDetailSerializer
+    FlightListValuesSerializer,
+    FlightDetailSerializer,
+    SeatHoldSerializer,
+    SeatHoldConfirmSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    FlightFilterSerializer,
+    TICKET_FLIGHT_RELATED
 )
 
 
-class CityViewSet(viewsets.ModelViewSet):
+class CityViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet
+):
     queryset = City.objects.all()
     serializer_class = CitySerializer
 
@@ -48,7 +79,12 @@ class CityViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet
+):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
 
@@ -57,7 +93,12 @@ class CrewViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet
+):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
 
@@ -66,13 +107,18 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet
+):
     queryset = Airplane.objects.all()
     serializer_class = AirplaneSerializer
+    cache_models = (AirplaneType,)
 
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset
-        if self.action == "list":
+        if self.action in ("list", "retrieve"):
             queryset = queryset.select_related("airplane_type")
         return queryset
 
@@ -81,16 +127,53 @@ class AirplaneViewSet(viewsets.ModelViewSet):
             return AirplaneListSerializer
         if self.action == "retrieve":
             return AirplaneDetailSerializer
+        if self.action == "upload_image":
+            return AirplaneImageSerializer
         return AirplaneSerializer
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "image_width",
+                type={"type": "number"},
+                description="Width in pixels the image is shown at; the "
+                            "narrowest rendition at least that wide is "
+                            "returned (ex. ?image_width=640)"
+            )
+        ]
+    )
     def list(self, request, *args, **kwargs):
         """Get list of Airplane"""
         return super().list(request, *args, **kwargs)
 
-
-class AirportViewSet(viewsets.ModelViewSet):
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="upload-image"
+    )
+    def upload_image(self, request, pk=None):
+        """
+        Upload an image of the airplane; resized renditions are made
+        in the background and listed on the airplane once ready
+        """
+        airplane = self.get_object()
+        serializer = self.get_serializer(airplane, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AirportViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet
+):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
+    cache_models = (City,)
+    async_actions = {"list"}
 
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset
@@ -99,7 +182,7 @@ class AirportViewSet(viewsets.ModelViewSet):
 
         if closest_big_city:
             queryset = queryset.filter(closest_big_city=closest_big_city)
-        if self.action == "list":
+        if self.action in ("list", "retrieve"):
             queryset = queryset.select_related("closest_big_city")
         return queryset
 
@@ -125,15 +208,22 @@ class AirportViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet
+):
     queryset = Route.objects.all()
     serializer_class = RouteSerializer
+    cache_models = (Airport, City)
+    async_actions = {"list"}
 
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset
         source_id = self.request.query_params.get("source")
         destination_id = self.request.query_params.get("destination")
-        if self.action == "list":
+        if self.action in ("list", "retrieve"):
             queryset = (
                 queryset
                 .select_related("source", "destination")
@@ -173,12 +263,29 @@ class RouteViewSet(viewsets.ModelViewSet):
         return RouteSerializer
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet
+):
     queryset = Flight.objects.all()
     serializer_class = FlightSerializer
+    cache_models = (Route, Airport, City, Airplane, AirplaneType, Crew)
+    cursor_ordering = ("departure_time", "id")
+    export_fields = (
+        ("id", "id"),
+        ("route", "route_id"),
+        ("source", "route__source__name"),
+        ("destination", "route__destination__name"),
+        ("airplane", "airplane__name"),
+        ("departure_time", "departure_time"),
+        ("arrival_time", "arrival_time"),
+        ("tickets_available", "tickets_available"),
+    )
 
-    def get_queryset(self) -> QuerySet:
-        queryset = self.queryset
+    def filter_flights(self, queryset) -> QuerySet:
         airplane = self.request.query_params.get("airplane")
         route_source_id = self.request.query_params.get(
             "route_source"
@@ -198,16 +305,26 @@ class FlightViewSet(viewsets.ModelViewSet):
                 route__destination_id=route_destination_id
             )
 
+        return FlightFilterSerializer(
+            data=self.request.query_params
+        ).filter_queryset(queryset)
+
+    def get_queryset(self) -> QuerySet:
+        queryset = self.queryset
+        # Only lists are filtered, a detail request ignores the query
+        # string instead of failing on it.
+        if self.action in ("list", "export"):
+            queryset = self.filter_flights(queryset)
+
         if self.action == "list":
+            queryset = FlightListValuesSerializer.project(queryset)
+        if self.action == "retrieve":
             queryset = (
                 queryset
-                .select_related("route", "airplane")
-                .prefetch_related("crew")
-                .annotate(
-                    tickets_available=F("airplane__rows")
-                    * F("airplane__seats_in_row") -
-                    Count("tickets")
+                .select_related(
+                    "route__source", "route__destination", "airplane"
                 )
+                .prefetch_related("crew")
             )
 
         return queryset.order_by("id")
@@ -225,8 +342,10 @@ class FlightViewSet(viewsets.ModelViewSet):
                 type={"type": "number"},
                 description="Filter by destination id "
                             "(ex. ?destination=1 or ?source=1&destination=2)"
-            )
-        ]
+            ),
+            FlightFilterSerializer
+        ],
+        responses=FlightListSerializer(many=True)
     )
     def list(self, request, *args, **kwargs) -> list:
         """Get list of Flight"""
@@ -234,29 +353,65 @@ class FlightViewSet(viewsets.ModelViewSet):
 
     def get_serializer_class(self) -> Type[serializers.ModelSerializer]:
         if self.action == "list":
-            return FlightListSerializer
+            return FlightListValuesSerializer
         if self.action == "retrieve":
             return FlightDetailSerializer
         return FlightSerializer
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+TICKET_RELATED = tuple(
+    f"flight__{field}" for field in TICKET_FLIGHT_RELATED
+)
+# The columns order tickets show: the flight times, the route label and
+# the airplane name. Airplane images, seat maps and the rest are left
+# out of the tickets query.
+ORDER_TICKET_FIELDS = (
+    "passenger", "row", "seat", "order", "flight",
+    "flight__departure_time", "flight__arrival_time",
+    "flight__route", "flight__route__label",
+    "flight__airplane", "flight__airplane__name",
+)
+
+
+class TicketViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    viewsets.ModelViewSet
+):
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
+    cache_models = (Order, Flight, Route, Airport, City, Airplane)
     permission_classes = [IsTicketOrderCreatorOrReadOnly]
+    cursor_ordering = ("-created_at", "-id")
+    export_fields = (
+        ("id", "id"),
+        ("order", "order_id"),
+        ("flight", "flight_id"),
+        ("source", "flight__route__source__name"),
+        ("destination", "flight__route__destination__name"),
+        ("departure_time", "flight__departure_time"),
+        ("row", "row"),
+        ("seat", "seat"),
+        ("passenger", "passenger"),
+        ("created_at", "created_at"),
+    )
 
     def get_queryset(self) -> QuerySet:
-        queryset = self.queryset.select_related("flight", "order")
+        queryset = self.queryset.select_related(*TICKET_RELATED, "order")
         return queryset.filter(order__user=self.request.user)
 
     def perform_create(self, serializer):
-        data = serializer.validated_data
         user = self.request.user
-        order = Order.objects.create(user=user)
-        serializer.save(order=order)
+        with transaction.atomic():
+            order = Order.objects.create(user=user)
+            serializer.instance, = book_tickets(
+                order, [serializer.validated_data]
+            )
 
     def perform_destroy(self, instance):
-        instance.delete()
+        with transaction.atomic():
+            instance.delete()
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -273,16 +428,148 @@ class TicketViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    viewsets.ModelViewSet
+):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    cache_models = (Ticket, Flight, Route, Airport, City, Airplane)
     permission_classes = [IsTicketOrderCreatorOrReadOnly]
+    cursor_ordering = ("-created_at", "-id")
+    export_fields = (
+        ("id", "id"),
+        ("created_at", "created_at"),
+        ("tickets", "ticket_count"),
+    )
 
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset
-        if self.action == "list":
-            queryset = queryset.select_related("user")
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.prefetch_related(self.tickets_prefetch())
         return queryset.filter(user=self.request.user)
 
+    def get_serializer_class(self) -> Type[serializers.ModelSerializer]:
+        if self.action == "list":
+            return OrderListSerializer
+        return OrderSerializer
+
+    @staticmethod
+    def tickets_prefetch() -> Prefetch:
+        """
+        The tickets of the orders with everything they show, in one
+        query: a page of orders takes the same queries whatever the
+        number of orders and tickets.
+        """
+        return Prefetch(
+            "tickets",
+            queryset=(
+                Ticket.objects
+                .select_related(*TICKET_RELATED)
+                .only(*ORDER_TICKET_FIELDS)
+            )
+        )
+
+    def get_export_queryset(self) -> QuerySet:
+        return super().get_export_queryset().annotate(
+            ticket_count=Count("tickets")
+        )
+
+    def perform_create(self, serializer) -> None:
+        order = serializer.save(user=self.request.user)
+        # The response lists the tickets with their routes.
+        prefetch_related_objects([order], self.tickets_prefetch())
+
+
+class SeatHoldViewSet(
+    ReplicaReadMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet:
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == "list":
+            queryset = queryset.filter(expires_at__gt=timezone.now())
+        return queryset.prefetch_related("seats")
+
     def perform_create(self, serializer) -> None:
         serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance) -> None:
+        release_hold(instance)
+
+    def list(self, request, *args, **kwargs):
+        """Get list of active seat holds of the current user"""
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        request=SeatHoldConfirmSerializer,
+        responses={status.HTTP_201_CREATED: OrderSerializer}
+    )
+    @action(detail=True, methods=["post"])
+    def confirm(self, request, pk=None):
+        """Turn the held seats into an order with one ticket per seat"""
+        hold = self.get_object()
+        serializer = SeatHoldConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = confirm_hold(hold, serializer.validated_data["tickets"])
+        return Response(
+            OrderSerializer(order, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ItineraryViewSet(viewsets.ViewSet):
+    @extend_schema(
+        parameters=[ItinerarySearchSerializer],
+        responses=ItinerarySerializer(many=True)
+    )
+    def list(self, request):
+        """
+        Search 1-3 leg connections between airports (origin, destination)
+        or cities (origin_city, destination_city) departing on a date
+        (ex. ?origin_city=1&destination=7&date=2024-05-01&max_legs=2)
+        """
+        params = ItinerarySearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        earliest = timezone.make_aware(
+            datetime.combine(params["date"], time.min)
+        )
+        itineraries = flight_graph.search(
+            origins=self.get_airports(params, "origin"),
+            destinations=self.get_airports(params, "destination"),
+            origin_cities=self.get_cities(params, "origin"),
+            destination_cities=self.get_cities(params, "destination"),
+            earliest=earliest,
+            latest=earliest + timedelta(days=1),
+            min_connection=timedelta(minutes=params["min_connection"]),
+            max_connection=timedelta(minutes=params["max_connection"]),
+            max_legs=params["max_legs"],
+            passengers=params["passengers"],
+            limit=params["limit"],
+            ordering=params["ordering"]
+        )
+        return Response(ItinerarySerializer(itineraries, many=True).data)
+
+    @staticmethod
+    def get_airports(params, end) -> set:
+        if params.get(end) is not None:
+            return {params[end]}
+        return set()
+
+    @staticmethod
+    def get_cities(params, end) -> set:
+        if params.get(end) is not None:
+            return set()
+        return {params[f"{end}_city"]}
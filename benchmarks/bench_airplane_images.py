@@ -0,0 +1,108 @@
+"""
+Airplane image uploads of growing size: request latency with the
+rendition pool against the time rendering would add to the request,
+and how long the pool takes to record the renditions.
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_airplane_images
+"""
+import io
+import random
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image, ImageFilter
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airplane
+from airport.renditions import render_image
+from airport.tests.tests_airplane_api import sample_airplane
+
+SIZES = ((800, 600), (3000, 2000), (6000, 4000))
+UPLOADS = 3
+
+
+def photo(width, height) -> bytes:
+    """A noisy JPEG, which compresses about as badly as a photo."""
+    random.seed(width)
+    image = Image.frombytes(
+        "RGB", (width // 4, height // 4),
+        random.randbytes(width // 4 * height // 4 * 3)
+    ).resize((width, height)).filter(ImageFilter.SMOOTH)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+@override_settings(AIRPLANE_IMAGE_WORKERS=2)
+class AirplaneImageBenchmark(TransactionTestCase):
+    def setUp(self) -> None:
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "testpass", is_staff=True
+            )
+        )
+
+    def wait_for_renditions(self, airplane_ids, timeout=120):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not Airplane.objects.filter(
+                id__in=airplane_ids, image_renditions=[]
+            ).exists():
+                return
+            time.sleep(0.05)
+        self.fail("renditions were not recorded")
+
+    def test_upload_latency(self):
+        print(
+            f"\n{'image':>11} {'bytes':>10} {'upload ms':>10} "
+            f"{'render ms':>10} {'ready ms':>9}"
+        )
+        latencies = []
+        for width, height in SIZES:
+            data = photo(width, height)
+            airplanes = [sample_airplane() for _ in range(UPLOADS)]
+
+            start = time.perf_counter()
+            render_image(data, (160, 320, 640, 1280))
+            render_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            upload_ms = 0.0
+            for airplane in airplanes:
+                upload_start = time.perf_counter()
+                res = self.client.post(
+                    reverse(
+                        "airport:airplane-upload-image", args=[airplane.id]
+                    ),
+                    {"image": SimpleUploadedFile("plane.jpg", data)},
+                    format="multipart"
+                )
+                upload_ms += time.perf_counter() - upload_start
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.wait_for_renditions([airplane.id for airplane in airplanes])
+            ready_ms = (time.perf_counter() - start) * 1000 / UPLOADS
+
+            upload_ms = upload_ms * 1000 / UPLOADS
+            latencies.append((upload_ms, render_ms))
+            print(
+                f"{width:>5}x{height:<5} {len(data):>10} {upload_ms:>10.1f} "
+                f"{render_ms:>10.1f} {ready_ms:>9.1f}"
+            )
+
+        (_, _), (largest_upload, largest_render) = latencies[0], latencies[-1]
+        self.assertLess(largest_upload, largest_render / 2)
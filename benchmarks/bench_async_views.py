@@ -0,0 +1,182 @@
+"""
+Concurrent-request throughput of the read endpoints served by uvicorn
+(ASGI, async views) and gunicorn with threads (WSGI, sync views), each
+with one worker process, under CLIENTS simultaneous clients. gunicorn
+is not a requirement of the project: the WSGI row is skipped unless it
+is installed (pip install gunicorn).
+
+The servers run as subprocesses against the test database, so the
+fixtures are committed (TransactionTestCase). Not collected by the test
+runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_async_views
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Flight
+from airport.tests.tests_flight_api import sample_flight
+
+FLIGHTS = 200
+CLIENTS = 500
+REQUESTS_PER_CLIENT = 4
+WSGI_THREADS = 32
+PATHS = (
+    reverse("airport:flight-list") + "?limit=20",
+    reverse("airport:route-list"),
+    reverse("airport:airport-list"),
+)
+
+SERVERS = {
+    "uvicorn (ASGI)": [
+        "uvicorn", "service.asgi:application",
+        "--workers", "1", "--no-access-log", "--log-level", "warning",
+        "--backlog", "2048", "--port", "{port}",
+    ],
+    "gunicorn (WSGI)": [
+        "gunicorn", "service.wsgi:application",
+        "--workers", "1", "--worker-class", "gthread",
+        "--threads", str(WSGI_THREADS), "--backlog", "2048",
+        "--log-level", "warning", "--bind", "127.0.0.1:{port}",
+    ],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def fetch(port: int, path: str, token: str) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: localhost\r\n"
+        f"Authorization: Bearer {token}\r\n"
+        f"Connection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def run_clients(port: int, token: str):
+    latencies = []
+    errors = 0
+
+    async def client(number):
+        nonlocal errors
+        for i in range(REQUESTS_PER_CLIENT):
+            start = time.perf_counter()
+            try:
+                status_code = await fetch(
+                    port, PATHS[(number + i) % len(PATHS)], token
+                )
+            except (OSError, IndexError, ValueError):
+                status_code = None
+            latencies.append(time.perf_counter() - start)
+            errors += status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(CLIENTS)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+class AsyncViewsBenchmark(TransactionTestCase):
+    def setUp(self) -> None:
+        flight = sample_flight()
+        Flight.objects.bulk_create(
+            Flight(
+                route=flight.route,
+                airplane=flight.airplane,
+                departure_time=flight.departure_time + timedelta(hours=i),
+                arrival_time=flight.arrival_time + timedelta(hours=i),
+                seat_map=bytes(flight.seat_map),
+                tickets_available=flight.tickets_available
+            )
+            for i in range(FLIGHTS - 1)
+        )
+        user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.token = str(AccessToken.for_user(user))
+
+    def serve(self, command):
+        port = free_port()
+        env = {
+            **os.environ,
+            "POSTGRES_DB": connection.settings_dict["NAME"],
+            "DEBUG": "False",
+        }
+        bin_dir = os.path.dirname(sys.executable)
+        server = subprocess.Popen(
+            [os.path.join(bin_dir, command[0]), *(
+                part.format(port=port) for part in command[1:]
+            )],
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", port)).close()
+                return server, port
+            except OSError:
+                time.sleep(0.1)
+        server.terminate()
+        self.fail(f"{command[0]} did not start")
+
+    def measure(self, command):
+        server, port = self.serve(command)
+        try:
+            # Warm up imports, URL resolution and the version stamps.
+            asyncio.run(fetch(port, PATHS[0], self.token))
+            return asyncio.run(run_clients(port, self.token))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+    def test_concurrent_clients(self):
+        total = CLIENTS * REQUESTS_PER_CLIENT
+        print(
+            f"\n{CLIENTS} clients x {REQUESTS_PER_CLIENT} requests, "
+            f"one worker process, {FLIGHTS} flights"
+        )
+        print(
+            f"{'':>16} {'req/s':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'errors':>7}"
+        )
+        results = {}
+        bin_dir = os.path.dirname(sys.executable)
+        for name, command in SERVERS.items():
+            if not os.path.exists(os.path.join(bin_dir, command[0])):
+                print(f"{name:>16} {command[0]} is not installed")
+                continue
+            elapsed, latencies, errors = self.measure(command)
+            results[name] = total / elapsed
+            print(
+                f"{name:>16} {total / elapsed:>8.0f} "
+                f"{latencies[len(latencies) // 2] * 1000:>8.0f} "
+                f"{latencies[int(len(latencies) * 0.95)] * 1000:>8.0f} "
+                f"{errors:>7}"
+            )
+            self.assertEqual(errors, 0, name)
@@ -0,0 +1,89 @@
+"""
+Concurrent booking benchmark: optimistic, constraint-backed order
+create against check-then-insert (SELECT each seat, then INSERT each
+ticket) on a single flight.
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_booking
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.test import TransactionTestCase
+
+from airport.booking import SeatsTaken
+from airport.models import Order, Ticket
+from airport.tests.tests_booking import (
+    create_order,
+    run_concurrent_bookings,
+    sample_flight
+)
+
+THREADS = 16
+ATTEMPTS = 40
+
+
+def check_then_insert_order(user, flight, seats):
+    taken_seats = [
+        (flight.id, row, seat) for row, seat in seats
+        if Ticket.objects.filter(flight=flight, row=row, seat=seat).exists()
+    ]
+    if taken_seats:
+        raise SeatsTaken(taken_seats)
+    try:
+        with transaction.atomic():
+            order = Order.objects.create(user=user)
+            for row, seat in seats:
+                Ticket.objects.create(
+                    passenger="Passenger",
+                    flight=flight,
+                    order=order,
+                    row=row,
+                    seat=seat
+                )
+    except IntegrityError:
+        raise SeatsTaken([(flight.id, row, seat) for row, seat in seats])
+    return order
+
+
+class ConcurrentBookingBenchmark(TransactionTestCase):
+    def setUp(self) -> None:
+        self.users = [
+            get_user_model().objects.create_user(
+                f"user{i}@test.com", "testpass"
+            )
+            for i in range(THREADS)
+        ]
+
+    def measure(self, create_order):
+        flight = sample_flight(rows=60, seats_in_row=6)
+        start = time.perf_counter()
+        counts = run_concurrent_bookings(
+            create_order, flight, self.users, ATTEMPTS
+        )
+        elapsed = time.perf_counter() - start
+
+        seats = list(
+            Ticket.objects.filter(flight=flight).values_list("row", "seat")
+        )
+        self.assertEqual(len(seats), len(set(seats)))
+        self.assertEqual(len(seats), counts["sold"] * 2)
+        return THREADS * ATTEMPTS / elapsed, counts
+
+    def test_concurrent_bookings(self):
+        check_then_insert, old_counts = self.measure(check_then_insert_order)
+        optimistic, new_counts = self.measure(create_order)
+
+        print(
+            f"\n{THREADS} threads x {ATTEMPTS} orders of 2 seats, 360 seats"
+            f"\ncheck-then-insert: {check_then_insert:8.1f} orders/s"
+            f" (sold {old_counts['sold']}, taken {old_counts['taken']},"
+            f" failed {old_counts['failed']})"
+            f"\noptimistic:        {optimistic:8.1f} orders/s"
+            f" (sold {new_counts['sold']}, taken {new_counts['taken']},"
+            f" failed {new_counts['failed']})"
+        )
+        self.assertEqual(new_counts["failed"], 0)
+        self.assertGreater(optimistic, check_then_insert)
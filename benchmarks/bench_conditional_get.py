@@ -0,0 +1,106 @@
+"""
+Clients polling the flight list every few seconds: plain GETs against
+GETs that send back the last ETag (If-None-Match), with one booking
+every BOOK_EVERY polls so some of the polls do see new data.
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_conditional_get
+"""
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, Ticket
+from airport.tests.tests_booking import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+FLIGHTS = 100
+PAGE = {"limit": 50}
+POLLS = 200
+BOOK_EVERY = 20
+
+
+class ConditionalGetBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        flight = sample_flight()
+        Flight.objects.bulk_create(
+            Flight(
+                route=flight.route,
+                airplane=flight.airplane,
+                departure_time=flight.departure_time + timedelta(hours=i),
+                arrival_time=flight.arrival_time + timedelta(hours=i),
+                seat_map=bytes(flight.seat_map),
+                tickets_available=flight.tickets_available
+            )
+            for i in range(FLIGHTS - 1)
+        )
+        cls.flight = flight
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.seats = (
+            (row, seat)
+            for row in range(1, self.flight.airplane.rows + 1)
+            for seat in range(1, self.flight.airplane.seats_in_row + 1)
+        )
+
+    def book(self):
+        row, seat = next(self.seats)
+        Ticket.objects.create(
+            order=Order.objects.create(user=self.user),
+            flight=self.flight,
+            row=row,
+            seat=seat,
+            passenger="Passenger"
+        )
+
+    def poll(self, conditional):
+        etag = None
+        sent = not_modified = 0
+        elapsed = 0.0
+        for i in range(POLLS):
+            if i and i % BOOK_EVERY == 0:
+                self.book()
+            headers = {}
+            if conditional and etag:
+                headers["HTTP_IF_NONE_MATCH"] = etag
+            start = time.perf_counter()
+            res = self.client.get(FLIGHT_URL, PAGE, **headers)
+            elapsed += time.perf_counter() - start
+            sent += len(res.content)
+            if res.status_code == status.HTTP_304_NOT_MODIFIED:
+                not_modified += 1
+            etag = res["ETag"]
+        return sent, elapsed * 1000, not_modified
+
+    def test_polling(self):
+        rows = [
+            ("plain GET", *self.poll(conditional=False)),
+            ("If-None-Match", *self.poll(conditional=True)),
+        ]
+
+        print(
+            f"\n{POLLS} polls of {PAGE['limit']} flights, "
+            f"a booking every {BOOK_EVERY} polls"
+        )
+        print(f"{'':>14} {'body bytes':>12} {'total ms':>10} {'304s':>6}")
+        for name, sent, elapsed_ms, not_modified in rows:
+            print(
+                f"{name:>14} {sent:>12} {elapsed_ms:>10.1f} {not_modified:>6}"
+            )
+
+        (_, plain_bytes, plain_ms, _), (_, cond_bytes, cond_ms, _) = rows
+        self.assertLess(cond_bytes, plain_bytes / 5)
+        self.assertLess(cond_ms, plain_ms / 2)
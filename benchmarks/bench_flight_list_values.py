@@ -0,0 +1,121 @@
+"""
+Per-row cost of the flight list: FlightListSerializer on model
+instances (select_related + prefetched crew) against
+FlightListValuesSerializer on values() rows, with and without the
+queries, for FLIGHTS flights with CREW_PER_FLIGHT crew each.
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_flight_list_values
+"""
+import time
+from datetime import timedelta
+
+from django.db.models import Prefetch
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from airport.models import Crew, Flight
+from airport.serializers import (
+    FlightListSerializer,
+    FlightListValuesSerializer,
+)
+from airport.tests.tests_flight_api import sample_flight
+
+FLIGHTS = 2000
+CREW_PER_FLIGHT = 3
+REPEAT = 5
+
+
+class FlightListValuesBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        flight = sample_flight()
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route=flight.route,
+                airplane=flight.airplane,
+                departure_time=flight.departure_time + timedelta(hours=i),
+                arrival_time=flight.arrival_time + timedelta(hours=i),
+                seat_map=bytes(flight.seat_map),
+                tickets_available=flight.tickets_available
+            )
+            for i in range(FLIGHTS - 1)
+        ) + [flight]
+        crew = Crew.objects.bulk_create(
+            Crew(name=f"Crew {i}", position="Pilot") for i in range(30)
+        )
+        Flight.crew.through.objects.bulk_create(
+            Flight.crew.through(
+                flight_id=flight.id,
+                crew_id=crew[(flight.id + i) % len(crew)].id
+            )
+            for flight in flights
+            for i in range(CREW_PER_FLIGHT)
+        )
+
+    def setUp(self) -> None:
+        request = APIRequestFactory().get("/")
+        request.query_params = request.GET
+        self.context = {"request": request}
+
+    def instances(self) -> list:
+        return list(
+            Flight.objects
+            .select_related(
+                "route__source__closest_big_city",
+                "route__destination__closest_big_city",
+                "airplane"
+            )
+            .prefetch_related(
+                Prefetch("crew", queryset=Crew.objects.order_by("id"))
+            )
+            .order_by("id")
+        )
+
+    def rows(self) -> list:
+        return list(
+            FlightListValuesSerializer.project(Flight.objects.order_by("id"))
+        )
+
+    def timed(self, load, serializer_class):
+        """Best of REPEAT (load ms, serialize ms)."""
+        best = None
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            objects = load()
+            loaded = time.perf_counter()
+            data = serializer_class(
+                objects, many=True, context=self.context
+            ).data
+            done = time.perf_counter()
+            self.assertEqual(len(data), FLIGHTS)
+            timing = ((loaded - start) * 1000, (done - loaded) * 1000)
+            if best is None or sum(timing) < sum(best):
+                best = timing
+        return best
+
+    def test_per_row_cost(self):
+        rows = [
+            ("model instances", *self.timed(
+                self.instances, FlightListSerializer
+            )),
+            ("values() rows", *self.timed(
+                self.rows, FlightListValuesSerializer
+            )),
+        ]
+
+        print(f"\n{FLIGHTS} flights, {CREW_PER_FLIGHT} crew each")
+        print(
+            f"{'':>16} {'load ms':>9} {'serialize ms':>13} "
+            f"{'us/row':>8}"
+        )
+        for name, load_ms, serialize_ms in rows:
+            print(
+                f"{name:>16} {load_ms:>9.1f} {serialize_ms:>13.1f} "
+                f"{(load_ms + serialize_ms) * 1000 / FLIGHTS:>8.1f}"
+            )
+
+        (_, model_load, model_ser), (_, values_load, values_ser) = rows
+        self.assertLess(values_ser, model_ser / 3)
+        self.assertLess(values_load + values_ser, model_load + model_ser)
@@ -0,0 +1,88 @@
+"""
+import_schedule on a generated 100,000-flight CSV file: 30 airports,
+50 airplanes, 200 crew members, two crew members per flight and every
+route new.
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_import_schedule
+"""
+import csv
+import os
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Crew,
+    Flight
+)
+
+FLIGHTS = 100_000
+AIRPORTS = 30
+AIRPLANES = 50
+CREW = 200
+
+
+class ImportScheduleBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name="City")
+        airplane_type = AirplaneType.objects.create(name="Jet")
+        Airport.objects.bulk_create(
+            Airport(name=f"AP{i}", closest_big_city=city)
+            for i in range(AIRPORTS)
+        )
+        Airplane.objects.bulk_create(
+            Airplane(
+                name=f"UR-{i}", rows=30, seats_in_row=6,
+                airplane_type=airplane_type
+            )
+            for i in range(AIRPLANES)
+        )
+        Crew.objects.bulk_create(
+            Crew(name=f"Crew {i}", position="Crew") for i in range(CREW)
+        )
+
+    def write_schedule(self, path):
+        start = datetime(2026, 6, 1)
+        with open(path, "w", newline="") as stream:
+            writer = csv.writer(stream)
+            writer.writerow((
+                "source", "destination", "airplane", "departure_time",
+                "arrival_time", "distance", "crew"
+            ))
+            for i in range(FLIGHTS):
+                source = i % AIRPORTS
+                destination = (source + 1 + i // AIRPORTS % 7) % AIRPORTS
+                departure_time = start + timedelta(minutes=5 * i)
+                writer.writerow((
+                    f"AP{source}", f"AP{destination}",
+                    f"UR-{i % AIRPLANES}",
+                    departure_time.isoformat(),
+                    (departure_time + timedelta(hours=2)).isoformat(),
+                    800,
+                    f"Crew {i % CREW};Crew {(i + 1) % CREW}",
+                ))
+
+    def test_import_100k_flights(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        self.write_schedule(path)
+
+        out = StringIO()
+        call_command("import_schedule", path, stdout=out)
+
+        print(f"\n{out.getvalue().strip()}")
+        self.assertEqual(Flight.objects.count(), FLIGHTS)
+        self.assertEqual(
+            Flight.crew.through.objects.count(), FLIGHTS * 2
+        )
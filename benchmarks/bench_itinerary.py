@@ -0,0 +1,130 @@
+"""
+Itinerary search benchmark on 500 airports (20 hubs) and 50,000 flights
+over a week, hub-and-spoke routes: graph build time and search latency
+for random origin/destination pairs with up to 3 legs.
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_itinerary
+"""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from airport.itinerary import flight_graph
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    City,
+    Flight,
+    Route,
+    seat_map_size
+)
+
+AIRPORTS = 500
+HUBS = 20
+FLIGHTS = 50_000
+DAYS = 7
+SEARCHES = 200
+
+
+class ItinerarySearchBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generator = random.Random(7)
+        cities = City.objects.bulk_create(
+            City(name=f"City {i}") for i in range(AIRPORTS)
+        )
+        airports = Airport.objects.bulk_create(
+            Airport(name=f"Airport {i}", closest_big_city=city)
+            for i, city in enumerate(cities)
+        )
+        hubs = airports[:HUBS]
+        pairs = {
+            (source, destination)
+            for source in hubs for destination in hubs
+            if source != destination
+        }
+        for airport in airports[HUBS:]:
+            for hub in generator.sample(hubs, 2):
+                pairs |= {(airport, hub), (hub, airport)}
+            other = generator.choice(airports[HUBS:])
+            if other != airport:
+                pairs.add((airport, other))
+        routes = Route.objects.bulk_create(
+            Route(
+                source=source,
+                destination=destination,
+                distance=generator.randint(200, 3000)
+            )
+            for source, destination in pairs
+        )
+        airplane = Airplane.objects.create(
+            name="A320",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Narrow")
+        )
+        start = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+        flights = []
+        for _ in range(FLIGHTS):
+            route = generator.choice(routes)
+            departure = start + timedelta(
+                minutes=generator.randrange(DAYS * 24 * 60)
+            )
+            flights.append(Flight(
+                route=route,
+                airplane=airplane,
+                departure_time=departure,
+                arrival_time=departure + timedelta(
+                    minutes=30 + route.distance // 10
+                ),
+                seat_map=bytes(seat_map_size(30, 6)),
+                tickets_available=generator.randint(0, 180)
+            ))
+        Flight.objects.bulk_create(flights, batch_size=5000)
+        cls.airports = airports
+        cls.start = start
+
+    def test_search(self):
+        generator = random.Random(11)
+
+        start = time.perf_counter()
+        flight_graph.build()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        timings = []
+        results = 0
+        for _ in range(SEARCHES):
+            origin, destination = generator.sample(self.airports, 2)
+            earliest = self.start + timedelta(days=generator.randrange(DAYS))
+            start = time.perf_counter()
+            itineraries = flight_graph.search(
+                origins={origin.id},
+                destinations={destination.id},
+                earliest=earliest,
+                latest=earliest + timedelta(days=1),
+                min_connection=timedelta(minutes=45),
+                max_connection=timedelta(hours=6),
+                max_legs=3,
+                passengers=2
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+            results += bool(itineraries)
+
+        timings.sort()
+        print(
+            f"\n{AIRPORTS} airports, {len(flight_graph.graph.legs)} flights:"
+            f" graph built in {build_ms:.0f} ms"
+            f"\n{SEARCHES} searches, {results} with results:"
+            f" p50 {statistics.median(timings):.2f} ms,"
+            f" p95 {timings[int(SEARCHES * 0.95)]:.2f} ms,"
+            f" max {timings[-1]:.2f} ms"
+        )
@@ -0,0 +1,103 @@
+"""
+Order create benchmark: the bulk path of OrderSerializer against the
+previous per-ticket path (one flight lookup, two seat queries and one
+INSERT per ticket).
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_order_create
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from airport.models import Flight, Order, Ticket
+from airport.serializers import OrderSerializer
+from airport.tests.tests_order_api import sample_flight, tickets_payload
+
+ORDER_SIZES = (1, 10, 100)
+REPEAT = 20
+
+
+def per_ticket_create_order(user, tickets_data):
+    for ticket_data in tickets_data:
+        flight = Flight.objects.get(pk=ticket_data["flight"])
+        Ticket.objects.filter(
+            row=ticket_data["row"], seat=ticket_data["seat"]
+        ).exists()
+        Ticket.objects.filter(
+            flight=flight, seat=ticket_data["seat"]
+        ).exists()
+        if not (
+                1 <= ticket_data["row"] <= flight.airplane.rows
+                and 1 <= ticket_data["seat"] <= flight.airplane.seats_in_row
+        ):
+            raise ValueError(ticket_data)
+        ticket_data["flight"] = flight
+
+    with transaction.atomic():
+        order = Order.objects.create(user=user)
+        for ticket_data in tickets_data:
+            Ticket.objects.create(order=order, **ticket_data)
+    return order
+
+
+class OrderCreateBenchmark(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        request = APIRequestFactory().post("/")
+        request.user = self.user
+        self.context = {"request": request}
+        self.flight = sample_flight()
+
+    def bulk_create_order(self, tickets_data):
+        serializer = OrderSerializer(
+            data={"tickets": tickets_data}, context=self.context
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=self.user)
+
+    def measure(self, create_order, size):
+        timings = []
+        queries = 0
+        for _ in range(REPEAT):
+            with transaction.atomic():
+                payload = tickets_payload(self.flight, size)
+                connection.queries_log.clear()
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    create_order(payload)
+                    timings.append(time.perf_counter() - start)
+                queries = len(captured)
+                transaction.set_rollback(True)
+        return statistics.median(timings) * 1000, queries
+
+    def test_order_create(self):
+        rows = []
+        for size in ORDER_SIZES:
+            per_ticket = self.measure(
+                lambda payload: per_ticket_create_order(self.user, payload),
+                size
+            )
+            bulk = self.measure(self.bulk_create_order, size)
+            rows.append((size, per_ticket, bulk))
+
+        print(
+            f"\n{'tickets':>8} {'per-ticket ms':>14} {'queries':>8}"
+            f" {'bulk ms':>8} {'queries':>8} {'speedup':>8}"
+        )
+        for size, (old_ms, old_queries), (new_ms, new_queries) in rows:
+            print(
+                f"{size:>8} {old_ms:>14.2f} {old_queries:>8}"
+                f" {new_ms:>8.2f} {new_queries:>8} {old_ms / new_ms:>7.1f}x"
+            )
+            if size > 1:
+                self.assertLess(new_queries, old_queries)
@@ -0,0 +1,95 @@
+"""
+Flight list page latency at increasing depth: limit/offset against
+keyset (?pagination=cursor) pagination on 50,000 flights, PAGE_SIZE 5.
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_pagination
+"""
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport.models import Flight
+from airport.pagination import LimitOffsetKeysetPagination
+from airport.tests.tests_booking import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+FLIGHTS = 50_000
+PAGE_SIZE = 5
+PAGES = (1, 10, 100, 1_000, 10_000)
+REPEAT = 5
+
+
+class FlightPaginationBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        flight = sample_flight()
+        start = timezone.make_aware(datetime(2026, 1, 1))
+        Flight.objects.bulk_create(
+            Flight(
+                route=flight.route,
+                airplane=flight.airplane,
+                departure_time=start + timedelta(minutes=10 * (i // 2)),
+                arrival_time=start + timedelta(minutes=10 * (i // 2) + 90),
+                seat_map=bytes(flight.seat_map),
+                tickets_available=flight.tickets_available
+            )
+            for i in range(FLIGHTS)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE airport_flight")
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def cursor_for_page(self, page):
+        if page == 1:
+            return {"pagination": "cursor"}
+        paginator = LimitOffsetKeysetPagination()
+        paginator.cursor_ordering = ("departure_time", "id")
+        paginator.request = APIRequestFactory().get("/")
+        previous = Flight.objects.order_by("departure_time", "id")[
+            (page - 1) * PAGE_SIZE - 1
+        ]
+        return {"cursor": paginator.encode_position(previous)}
+
+    def measure(self, params):
+        timings = []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            res = self.client.get(FLIGHT_URL, params)
+            timings.append(time.perf_counter() - start)
+            self.assertEqual(len(res.data["results"]), PAGE_SIZE)
+        return statistics.median(timings) * 1000
+
+    def test_page_latency(self):
+        rows = [
+            (
+                page,
+                self.measure({"offset": (page - 1) * PAGE_SIZE}),
+                self.measure(
+                    {**self.cursor_for_page(page), "count": "estimate"}
+                ),
+            )
+            for page in PAGES
+        ]
+
+        print(f"\n{'page':>8} {'limit/offset ms':>16} {'cursor ms':>10}")
+        for page, offset_ms, cursor_ms in rows:
+            print(f"{page:>8} {offset_ms:>16.2f} {cursor_ms:>10.2f}")
+
+        first_page, last_page = rows[0][2], rows[-1][2]
+        self.assertLess(last_page, first_page * 3)
@@ -0,0 +1,82 @@
+"""
+Render time and payload size of a flight list page for DRF's
+JSONRenderer, ORJSONRenderer and MessagePackRenderer.
+
+Not collected by the test runner, run it explicitly:
+
+    python manage.py test benchmarks.bench_renderers
+"""
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Flight
+from airport.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+from airport.tests.tests_flight_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+FLIGHTS = 1000
+REPEAT = 20
+
+
+class RendererBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        flight = sample_flight()
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route=flight.route,
+                airplane=flight.airplane,
+                departure_time=flight.departure_time + timedelta(hours=i),
+                arrival_time=flight.arrival_time + timedelta(hours=i),
+                seat_map=bytes(flight.seat_map),
+                tickets_available=flight.tickets_available
+            )
+            for i in range(FLIGHTS - 1)
+        ) + [flight]
+        crew = Crew.objects.bulk_create(
+            Crew(name=f"Crew {i}", position="Pilot") for i in range(3)
+        )
+        Flight.crew.through.objects.bulk_create(
+            Flight.crew.through(flight_id=flight.id, crew_id=member.id)
+            for flight in flights
+            for member in crew
+        )
+
+    def test_render_flight_list(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+        data = client.get(
+            FLIGHT_URL, {"limit": FLIGHTS, "seat_map": "expanded"}
+        ).data
+
+        renderers = [JSONRenderer(), ORJSONRenderer()]
+        if msgpack is not None:
+            renderers.append(MessagePackRenderer())
+
+        print(f"\nflight list page of {FLIGHTS} flights")
+        print(f"{'':>20} {'render ms':>10} {'bytes':>9}")
+        timings = {}
+        for renderer in renderers:
+            best = None
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                content = renderer.render(data, renderer.media_type)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[type(renderer)] = best
+            print(
+                f"{type(renderer).__name__:>20} {best:>10.2f} "
+                f"{len(content):>9}"
+            )
+
+        self.assertLess(
+            timings[ORJSONRenderer], timings[JSONRenderer] / 2
+        )
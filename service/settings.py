@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 import os
 import sys
+from importlib.util import find_spec
 from datetime import timedelta
 from pathlib import Path
 
@@ -28,7 +29,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DEBUG", "True") == "True"
 
 ALLOWED_HOSTS = ['127.0.0.1', "localhost"]
 
@@ -42,24 +43,31 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "airport",
-    "debug_toolbar",
     "user",
     "drf_spectacular",
 ]
 
 MIDDLEWARE = [
+    "airport.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "airport.db_router.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if DEBUG:
+    # The toolbar middleware is sync-only: under ASGI it would make
+    # Django run every view, the async ones too, in a thread.
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(4, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "service.urls"
 
 TEMPLATES = [
@@ -95,6 +103,42 @@ DATABASES = {
     }
 }
 
+# Read replicas of "default" (airport.db_router): POSTGRES_REPLICA_HOSTS
+# is a comma-separated list of hosts, added as "replica1", "replica2"...
+# A user is pinned to the primary for REPLICA_STICKY_SECONDS after each
+# write, in the REPLICA_PIN_CACHE_ALIAS cache, which every process must
+# share; responses read from a replica while what they show changed
+# less than REPLICA_MAX_LAG_SECONDS ago are not cached.
+for number, host in enumerate(
+    filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")), 1
+):
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["airport.db_router.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+REPLICA_MAX_LAG_SECONDS = 2
+REPLICA_PIN_CACHE_ALIAS = "shared"
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "airport",
+    },
+    # Seen by every worker process; its table is made by
+    # "manage.py createcachetable".
+    "shared": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "airport_cache",
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -137,6 +181,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = "/files/static"
 
 
 MEDIA_ROOT = "/files/media"
@@ -154,17 +199,35 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "airport.permissions.IsAdminALLORIsAuthenticatedReadOnly",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS":
-        "rest_framework.pagination.LimitOffsetPagination",
-    "PAGE_SIZE": 5
+        "airport.pagination.LimitOffsetKeysetPagination",
+    "PAGE_SIZE": 5,
+    "DEFAULT_RENDERER_CLASSES": [
+        "airport.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "airport.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# Accept: application/msgpack / Content-Type: application/msgpack
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "airport.renderers.MessagePackRenderer"
+    )
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].append(
+        "airport.renderers.MessagePackParser"
+    )
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Airport Api Service",
     "DESCRIPTION": "Order tickets for airplane trips",
@@ -177,8 +240,47 @@ SPECTACULAR_SETTINGS = {
 
 }
 
+# Seat holds (POST /api/airport/hold/), released by release_expired_holds
+SEAT_HOLD_MINUTES = 10
+SEAT_HOLD_MAX_MINUTES = 30
+
+# In-process flight graph used by /api/airport/itinerary/
+ITINERARY_GRAPH_REFRESH_SECONDS = 30
+ITINERARY_GRAPH_REBUILD_SECONDS = 600
+
+# Cached city, airplane type, airport and crew responses (airport.cache)
+REFERENCE_CACHE_ALIAS = "default"
+REFERENCE_CACHE_TIMEOUT = 60 * 60
+
+# Airplane image renditions (airport.renditions): widths in pixels,
+# the width airplane lists ask for, and rendering threads per process
+AIRPLANE_IMAGE_WIDTHS = (160, 320, 640, 1280)
+AIRPLANE_IMAGE_LIST_WIDTH = 320
+AIRPLANE_IMAGE_WORKERS = 2
+
+# Async list/detail requests served at once per process
+# (airport.async_views); each one holds a database connection.
+ASYNC_VIEW_CONCURRENCY = 20
+
+# Bearer token Prometheus must send to scrape /metrics/ (airport.metrics);
+# unset, /metrics/ answers 403 to everyone.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Stateless JWT authentication (user.authentication): user rows loaded
+# when a request reads more than the token claims are kept per process,
+# at most JWT_USER_CACHE_SIZE of them for JWT_USER_CACHE_SECONDS. Token
+# revocations made by other processes are picked up within
+# JWT_REVOCATION_CHECK_SECONDS.
+JWT_USER_CACHE_SIZE = 1024
+JWT_USER_CACHE_SECONDS = 30
+JWT_REVOCATION_CHECK_SECONDS = 1
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=55),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_LIFETIME": True,
+    "TOKEN_OBTAIN_SERIALIZER":
+        "user.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER":
+        "user.serializers.ClaimsTokenRefreshSerializer",
 }
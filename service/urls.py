@@ -23,6 +23,8 @@ from drf_spectacular.views import (
     SpectacularRedocView
 )
 
+from airport.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/airport/", include("airport.urls", namespace="airport")),
@@ -40,5 +42,8 @@ urlpatterns = [
         name="redoc"
     ),
 
-    path("__debug__/", include("debug_toolbar.urls")),
+    path("metrics/", metrics_view, name="metrics"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.DEBUG:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
@@ -0,0 +1,189 @@
+"""
+JWT authentication without the per-request user query.
+
+simplejwt's JWTAuthentication loads the user row on every request.
+StatelessJWTAuthentication builds a ClaimsUser from the id, email and
+is_staff claims the token obtain and refresh serializers put into
+tokens, which is all the permission classes and the per-user querysets
+need. Other fields load on first use from `user_rows`, a bounded LRU of
+user rows that expire after JWT_USER_CACHE_SECONDS.
+
+Since nothing is read per request, a deactivated user, a changed
+password or staff flag, or a logout would go unnoticed until the token
+expires. Those revoke tokens (RevokedToken), and every request checks
+the token against `revocations`: an in-process set of revoked jtis and
+a dict of per-user revocation times. At most every
+JWT_REVOCATION_CHECK_SECONDS it compares the count and sum of the
+RevokedToken ids with the ones it loaded and reloads if they changed,
+so revocations made by any process (another worker, the admin,
+`manage.py changepassword`) apply within that time; this process's own
+apply at once. In between, the check is two hash lookups however many
+tokens are revoked.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from user.models import (
+    ISSUED_AT_CLAIM,
+    TOKEN_CLAIM_FIELDS,
+    ClaimsUser,
+    RevokedToken
+)
+
+
+class UserRows:
+    """User rows by id, least recently used first."""
+
+    def __init__(self, size: int, seconds: float):
+        self.size = size
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.rows = OrderedDict()
+
+    def get(self, user_id):
+        """The user's field values by attname, None if there is no user."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.rows.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.rows.move_to_end(user_id)
+                return entry[1]
+
+        model = get_user_model()
+        row = model.objects.filter(pk=user_id).values(
+            *(field.attname for field in model._meta.concrete_fields)
+        ).first()
+        if row is not None:
+            with self.lock:
+                self.rows[user_id] = (now + self.seconds, row)
+                self.rows.move_to_end(user_id)
+                while len(self.rows) > self.size:
+                    self.rows.popitem(last=False)
+        return row
+
+    def discard(self, user_id) -> None:
+        with self.lock:
+            self.rows.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.rows.clear()
+
+
+user_rows = UserRows(
+    settings.JWT_USER_CACHE_SIZE, settings.JWT_USER_CACHE_SECONDS
+)
+
+
+class Revocations:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = float("-inf")
+        # Count and sum of the RevokedToken ids loaded. Max(id) alone
+        # would miss a lower id committed after a higher one; inserts,
+        # and the deletes of expired rows that come with them, always
+        # change the count or the sum.
+        self.marker = None
+        self.jtis = frozenset()
+        # user id -> tokens issued before this epoch time are revoked
+        self.users = {}
+
+    def expire(self) -> None:
+        """Check the table on the next request."""
+        self.checked_at = float("-inf")
+
+    def reload(self) -> None:
+        now = time.monotonic()
+        if now < self.checked_at + settings.JWT_REVOCATION_CHECK_SECONDS:
+            return
+        with self.lock:
+            if now < (
+                self.checked_at + settings.JWT_REVOCATION_CHECK_SECONDS
+            ):
+                return
+            marker = RevokedToken.objects.aggregate(
+                count=Count("id"), ids=Sum("id")
+            )
+            if marker != self.marker:
+                self.load()
+                self.marker = marker
+            self.checked_at = now
+
+    def load(self) -> None:
+        jtis, users = set(), {}
+        for jti, user_id, revoked_at in RevokedToken.objects.filter(
+            expires_at__gt=timezone.now()
+        ).values_list("jti", "user_id", "revoked_at"):
+            if jti:
+                jtis.add(jti)
+            else:
+                users[user_id] = max(
+                    users.get(user_id, 0), revoked_at.timestamp()
+                )
+        self.jtis, self.users = frozenset(jtis), users
+
+    def is_revoked(self, token) -> bool:
+        self.reload()
+        if token.get(api_settings.JTI_CLAIM) in self.jtis:
+            return True
+        revoked_until = self.users.get(token.get(api_settings.USER_ID_CLAIM))
+        # Tokens issued before the claim was added only have the
+        # whole-second iat.
+        issued_at = token.get(ISSUED_AT_CLAIM, token.get("iat", 0))
+        return revoked_until is not None and issued_at < revoked_until
+
+
+revocations = Revocations()
+
+
+def check_not_revoked(token) -> None:
+    if revocations.is_revoked(token):
+        raise InvalidToken(_("Token has been revoked"))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the token claims instead of loading
+    the user, and rejects revoked tokens. Tokens without the claims,
+    issued before they were added, fall back to `user_rows`.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        check_not_revoked(token)
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        if all(field in validated_token for field in TOKEN_CLAIM_FIELDS):
+            return ClaimsUser.from_claims(user_id, validated_token)
+
+        row = user_rows.get(user_id)
+        if row is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+        if not row["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return get_user_model().from_db(
+            "default", list(row), list(row.values())
+        )
@@ -1,6 +1,17 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext as _
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+# Fields copied into access tokens, so that requests authenticated by
+# user.authentication.StatelessJWTAuthentication need no user query.
+TOKEN_CLAIM_FIELDS = ("email", "is_staff")
+# When the token was issued, in epoch seconds with microseconds: iat is
+# whole seconds, too coarse to tell tokens issued just before and just
+# after a revocation apart.
+ISSUED_AT_CLAIM = "issued_at"
 
 
 class UserManager(BaseUserManager):
@@ -47,3 +58,124 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_token_fields = instance.token_fields()
+        return instance
+
+    def token_fields(self) -> tuple:
+        """What tokens issued to the user rely on, deferred fields as None."""
+        return tuple(
+            self.__dict__.get(field)
+            for field in (*TOKEN_CLAIM_FIELDS, "is_active", "password")
+        )
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from user.authentication import user_rows
+
+        user_rows.discard(self.pk)
+        token_fields = self.token_fields()
+        loaded = getattr(self, "_loaded_token_fields", token_fields)
+        if any(
+            old is not None and new is not None and old != new
+            for old, new in zip(loaded, token_fields)
+        ):
+            # Tokens carry the old claims, or belong to a deactivated
+            # user or an old password.
+            RevokedToken.revoke_user(self)
+        self._loaded_token_fields = token_fields
+
+
+class ClaimsUser(User):
+    """
+    A user built from access token claims without a query. Fields the
+    token does not carry are deferred: reading one loads the user row
+    through user.authentication.user_rows, a short-lived in-process
+    cache, instead of querying every time.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, claims: dict) -> "ClaimsUser":
+        # is_active stays deferred: deactivating a user revokes their
+        # tokens, and reading it loads the row.
+        values = {
+            "id": user_id,
+            **{field: claims[field] for field in TOKEN_CLAIM_FIELDS}
+        }
+        # from_db() takes the values in field order.
+        fields = [
+            field.attname for field in cls._meta.concrete_fields
+            if field.attname in values
+        ]
+        return cls.from_db(
+            "default", fields, [values[field] for field in fields]
+        )
+
+    def refresh_from_db(self, using=None, fields=None):
+        if fields is None:
+            return super().refresh_from_db(using, fields)
+        from user.authentication import user_rows
+
+        row = user_rows.get(self.pk)
+        if row is None:
+            raise User.DoesNotExist("User matching query does not exist.")
+        for field in self.get_deferred_fields():
+            self.__dict__[field] = row[field]
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked token, by its jti, or with a blank jti every token of
+    `user` issued up to `revoked_at`. Rows are kept until the tokens
+    they revoke expire anyway.
+    """
+
+    jti = models.CharField(max_length=255, blank=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="revoked_tokens"
+    )
+    revoked_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.jti or 'all tokens'} of {self.user_id}"
+
+    @classmethod
+    def revoke(cls, token) -> None:
+        """Revoke one access or refresh token."""
+        cls.objects.create(
+            jti=token[api_settings.JTI_CLAIM],
+            user_id=token[api_settings.USER_ID_CLAIM],
+            expires_at=datetime_from_epoch(token["exp"])
+        )
+        cls.changed()
+
+    @classmethod
+    def revoke_user(cls, user) -> None:
+        """Revoke every token issued to `user` so far."""
+        now = timezone.now()
+        cls.objects.create(
+            user=user,
+            revoked_at=now,
+            expires_at=now + max(
+                api_settings.ACCESS_TOKEN_LIFETIME,
+                api_settings.REFRESH_TOKEN_LIFETIME
+            )
+        )
+        cls.changed()
+
+    @classmethod
+    def changed(cls) -> None:
+        from user.authentication import revocations
+
+        cls.objects.filter(expires_at__lte=timezone.now()).delete()
+        revocations.expire()
+        transaction.on_commit(revocations.expire)
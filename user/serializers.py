@@ -1,6 +1,16 @@
 from django.contrib.auth import get_user_model, authenticate
 from rest_framework import serializers
 from django.utils.translation import gettext as _
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.authentication import check_not_revoked
+from user.models import ISSUED_AT_CLAIM, TOKEN_CLAIM_FIELDS, RevokedToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -53,3 +63,71 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+def add_user_claims(token, user):
+    for field in TOKEN_CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair carrying the claims StatelessJWTAuthentication reads."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = add_user_claims(super().get_token(user), user)
+        token[ISSUED_AT_CLAIM] = token.current_time.timestamp()
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuses revoked refresh tokens and inactive users, and renews the
+    claims from the user row: one query per refresh instead of one
+    per request.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        check_not_revoked(refresh)
+        user = get_user_model().objects.filter(
+            pk=refresh[api_settings.USER_ID_CLAIM], is_active=True
+        ).first()
+        if user is None:
+            raise InvalidToken(_("User not found or inactive"))
+        attrs["refresh"] = str(add_user_claims(refresh, user))
+        return super().validate(attrs)
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField(
+        required=False,
+        help_text="Refresh token to revoke with the access token"
+    )
+    everywhere = serializers.BooleanField(
+        default=False,
+        help_text="Revoke every token of the user instead"
+    )
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(error.args[0])
+        user = self.context["request"].user
+        if str(refresh[api_settings.USER_ID_CLAIM]) != str(user.pk):
+            raise serializers.ValidationError(
+                _("Token belongs to another user")
+            )
+        return refresh
+
+    def save(self, **kwargs):
+        request = self.context["request"]
+        if self.validated_data["everywhere"]:
+            RevokedToken.revoke_user(request.user)
+            return
+        if request.auth is not None:
+            RevokedToken.revoke(request.auth)
+        if "refresh" in self.validated_data:
+            RevokedToken.revoke(self.validated_data["refresh"])
@@ -5,7 +5,7 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView
 )
 
-from user.views import CreateUserView, ManagerUserView
+from user.views import CreateUserView, ManagerUserView, TokenRevokeView
 
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="create",),
@@ -13,6 +13,7 @@ urlpatterns = [
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
+    path("token/revoke/", TokenRevokeView.as_view(), name="token_revoke"),
 ]
 
 app_name = "user"
@@ -1,14 +1,19 @@
 from typing import Optional
 
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
 from airport.permissions import AllowAllPermission
 from user.models import User
-from user.serializers import UserSerializer, AuthTokenSerializer
+from user.serializers import (
+    UserSerializer,
+    AuthTokenSerializer,
+    TokenRevokeSerializer
+)
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -28,3 +33,19 @@ class ManagerUserView(generics.RetrieveUpdateAPIView):
 
     def get_object(self) -> Optional[User]:
         return self.request.user
+
+
+class TokenRevokeView(generics.GenericAPIView):
+    """
+    Revoke the access token of the request and, if given, a refresh
+    token; with "everywhere" every token of the user.
+    """
+
+    serializer_class = TokenRevokeSerializer
+    permission_classes = (IsAuthenticated, )
+
+    def post(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)